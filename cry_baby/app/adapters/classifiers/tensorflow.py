@@ -8,6 +8,10 @@ from cry_baby.pkg.audio_file_client.core.domain import (
     MelSpectrogramPreprocessingSettings,
 )
 from cry_baby.pkg.audio_file_client.core.ports import AudioFileClient
+from cry_baby.pkg.audio_file_client.core.spectrogram import (
+    calc_target_shape,
+    empty_model_input,
+)
 
 
 class TensorFlowClassifier(ports.Classifier):
@@ -22,20 +26,43 @@ class TensorFlowClassifier(ports.Classifier):
         self.mel_spectrogram_preprocessing_settings = (
             mel_spectrogram_preprocessing_settings
         )
+        # Reused for every clip, the features are written straight into the model input
+        self.model_input = empty_model_input(
+            calc_target_shape(
+                mel_spectrogram_preprocessing_settings.sampling_rate_hz,
+                mel_spectrogram_preprocessing_settings.duration_seconds,
+                mel_spectrogram_preprocessing_settings.number_of_mel_bands,
+                mel_spectrogram_preprocessing_settings.hop_length,
+            )
+        )
 
     def classify(
         self,
         path_to_audio_file: pathlib.Path,
     ) -> float:
-        mel_spec = self.audio_file_client.extract_mel_spectrogram(
-            path_to_audio_file, self.mel_spectrogram_preprocessing_settings
+        return self.classify_mel_spectrogram(
+            self.extract_mel_spectrogram(path_to_audio_file)
         )
 
-        mel_spec = np.expand_dims(mel_spec, axis=-1)  # Add a channel dimension
+    def extract_mel_spectrogram(self, path_to_audio_file: pathlib.Path) -> np.ndarray:
+        return self.audio_file_client.extract_mel_spectrogram_into(
+            path_to_audio_file,
+            self.mel_spectrogram_preprocessing_settings,
+            self.model_input,
+        )
 
-        mel_spec = np.expand_dims(mel_spec, axis=0)  # Add a batch dimension
+    def extract_mel_spectrogram_from_samples(
+        self, samples: np.ndarray, sampling_rate_hz: int
+    ) -> np.ndarray:
+        return self.audio_file_client.extract_mel_spectrogram_from_samples_into(
+            samples,
+            sampling_rate_hz,
+            self.mel_spectrogram_preprocessing_settings,
+            self.model_input,
+        )
 
-        prediction: np.ndarray = self.model.predict(mel_spec)
+    def classify_mel_spectrogram(self, mel_spectrogram: np.ndarray) -> float:
+        prediction: np.ndarray = self.model.predict(mel_spectrogram, verbose=0)
 
         if prediction.shape != (1, 1):
             raise ValueError(
@@ -43,3 +70,18 @@ class TensorFlowClassifier(ports.Classifier):
             )
 
         return prediction[0][0]
+
+    def classify_mel_spectrogram_batch(
+        self, mel_spectrograms: np.ndarray
+    ) -> np.ndarray:
+        predictions: np.ndarray = self.model.predict(mel_spectrograms, verbose=0)
+
+        if predictions.shape != (len(mel_spectrograms), 1):
+            raise ValueError(
+                f"Expected prediction shape to be ({len(mel_spectrograms)}, 1), but got {predictions.shape}"
+            )
+
+        return predictions[:, 0]
+
+    def warm_up(self):
+        self.model.predict(np.zeros_like(self.model_input), verbose=0)
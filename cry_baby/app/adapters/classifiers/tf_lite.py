@@ -8,6 +8,10 @@ from cry_baby.pkg.audio_file_client.core.domain import (
     MelSpectrogramPreprocessingSettings,
 )
 from cry_baby.pkg.audio_file_client.core.ports import AudioFileClient
+from cry_baby.pkg.audio_file_client.core.spectrogram import (
+    calc_target_shape,
+    empty_model_input,
+)
 
 
 class TFLiteClassifier(ports.Classifier):
@@ -27,23 +31,46 @@ class TFLiteClassifier(ports.Classifier):
         self.mel_spectrogram_preprocessing_settings = (
             mel_spectrogram_preprocessing_settings
         )
+        self.interpreter = None
+        # Reused for every clip, the features are written straight into the model input
+        self.model_input = empty_model_input(
+            calc_target_shape(
+                mel_spectrogram_preprocessing_settings.sampling_rate_hz,
+                mel_spectrogram_preprocessing_settings.duration_seconds,
+                mel_spectrogram_preprocessing_settings.number_of_mel_bands,
+                mel_spectrogram_preprocessing_settings.hop_length,
+            )
+        )
 
     def classify(self, path_to_audio_file: pathlib.Path) -> float:
-        mel_spec = self.audio_file_client.extract_mel_spectrogram(
-            path_to_audio_file, self.mel_spectrogram_preprocessing_settings
+        return self.classify_mel_spectrogram(
+            self.extract_mel_spectrogram(path_to_audio_file)
+        )
+
+    def extract_mel_spectrogram(self, path_to_audio_file: pathlib.Path) -> np.ndarray:
+        return self.audio_file_client.extract_mel_spectrogram_into(
+            path_to_audio_file,
+            self.mel_spectrogram_preprocessing_settings,
+            self.model_input,
+        )
+
+    def extract_mel_spectrogram_from_samples(
+        self, samples: np.ndarray, sampling_rate_hz: int
+    ) -> np.ndarray:
+        return self.audio_file_client.extract_mel_spectrogram_from_samples_into(
+            samples,
+            sampling_rate_hz,
+            self.mel_spectrogram_preprocessing_settings,
+            self.model_input,
         )
 
-        interpreter = tflite.Interpreter(model_path=str(self.model_path))
-        interpreter.allocate_tensors()
+    def classify_mel_spectrogram(self, mel_spectrogram: np.ndarray) -> float:
+        interpreter = self._get_interpreter()
 
         input_details = interpreter.get_input_details()[0]
         output_details = interpreter.get_output_details()[0]
 
-        mel_spec = np.array(mel_spec, dtype=np.float32)
-        mel_spec = np.expand_dims(mel_spec, axis=0)  # Add a batch dimension
-        mel_spec = np.expand_dims(mel_spec, axis=-1)  # Add a channel dimension
-
-        interpreter.set_tensor(input_details["index"], mel_spec)
+        interpreter.set_tensor(input_details["index"], mel_spectrogram)
 
         interpreter.invoke()
 
@@ -55,3 +82,37 @@ class TFLiteClassifier(ports.Classifier):
             )
 
         return prediction[0][0]
+
+    def classify_mel_spectrogram_batch(
+        self, mel_spectrograms: np.ndarray
+    ) -> np.ndarray:
+        """
+        The interpreter's tensors are allocated for a batch of one, resizing them for
+        each batch would reallocate them, so the batch is invoked one at a time
+        """
+        return np.array(
+            [
+                self.classify_mel_spectrogram(mel_spectrograms[i : i + 1])
+                for i in range(len(mel_spectrograms))
+            ],
+            dtype=np.float32,
+        )
+
+    def warm_up(self):
+        interpreter = self._get_interpreter()
+        input_details = interpreter.get_input_details()[0]
+        interpreter.set_tensor(
+            input_details["index"],
+            np.zeros(input_details["shape"], dtype=input_details["dtype"]),
+        )
+        interpreter.invoke()
+
+    def _get_interpreter(self) -> tflite.Interpreter:
+        """
+        The interpreter is created once, allocating its tensors for every clip is wasted work
+        """
+        if self.interpreter is None:
+            interpreter = tflite.Interpreter(model_path=str(self.model_path))
+            interpreter.allocate_tensors()
+            self.interpreter = interpreter
+        return self.interpreter
@@ -0,0 +1,22 @@
+import sys
+import threading
+from typing import TextIO
+
+from cry_baby.app.core.domain import Notification
+from cry_baby.app.core.ports import Notifier
+
+
+class JsonLinesNotifier(Notifier):
+    """
+    Writes each notification as a line of JSON, to stdout by default, for piping into
+    other processes
+    """
+
+    def __init__(self, stream: TextIO = sys.stdout):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def send(self, notification: Notification):
+        with self._lock:
+            self.stream.write(notification.to_json() + "\n")
+            self.stream.flush()
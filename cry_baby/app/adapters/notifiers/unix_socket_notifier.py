@@ -0,0 +1,42 @@
+import pathlib
+import socket
+from typing import Optional
+
+from cry_baby.app.core.domain import Notification
+from cry_baby.app.core.ports import Notifier
+
+
+class UnixSocketNotifier(Notifier):
+    """
+    Writes each notification as a line of JSON to a local UNIX stream socket.
+    The connection is kept open between notifications and reopened after a failure.
+    """
+
+    def __init__(self, socket_path: pathlib.Path, timeout_seconds: float = 5.0):
+        self.socket_path = socket_path
+        self.timeout_seconds = timeout_seconds
+        self._socket: Optional[socket.socket] = None
+
+    def send(self, notification: Notification):
+        try:
+            if self._socket is None:
+                self._socket = self._connect()
+            self._socket.sendall((notification.to_json() + "\n").encode())
+        except OSError:
+            self.close()
+            raise
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def _connect(self) -> socket.socket:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.settimeout(self.timeout_seconds)
+        try:
+            connection.connect(str(self.socket_path))
+        except OSError:
+            connection.close()
+            raise
+        return connection
@@ -0,0 +1,25 @@
+import urllib.request
+
+from cry_baby.app.core.domain import Notification
+from cry_baby.app.core.ports import Notifier
+
+
+class WebhookNotifier(Notifier):
+    """
+    POSTs each notification as JSON to url, any response other than 2xx is a failure
+    """
+
+    def __init__(self, url: str, timeout_seconds: float = 5.0):
+        self.url = url
+        self.timeout_seconds = timeout_seconds
+
+    def send(self, notification: Notification):
+        request = urllib.request.Request(
+            self.url,
+            data=notification.to_json().encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        # urlopen raises HTTPError for 4xx and 5xx responses
+        with urllib.request.urlopen(request, timeout=self.timeout_seconds):
+            pass
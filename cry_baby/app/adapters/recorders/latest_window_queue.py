@@ -0,0 +1,40 @@
+import queue
+
+from hexalog.ports import Logger
+
+from cry_baby.app.core.domain import RecordedWindow
+
+
+class LatestWindowQueue(queue.Queue):
+    """
+    A bounded queue of RecordedWindows for recorders which must never block, such as one
+    reading a microphone. When the service falls behind the oldest window is dropped,
+    and its file deleted, so the service always moves on to the most recent audio rather
+    than working through a growing backlog.
+    """
+
+    def __init__(self, logger: Logger, maxsize: int = 1):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        super().__init__(maxsize=maxsize)
+        self.logger = logger
+        self.windows_dropped = 0
+
+    def put(self, window: RecordedWindow, block: bool = True, timeout=None):
+        while True:
+            try:
+                super().put(window, block=False)
+                return
+            except queue.Full:
+                pass
+            try:
+                stale_window: RecordedWindow = self.get_nowait()
+            except queue.Empty:
+                continue
+            stale_window.path.unlink(missing_ok=True)
+            self.windows_dropped += 1
+            self.logger.warning(
+                "Service is behind the recorder, dropping the oldest window",
+                audio_file_path=stale_window.path,
+                windows_dropped=self.windows_dropped,
+            )
@@ -1,3 +1,4 @@
+import collections
 import math
 import pathlib
 import queue
@@ -6,11 +7,25 @@ import wave
 from dataclasses import dataclass
 from typing import Optional
 
+import numpy as np
 import pyaudio
 from hexalog.ports import Logger
 from huggingface_hub.file_download import uuid
 
+from cry_baby.app.adapters.recorders.latest_window_queue import LatestWindowQueue
+from cry_baby.app.adapters.recorders.shared_audio_ring import (
+    SAMPLE_DTYPE,
+    SharedAudioRing,
+)
 from cry_baby.app.core import ports
+from cry_baby.app.core.domain import RecordedWindow
+
+SAMPLE_DTYPES = {
+    pyaudio.paInt8: np.int8,
+    pyaudio.paInt16: np.int16,
+    pyaudio.paInt32: np.int32,
+    pyaudio.paFloat32: np.float32,
+}
 
 
 @dataclass
@@ -62,6 +77,8 @@ class PyaudioRecorder(ports.Recorder):
         self.logger = logger
         self.settings = settings
         self.audio_object = None
+        # Back to back windows until told otherwise
+        self.hop_seconds = settings.duration_seconds
 
     def setup(self):
         if not self.audio_object:
@@ -95,7 +112,8 @@ class PyaudioRecorder(ports.Recorder):
             self.setup()
 
         stream = self._create_audio_stream()
-        audio_recorded_queue = queue.Queue()
+        # Reading the microphone must not wait for the service, stale windows are dropped
+        audio_recorded_queue = LatestWindowQueue(self.logger)
 
         recording_thread = threading.Thread(
             target=self._record_continuous,
@@ -109,6 +127,46 @@ class PyaudioRecorder(ports.Recorder):
 
         return audio_recorded_queue
 
+    def capture_into(self, ring: SharedAudioRing, stop_event: threading.Event):
+        """
+        Read the microphone into the ring until stop_event is set, nothing else is done
+        with the audio so this can run in its own small process. Inference processes read
+        the windows from the ring with a SharedMemoryRecorder.
+        """
+        if (
+            self.settings.number_of_audio_signals != 1
+            or SAMPLE_DTYPES[self.settings.audio_file_format] != SAMPLE_DTYPE
+        ):
+            raise ValueError("Only mono 16 bit audio can be captured into a ring")
+        if ring.sampling_rate_hz != self.settings.recording_rate_hz:
+            raise ValueError(
+                f"The ring holds audio at {ring.sampling_rate_hz} Hz, "
+                f"but the recording_rate_hz is {self.settings.recording_rate_hz}"
+            )
+        if not self.audio_object:
+            self.setup()
+
+        stream = self._create_audio_stream()
+        self.logger.info("Capturing into shared memory", ring=ring.name)
+        try:
+            while not stop_event.is_set():
+                ring.write(
+                    np.frombuffer(
+                        stream.read(
+                            self.settings.frames_per_buffer,
+                            exception_on_overflow=False,
+                        ),
+                        dtype=SAMPLE_DTYPE,
+                    )
+                )
+        finally:
+            stream.stop_stream()
+            stream.close()
+
+    def set_hop_seconds(self, hop_seconds: float):
+        self.logger.debug("Setting hop", hop_seconds=hop_seconds)
+        self.hop_seconds = hop_seconds
+
     def _create_audio_stream(self) -> pyaudio.Stream:
         if not self.audio_object:
             raise LookupError("Audio object was not created")
@@ -155,27 +213,47 @@ class PyaudioRecorder(ports.Recorder):
     def _record_continuous(
         self, stream: pyaudio.Stream, audio_recorded_queue: queue.Queue
     ):
+        """
+        Keep the most recent window of buffers and emit it every hop_seconds of new audio
+        """
+        self.logger.debug("Starting to record continuously")
+        buffers_per_window = int(
+            math.ceil(
+                self.settings.recording_rate_hz
+                / self.settings.frames_per_buffer
+                * self.settings.duration_seconds
+            )
+        )
+        seconds_per_buffer = (
+            self.settings.frames_per_buffer / self.settings.recording_rate_hz
+        )
+        frames: collections.deque[bytes] = collections.deque(maxlen=buffers_per_window)
+        buffers_since_last_window = 0
         while True:
-            self.logger.debug("Starting to record continuously")
-            frames = []
-            for _ in range(
-                0,
-                int(
-                    math.ceil(
-                        self.settings.recording_rate_hz
-                        / self.settings.frames_per_buffer
-                        * self.settings.duration_seconds
-                    )
-                ),
-            ):
-                frames.append(
-                    stream.read(
-                        self.settings.frames_per_buffer, exception_on_overflow=False
-                    )
+            frames.append(
+                stream.read(
+                    self.settings.frames_per_buffer, exception_on_overflow=False
                 )
+            )
+            buffers_since_last_window += 1
+            if (
+                len(frames) < buffers_per_window
+                or buffers_since_last_window * seconds_per_buffer < self.hop_seconds
+            ):
+                continue
+            buffers_since_last_window = 0
             file_path = self.temp_path / f"{uuid.uuid4()}.wav"
-            self._write_to_file(file_path, frames)
-            audio_recorded_queue.put(file_path)
+            self._write_to_file(file_path, list(frames))
+            audio_recorded_queue.put(
+                RecordedWindow(path=file_path, rms_energy=self._rms_energy(frames))
+            )
+
+    def _rms_energy(self, frames: collections.deque[bytes]) -> float:
+        dtype = SAMPLE_DTYPES[self.settings.audio_file_format]
+        samples = np.frombuffer(b"".join(frames), dtype=dtype).astype(np.float32)
+        if np.issubdtype(dtype, np.integer):
+            samples /= np.iinfo(dtype).max
+        return float(np.sqrt(np.mean(np.square(samples))))
 
     def _write_to_file(self, file_path: pathlib.Path, frames: list[bytes]):
         if not self.audio_object:
@@ -0,0 +1,107 @@
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+# write position in frames since capture started, capacity in frames, sampling rate in Hz
+HEADER_FIELDS = 3
+HEADER_BYTES = HEADER_FIELDS * np.dtype(np.int64).itemsize
+SAMPLE_DTYPE = np.int16
+
+
+class SharedAudioRing:
+    """
+    A ring buffer of mono 16 bit audio in shared memory, written by one capture process
+    and read by any number of other processes.
+
+    Every sample is stored twice, capacity frames apart, so any window of up to capacity
+    frames is one contiguous slice. Readers get it as a numpy view without copying.
+    """
+
+    def __init__(self, memory: shared_memory.SharedMemory, owner: bool):
+        self.memory = memory
+        self.owner = owner
+        self._header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=memory.buf)
+        self.capacity_frames = int(self._header[1])
+        self.sampling_rate_hz = int(self._header[2])
+        self._data: Optional[np.ndarray] = np.ndarray(
+            (2 * self.capacity_frames,),
+            dtype=SAMPLE_DTYPE,
+            buffer=memory.buf,
+            offset=HEADER_BYTES,
+        )
+
+    @classmethod
+    def create(cls, capacity_frames: int, sampling_rate_hz: int) -> "SharedAudioRing":
+        memory = shared_memory.SharedMemory(
+            create=True,
+            size=HEADER_BYTES + 2 * capacity_frames * np.dtype(SAMPLE_DTYPE).itemsize,
+        )
+        header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=memory.buf)
+        header[:] = (0, capacity_frames, sampling_rate_hz)
+        del header
+        return cls(memory, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedAudioRing":
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    @property
+    def write_position(self) -> int:
+        """
+        The number of frames written since capture started
+        """
+        return int(self._header[0])
+
+    def write(self, samples: np.ndarray):
+        """
+        Append samples, only one process may write
+        """
+        number_of_frames = len(samples)
+        if number_of_frames > self.capacity_frames:
+            raise ValueError(
+                f"Can not write {number_of_frames} frames at once into a ring of {self.capacity_frames}"
+            )
+        position = self.write_position
+        start = position % self.capacity_frames
+        end = start + number_of_frames
+        self._data[start:end] = samples
+        if end <= self.capacity_frames:
+            self._data[
+                start + self.capacity_frames : end + self.capacity_frames
+            ] = samples
+        else:
+            split = self.capacity_frames - start
+            self._data[start + self.capacity_frames :] = samples[:split]
+            self._data[: end - self.capacity_frames] = samples[split:]
+        # Published last so readers never see a position ahead of the samples
+        self._header[0] = position + number_of_frames
+
+    def window(self, end_position: int, number_of_frames: int) -> np.ndarray:
+        """
+        A view of the number_of_frames frames written before end_position
+        The view is overwritten once the writer is capacity frames past its start
+        """
+        start_position = end_position - number_of_frames
+        if start_position < 0 or end_position > self.write_position:
+            raise LookupError(
+                f"Frames {start_position} to {end_position} have not been written yet"
+            )
+        if self.write_position - start_position > self.capacity_frames:
+            raise LookupError(
+                f"Frames {start_position} to {end_position} have already been overwritten"
+            )
+        start = start_position % self.capacity_frames
+        return self._data[start : start + number_of_frames]
+
+    def close(self):
+        # The views must be released before the shared memory can be closed
+        self._header = None
+        self._data = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
@@ -0,0 +1,187 @@
+import pathlib
+import queue
+import threading
+import uuid
+import wave
+from typing import Optional
+
+import numpy as np
+from hexalog.ports import Logger
+
+from cry_baby.app.adapters.recorders.shared_audio_ring import (
+    SAMPLE_DTYPE,
+    SharedAudioRing,
+)
+from cry_baby.app.core import ports
+from cry_baby.app.core.domain import RecordedWindow
+
+
+class SharedMemoryRecorder(ports.Recorder):
+    """
+    A Recorder for inference processes, it reads windows from a SharedAudioRing which a
+    capture process fills, e.g. with PyaudioRecorder.capture_into.
+
+    Each window's samples are passed on as a view of the ring, so features are extracted
+    straight from shared memory. The window is still written as a WAV file, which is what
+    the repository records. Only one window waits in the queue, and each carries a check
+    the service uses to drop it if the capture process overwrote it before it was used.
+
+    Windows end on multiples of the hop counted from the start of capture and are numbered
+    by that multiple. Each process takes the windows whose number modulo number_of_shards
+    is its shard_index, so several processes share the load without talking to each other.
+    Sharded processes should all use the same fixed hop.
+    """
+
+    def __init__(
+        self,
+        temp_path: pathlib.Path,
+        logger: Logger,
+        ring_name: str,
+        duration_seconds: float,
+        shard_index: int = 0,
+        number_of_shards: int = 1,
+        poll_interval_seconds: float = 0.01,
+    ):
+        if number_of_shards < 1:
+            raise ValueError("number_of_shards must be at least 1")
+        if not 0 <= shard_index < number_of_shards:
+            raise ValueError("shard_index must be between 0 and number_of_shards - 1")
+        self.temp_path = temp_path
+        self.logger = logger
+        self.ring_name = ring_name
+        self.duration_seconds = duration_seconds
+        self.shard_index = shard_index
+        self.number_of_shards = number_of_shards
+        self.poll_interval_seconds = poll_interval_seconds
+        self.hop_seconds = duration_seconds
+        self.windows_skipped = 0
+        self.ring: Optional[SharedAudioRing] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def setup(self):
+        if self.ring is None:
+            self.ring = SharedAudioRing.attach(self.ring_name)
+            self.logger.debug(
+                "Attached to shared memory",
+                ring=self.ring_name,
+                shard_index=self.shard_index,
+                number_of_shards=self.number_of_shards,
+            )
+            if self._window_length > self.ring.capacity_frames:
+                raise ValueError(
+                    f"A {self.duration_seconds} second window does not fit in the ring "
+                    f"of {self.ring.capacity_frames / self.ring.sampling_rate_hz} seconds"
+                )
+        self._stop_event.clear()
+
+    def tear_down(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.ring is not None:
+            try:
+                self.ring.close()
+            except BufferError:
+                # A window is still being used, the memory is released when the process exits
+                self.logger.debug("Windows still refer to the ring, leaving it open")
+            self.ring = None
+
+    def set_hop_seconds(self, hop_seconds: float):
+        self.logger.debug("Setting hop", hop_seconds=hop_seconds)
+        self.hop_seconds = hop_seconds
+
+    def record(self) -> pathlib.Path:
+        self.setup()
+        while (end_position := self.ring.write_position) < self._window_length:
+            self._stop_event.wait(self.poll_interval_seconds)
+        return self._write_to_file(self.ring.window(end_position, self._window_length))
+
+    def continuously_record(self) -> Optional[queue.Queue]:
+        self.setup()
+        # Windows are views of the ring, so they must not pile up while the service stalls
+        audio_recorded_queue = queue.Queue(maxsize=1)
+        self._thread = threading.Thread(
+            target=self._read_continuous, args=(audio_recorded_queue,)
+        )
+        self._thread.daemon = True
+        self._thread.start()
+        return audio_recorded_queue
+
+    @property
+    def _window_length(self) -> int:
+        return int(self.duration_seconds * self.ring.sampling_rate_hz)
+
+    def _read_continuous(self, audio_recorded_queue: queue.Queue):
+        ring = self.ring
+        window_length = self._window_length
+        # Windows further behind the writer than this are skipped, which leaves the
+        # service the rest of the ring to finish with a window before it is overwritten
+        max_lag = (ring.capacity_frames - window_length) // 2
+        next_end = max(window_length, ring.write_position)
+        while not self._stop_event.is_set():
+            hop = max(1, int(self.hop_seconds * ring.sampling_rate_hz))
+            next_end = -(-next_end // hop) * hop
+            position = ring.write_position
+            if position < next_end:
+                self._stop_event.wait(self.poll_interval_seconds)
+                continue
+            if position - next_end > max_lag:
+                latest_end = position // hop * hop
+                skipped = (latest_end - next_end) // hop
+                self.windows_skipped += skipped
+                self.logger.warning(
+                    "Fell behind the capture process, skipping windows",
+                    skipped=skipped,
+                    shard_index=self.shard_index,
+                )
+                next_end = latest_end
+            if (next_end // hop) % self.number_of_shards == self.shard_index:
+                self._queue_window(audio_recorded_queue, next_end)
+            next_end += hop
+
+    def _queue_window(self, audio_recorded_queue: queue.Queue, end_position: int):
+        ring = self.ring
+        start_position = end_position - self._window_length
+
+        def samples_intact() -> bool:
+            return ring.write_position - start_position <= ring.capacity_frames
+
+        samples = ring.window(end_position, self._window_length)
+        window = RecordedWindow(
+            path=self._write_to_file(samples),
+            rms_energy=_rms_energy(samples),
+            samples=samples,
+            sampling_rate_hz=ring.sampling_rate_hz,
+            samples_intact=samples_intact,
+        )
+        while not self._stop_event.is_set():
+            if not samples_intact():
+                window.path.unlink(missing_ok=True)
+                self.windows_skipped += 1
+                self.logger.warning(
+                    "Window was overwritten while waiting for the service, skipping it",
+                    shard_index=self.shard_index,
+                )
+                return
+            try:
+                audio_recorded_queue.put(window, timeout=self.poll_interval_seconds)
+                return
+            except queue.Full:
+                continue
+
+    def _write_to_file(self, samples: np.ndarray) -> pathlib.Path:
+        file_path = self.temp_path / f"{uuid.uuid4()}.wav"
+        waveFile = wave.open(str(file_path), "wb")
+        waveFile.setnchannels(1)
+        waveFile.setsampwidth(np.dtype(SAMPLE_DTYPE).itemsize)
+        waveFile.setframerate(self.ring.sampling_rate_hz)
+        waveFile.writeframes(samples)
+        waveFile.close()
+        return file_path
+
+
+def _rms_energy(samples: np.ndarray) -> float:
+    mean_square = np.mean(np.square(samples, dtype=np.float32))
+    return float(np.sqrt(mean_square)) / np.iinfo(SAMPLE_DTYPE).max
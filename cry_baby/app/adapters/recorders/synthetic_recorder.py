@@ -0,0 +1,225 @@
+import enum
+import itertools
+import pathlib
+import queue
+import threading
+import time
+import uuid
+import wave
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+import numpy as np
+import soundfile as sf
+from hexalog.ports import Logger
+
+from cry_baby.app.core import ports
+from cry_baby.app.core.domain import RecordedWindow
+
+
+class SignalSource(enum.Enum):
+    NOISE = "noise"
+    TONE = "tone"
+    FILES = "files"
+    MIXED = "mixed"
+
+
+@dataclass
+class SyntheticRecordingSettings:
+    recording_rate_hz: int  # e.g. 44100
+    duration_seconds: float  # e.g. 4
+    signal_source: SignalSource = SignalSource.NOISE
+    audio_files: list[pathlib.Path] = field(default_factory=list)
+    number_of_microphones: int = 1
+    realtime: bool = True
+    amplitude: float = 0.1
+    tone_frequency_hz: float = 440
+    max_queued_windows: int = 0
+    seed: Optional[int] = None
+    """
+    signal_source decides what the virtual microphones hear, white noise, a sine tone,
+    the audio_files replayed back to back, or the audio_files mixed with noise.
+
+    The audio_files must already be at recording_rate_hz, they are loaded into memory once.
+
+    number_of_microphones is the number of concurrent streams, each has its own thread and
+    writes into the same queue, like several PyaudioRecorders feeding one service.
+
+    realtime paces each microphone at the speed of a real one. When it is False windows are
+    produced as fast as possible, set max_queued_windows so the producers are throttled by
+    how fast the service consumes them rather than growing the queue without bound.
+    0 means the queue is unbounded.
+    """
+
+    def __post_init__(self):
+        if self.number_of_microphones < 1:
+            raise ValueError("number_of_microphones must be at least 1")
+        if (
+            self.signal_source in [SignalSource.FILES, SignalSource.MIXED]
+            and not self.audio_files
+        ):
+            raise ValueError(f"{self.signal_source.value} requires audio_files")
+
+
+class SyntheticRecorder(ports.Recorder):
+    """
+    A Recorder which needs no input device, for load testing and soak testing the pipeline.
+    Windows are written as 16 bit mono WAV files, the same as the PyaudioRecorder writes.
+    """
+
+    def __init__(
+        self,
+        temp_path: pathlib.Path,
+        logger: Logger,
+        settings: SyntheticRecordingSettings,
+    ):
+        self.temp_path = temp_path
+        self.logger = logger
+        self.settings = settings
+        self.hop_seconds = settings.duration_seconds
+        self.windows_written = 0
+        self._files: list[np.ndarray] = []
+        self._stop_event = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._count_lock = threading.Lock()
+
+    def setup(self):
+        if self.settings.audio_files and not self._files:
+            self._files = [self._load(path) for path in self.settings.audio_files]
+            self.logger.debug("Loaded audio files", number=len(self._files))
+        self._stop_event.clear()
+
+    def tear_down(self):
+        self.logger.debug("Stopping virtual microphones")
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def set_hop_seconds(self, hop_seconds: float):
+        self.logger.debug("Setting hop", hop_seconds=hop_seconds)
+        self.hop_seconds = hop_seconds
+
+    def record(self) -> pathlib.Path:
+        self.setup()
+        samples = self._signal(np.random.default_rng(self.settings.seed))
+        window = next(samples)
+        while len(window) < self._window_length:
+            window = np.concatenate((window, next(samples)))
+        return self._write_to_file(window[: self._window_length])
+
+    def continuously_record(self) -> Optional[queue.Queue]:
+        self.setup()
+        audio_recorded_queue = queue.Queue(maxsize=self.settings.max_queued_windows)
+        seeds = np.random.SeedSequence(self.settings.seed).spawn(
+            self.settings.number_of_microphones
+        )
+        for microphone, seed in enumerate(seeds):
+            thread = threading.Thread(
+                target=self._record_continuous,
+                args=(microphone, np.random.default_rng(seed), audio_recorded_queue),
+            )
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+        self.logger.debug(
+            "Started virtual microphones",
+            number_of_microphones=self.settings.number_of_microphones,
+            realtime=self.settings.realtime,
+        )
+        return audio_recorded_queue
+
+    @property
+    def _window_length(self) -> int:
+        return int(self.settings.recording_rate_hz * self.settings.duration_seconds)
+
+    def _record_continuous(
+        self,
+        microphone: int,
+        rng: np.random.Generator,
+        audio_recorded_queue: queue.Queue,
+    ):
+        """
+        Keep the most recent window of samples and emit it every hop_seconds of new audio
+        """
+        samples = self._signal(rng)
+        window = np.zeros(self._window_length, dtype=np.float32)
+        pending = np.zeros(0, dtype=np.float32)
+        filled = 0
+        next_window_at = time.monotonic()
+        while not self._stop_event.is_set():
+            hop = max(1, int(self.hop_seconds * self.settings.recording_rate_hz))
+            while len(pending) < hop:
+                pending = np.concatenate((pending, next(samples)))
+            new, pending = pending[:hop], pending[hop:]
+            if hop >= len(window):
+                window[:] = new[-len(window) :]
+            else:
+                window[:-hop] = window[hop:]
+                window[-hop:] = new
+            filled += hop
+
+            if self.settings.realtime:
+                next_window_at += hop / self.settings.recording_rate_hz
+                if self._stop_event.wait(max(0.0, next_window_at - time.monotonic())):
+                    return
+            if filled < len(window):
+                continue
+
+            file_path = self._write_to_file(window)
+            rms_energy = float(np.sqrt(np.mean(np.square(window))))
+            while not self._stop_event.is_set():
+                try:
+                    audio_recorded_queue.put(
+                        RecordedWindow(path=file_path, rms_energy=rms_energy),
+                        timeout=0.1,
+                    )
+                    break
+                except queue.Full:
+                    continue
+            self.logger.debug("Virtual microphone wrote window", microphone=microphone)
+
+    def _signal(self, rng: np.random.Generator) -> Iterator[np.ndarray]:
+        """
+        Yield chunks of one second or one file of the configured signal, forever
+        """
+        sr = self.settings.recording_rate_hz
+        amplitude = self.settings.amplitude
+        match self.settings.signal_source:
+            case SignalSource.NOISE:
+                while True:
+                    yield (amplitude * rng.standard_normal(sr)).astype(np.float32)
+            case SignalSource.TONE:
+                phase = 2 * np.pi * self.settings.tone_frequency_hz / sr
+                for second in itertools.count():
+                    t = np.arange(second * sr, (second + 1) * sr)
+                    yield (amplitude * np.sin(phase * t)).astype(np.float32)
+            case SignalSource.FILES:
+                yield from itertools.cycle(self._files)
+            case SignalSource.MIXED:
+                while True:
+                    y = self._files[rng.integers(len(self._files))]
+                    noise = amplitude * rng.standard_normal(len(y))
+                    yield np.clip(y + noise, -1, 1).astype(np.float32)
+
+    def _load(self, path: pathlib.Path) -> np.ndarray:
+        y, sr = sf.read(path, dtype="float32", always_2d=True)
+        if sr != self.settings.recording_rate_hz:
+            raise ValueError(
+                f"Audio file {path} has sampling rate {sr}, "
+                f"but the recording_rate_hz is {self.settings.recording_rate_hz}"
+            )
+        return np.mean(y, axis=1)
+
+    def _write_to_file(self, samples: np.ndarray) -> pathlib.Path:
+        file_path = self.temp_path / f"{uuid.uuid4()}.wav"
+        pcm = (np.clip(samples, -1, 1) * np.iinfo(np.int16).max).astype(np.int16)
+        waveFile = wave.open(str(file_path), "wb")
+        waveFile.setnchannels(1)
+        waveFile.setsampwidth(2)
+        waveFile.setframerate(self.settings.recording_rate_hz)
+        waveFile.writeframes(pcm.tobytes())
+        waveFile.close()
+        with self._count_lock:
+            self.windows_written += 1
+        return file_path
@@ -0,0 +1,258 @@
+import csv
+import datetime
+import os
+import pathlib
+import struct
+import threading
+import uuid
+from typing import Optional
+
+import numpy as np
+
+from cry_baby.app.core.ports import Repository
+
+MAGIC = b"CRYB"
+VERSION = 2
+RECORD_DTYPE = np.dtype(
+    [
+        ("timestamp_ms", "<i8"),  # milliseconds since the unix epoch
+        ("prediction", "<f4"),
+        ("source_id", "<u2"),
+        ("model_id", "<u2"),  # line number in the .models file
+        ("clip_format", "<u2"),  # line number in the .clip_formats file
+        ("clip_id", "V16"),  # the uuid clip files are named with
+    ]
+)
+HEADER = struct.Struct("<4sII")  # magic, version, record size
+# Stands for the clip_id in the lines of the .clip_formats file
+CLIP_ID_PLACEHOLDER = "{clip_id}"
+
+
+def _models_path(log_path: pathlib.Path) -> pathlib.Path:
+    return log_path.with_suffix(log_path.suffix + ".models")
+
+
+def _clip_formats_path(log_path: pathlib.Path) -> pathlib.Path:
+    return log_path.with_suffix(log_path.suffix + ".clip_formats")
+
+
+def _read_lines(path: pathlib.Path) -> list[str]:
+    if not path.exists():
+        return []
+    with open(path) as file:
+        return file.read().splitlines()
+
+
+def _split_clip_path(audio_file_path: pathlib.Path) -> tuple[str, bytes]:
+    """
+    Recorders name clips with a uuid, which is stored in the record while the rest of
+    the path is stored once as a format. Any other path is a format of its own.
+    """
+    try:
+        clip_id = uuid.UUID(audio_file_path.stem)
+    except ValueError:
+        return str(audio_file_path), bytes(16)
+    clip_format = audio_file_path.with_name(
+        CLIP_ID_PLACEHOLDER + audio_file_path.suffix
+    )
+    return str(clip_format), clip_id.bytes
+
+
+def _join_clip_path(clip_format: str, clip_id: bytes) -> str:
+    if CLIP_ID_PLACEHOLDER not in clip_format:
+        return clip_format
+    return clip_format.replace(CLIP_ID_PLACEHOLDER, str(uuid.UUID(bytes=clip_id)))
+
+
+def _truncate_torn_tail(path: pathlib.Path, unit_size: int, offset: int = 0):
+    """
+    Drop the end of a write which was cut off, e.g. by losing power, so the next
+    write starts on a whole unit
+    """
+    size = path.stat().st_size
+    if (torn := (size - offset) % unit_size) != 0:
+        os.truncate(path, size - torn)
+
+
+def _truncate_torn_line(path: pathlib.Path):
+    if not path.exists():
+        return
+    with open(path, "rb") as file:
+        content = file.read()
+    if content and not content.endswith(b"\n"):
+        os.truncate(path, content.rfind(b"\n") + 1)
+
+
+class BinaryRepo(Repository):
+    """
+    Append only log of fixed width 34 byte records, read back with BinaryLogReader.
+
+    Model ids are written once to the .models file next to the log, records refer
+    to them by line number. Clips are referred to by the uuid in their file name,
+    the rest of the path, e.g. /tmp/{clip_id}.wav, is written once to the
+    .clip_formats file.
+
+    A record or line cut off part way, e.g. by losing power, is dropped when the
+    log is opened again so the records which follow it stay aligned.
+    """
+
+    def __init__(self, log_path: pathlib.Path, source_id: int = 0):
+        self.log_path = log_path
+        self.source_id = source_id
+        self._lock = threading.Lock()
+
+        if not log_path.exists() or log_path.stat().st_size == 0:
+            with open(log_path, "wb") as file:
+                file.write(HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize))
+        else:
+            _check_header(log_path)
+            _truncate_torn_tail(log_path, RECORD_DTYPE.itemsize, offset=HEADER.size)
+        _truncate_torn_line(_models_path(log_path))
+        _truncate_torn_line(_clip_formats_path(log_path))
+
+        self._model_ids = {
+            model_id: i
+            for i, model_id in enumerate(_read_lines(_models_path(log_path)))
+        }
+        self._clip_formats = {
+            clip_format: i
+            for i, clip_format in enumerate(_read_lines(_clip_formats_path(log_path)))
+        }
+
+    def save(
+        self,
+        audio_file_path: pathlib.Path,
+        prediction: float,
+        model_id: Optional[str] = None,
+    ):
+        with self._lock:
+            record = np.zeros(1, dtype=RECORD_DTYPE)
+            record["timestamp_ms"] = int(datetime.datetime.now().timestamp() * 1000)
+            record["prediction"] = prediction
+            record["source_id"] = self.source_id
+            record["model_id"] = self._model_index(model_id or "")
+            clip_format, clip_id = _split_clip_path(audio_file_path)
+            record["clip_format"] = self._clip_format_index(clip_format)
+            record["clip_id"] = np.void(clip_id)
+            with open(self.log_path, "ab") as file:
+                file.write(record.tobytes())
+
+    def _model_index(self, model_id: str) -> int:
+        return self._line_index(model_id, self._model_ids, _models_path(self.log_path))
+
+    def _clip_format_index(self, clip_format: str) -> int:
+        return self._line_index(
+            clip_format, self._clip_formats, _clip_formats_path(self.log_path)
+        )
+
+    def _line_index(
+        self, line: str, indices: dict[str, int], path: pathlib.Path
+    ) -> int:
+        if (index := indices.get(line)) is not None:
+            return index
+        index = len(indices)
+        with open(path, "a") as file:
+            file.write(f"{line}\n")
+        indices[line] = index
+        return index
+
+
+class BinaryLogReader:
+    """
+    Memory maps a log written by BinaryRepo as a numpy structured array with RECORD_DTYPE fields.
+    Records are assumed to be in time order, which holds for a single writing process
+    """
+
+    def __init__(self, log_path: pathlib.Path):
+        self.log_path = log_path
+        _check_header(log_path)
+        number_of_records = (
+            log_path.stat().st_size - HEADER.size
+        ) // RECORD_DTYPE.itemsize
+        if number_of_records == 0:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+        else:
+            # A record being written while we open the file is left out
+            self.records = np.memmap(
+                log_path,
+                dtype=RECORD_DTYPE,
+                mode="r",
+                offset=HEADER.size,
+                shape=(number_of_records,),
+            )
+
+    def between(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+    ) -> np.ndarray:
+        """
+        The records from start up to but excluding end, as a view of the memory map
+        Leaving out start or end leaves that side of the range open
+        """
+        timestamps = self.records["timestamp_ms"]
+        first = 0
+        last = len(timestamps)
+        if start is not None:
+            first = np.searchsorted(timestamps, int(start.timestamp() * 1000))
+        if end is not None:
+            last = np.searchsorted(timestamps, int(end.timestamp() * 1000))
+        return self.records[first:last]
+
+    def model_ids(self) -> list[str]:
+        return _read_lines(_models_path(self.log_path))
+
+    def clip_formats(self) -> list[str]:
+        return _read_lines(_clip_formats_path(self.log_path))
+
+    def clip_paths(self, records: Optional[np.ndarray] = None) -> list[str]:
+        """
+        The audio file path of each record, all of them by default
+        """
+        if records is None:
+            records = self.records
+        clip_formats = self.clip_formats()
+        return [
+            _join_clip_path(
+                clip_formats[record["clip_format"]], record["clip_id"].tobytes()
+            )
+            for record in records
+        ]
+
+    def export_csv(
+        self, csv_file_path: pathlib.Path, records: Optional[np.ndarray] = None
+    ):
+        """
+        Write the records, all of them by default, in the format CSVRepo writes
+        """
+        if records is None:
+            records = self.records
+        model_ids = self.model_ids()
+        clip_paths = self.clip_paths(records)
+        with open(csv_file_path, "w", newline="") as file:
+            writer = csv.writer(file, lineterminator="\n")
+            writer.writerow(["timestamp", "audio_file_path", "prediction", "model_id"])
+            for record, clip_path in zip(records, clip_paths):
+                writer.writerow(
+                    [
+                        datetime.datetime.fromtimestamp(
+                            record["timestamp_ms"] / 1000
+                        ).isoformat(),
+                        clip_path,
+                        record["prediction"],
+                        model_ids[record["model_id"]],
+                    ]
+                )
+
+
+def _check_header(log_path: pathlib.Path):
+    with open(log_path, "rb") as file:
+        header = file.read(HEADER.size)
+    if len(header) != HEADER.size:
+        raise ValueError(f"{log_path} is too short to be a prediction log")
+    magic, version, record_size = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(
+            f"{log_path} is not a version {VERSION} prediction log, "
+            f"got magic {magic!r}, version {version} and record size {record_size}"
+        )
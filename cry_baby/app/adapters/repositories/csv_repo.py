@@ -1,19 +1,55 @@
 import datetime
+import os
 import pathlib
+import threading
+from typing import Optional
 from cry_baby.app.core.ports import Repository
 
+HEADER = "timestamp,audio_file_path,prediction,model_id\n"
+# Written before predictions were tagged with the model which made them
+HEADER_WITHOUT_MODEL_ID = "timestamp,audio_file_path,prediction\n"
+
 
 class CSVRepo(Repository):
     def __init__(self, csv_file_path: pathlib.Path):
         self.csv_file_path = csv_file_path
+        # Shadow models save from their own thread
+        self._lock = threading.Lock()
+        self._migrate()
 
-    def save(self, audio_file_path: pathlib.Path, prediction: float):
-        with open(self.csv_file_path, "a") as file:
+    def save(
+        self,
+        audio_file_path: pathlib.Path,
+        prediction: float,
+        model_id: Optional[str] = None,
+    ):
+        with self._lock, open(self.csv_file_path, "a") as file:
             match file.tell():
                 case 0:
-                    file.write("timestamp,audio_file_path,prediction\n")
-                case _ if file.tell() > 0:
-                    timestamp = datetime.datetime.now().isoformat()
-                    file.write(f"{timestamp},{audio_file_path},{prediction}\n")
-                case _:
+                    file.write(HEADER)
+                case _ if file.tell() < 0:
                     raise ValueError("File pointer is negative")
+            timestamp = datetime.datetime.now().isoformat()
+            file.write(f"{timestamp},{audio_file_path},{prediction},{model_id or ''}\n")
+
+    def _migrate(self):
+        """
+        Add an empty model_id column to a file written without one, so new rows
+        are not appended under the old header
+        """
+        if not self.csv_file_path.is_file():
+            return
+        with open(self.csv_file_path) as file:
+            header = file.readline()
+            if header in ("", HEADER):
+                return
+            if header != HEADER_WITHOUT_MODEL_ID:
+                raise ValueError(
+                    f"{self.csv_file_path} has an unknown header {header.strip()}"
+                )
+            migrated_file_path = self.csv_file_path.with_suffix(".migrating")
+            with open(migrated_file_path, "w") as migrated_file:
+                migrated_file.write(HEADER)
+                for line in file:
+                    migrated_file.write(line.rstrip("\n") + ",\n")
+        os.replace(migrated_file_path, self.csv_file_path)
@@ -0,0 +1,56 @@
+import pathlib
+import queue
+from typing import Optional
+
+from hexalog.ports import Logger
+
+from cry_baby.app.core.domain import ShardPrediction
+from cry_baby.app.core.ports import Repository
+
+
+class QueueRepo(Repository):
+    """
+    Sends predictions to another process, e.g. over a multiprocessing.Queue, where a
+    PredictionAggregator stores them. Used by sharded inference processes so that one
+    process records, detects and notifies for all of them.
+
+    When the queue stays full for put_timeout_seconds the prediction is dropped rather
+    than stalling classification.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        prediction_queue: queue.Queue,
+        shard_index: int,
+        put_timeout_seconds: float = 1.0,
+    ):
+        self.logger = logger
+        self.prediction_queue = prediction_queue
+        self.shard_index = shard_index
+        self.put_timeout_seconds = put_timeout_seconds
+        self.dropped_predictions = 0
+
+    def save(
+        self,
+        audio_file_path: pathlib.Path,
+        prediction: float,
+        model_id: Optional[str] = None,
+    ):
+        try:
+            self.prediction_queue.put(
+                ShardPrediction(
+                    audio_file_path=audio_file_path,
+                    prediction=float(prediction),
+                    model_id=model_id,
+                    shard_index=self.shard_index,
+                ),
+                timeout=self.put_timeout_seconds,
+            )
+        except queue.Full:
+            self.dropped_predictions += 1
+            self.logger.warning(
+                "Prediction aggregator is not keeping up, dropping prediction",
+                audio_file_path=audio_file_path,
+                dropped_predictions=self.dropped_predictions,
+            )
@@ -0,0 +1,91 @@
+import datetime
+import queue
+import threading
+from typing import Optional
+
+import hexalog.ports
+
+from cry_baby.app.core import ports
+from cry_baby.app.core.detector import CryDetector
+from cry_baby.app.core.domain import ShardPrediction
+from cry_baby.app.core.notifications import NotificationFanOut
+
+
+class PredictionAggregator:
+    """
+    Records, detects cries in and notifies about the predictions of every inference
+    process, so one cry raises one pair of events and one prediction log is written
+    however many processes there are.
+
+    Predictions are handled in the order they arrive, which with a shared hop is the
+    order of their windows apart from the odd window finishing late.
+    """
+
+    def __init__(
+        self,
+        logger: hexalog.ports.Logger,
+        repository: ports.Repository,
+        detector: Optional[CryDetector] = None,
+        notifier: Optional[NotificationFanOut] = None,
+        poll_interval_seconds: float = 0.5,
+    ):
+        self.logger = logger
+        self.repository = repository
+        self.detector = detector
+        self.notifier = notifier
+        self.poll_interval_seconds = poll_interval_seconds
+        self.predictions_handled = 0
+
+    def run(self, prediction_queue: queue.Queue, stop_event: threading.Event):
+        """
+        Handle predictions from prediction_queue until stop_event is set
+        """
+        if self.notifier is not None:
+            self.notifier.start()
+        try:
+            while not stop_event.is_set():
+                try:
+                    shard_prediction = prediction_queue.get(
+                        timeout=self.poll_interval_seconds
+                    )
+                except queue.Empty:
+                    continue
+                self.handle(shard_prediction)
+        finally:
+            if self.notifier is not None:
+                self.notifier.stop()
+
+    def handle(self, shard_prediction: ShardPrediction):
+        self.predictions_handled += 1
+        self.logger.debug(
+            "Prediction",
+            prediction=shard_prediction.prediction,
+            shard_index=shard_prediction.shard_index,
+        )
+        self.repository.save(
+            shard_prediction.audio_file_path,
+            shard_prediction.prediction,
+            model_id=shard_prediction.model_id,
+        )
+        if self.notifier is not None:
+            self.notifier.publish_prediction(
+                shard_prediction.audio_file_path,
+                shard_prediction.prediction,
+                shard_prediction.model_id,
+            )
+        self._detect(shard_prediction.prediction)
+
+    def _detect(self, prediction: float):
+        if self.detector is None:
+            return
+        event = self.detector.update(prediction, datetime.datetime.now())
+        if event is None:
+            return
+        self.logger.info(
+            "Cry event",
+            event_type=event.event_type.value,
+            smoothed_prediction=event.smoothed_prediction,
+            duration_seconds=event.duration_seconds,
+        )
+        if self.notifier is not None:
+            self.notifier.publish_cry_event(event)
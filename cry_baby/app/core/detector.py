@@ -0,0 +1,99 @@
+import bisect
+import collections
+import datetime
+import math
+from typing import Optional
+
+from cry_baby.app.core.domain import (
+    CryDetectorSettings,
+    CryEvent,
+    CryEventType,
+    SmoothingMethod,
+)
+
+
+class CryDetector:
+    """
+    Smooths the stream of per clip predictions and applies hysteresis thresholds,
+    returning an event only when the crying state changes.
+
+    Each update is O(1) in the length of the stream, the median keeps a fixed
+    size history of median_window_size predictions.
+
+    Predictions which are not finite, e.g. NaN from a clip of digital silence, are
+    skipped so they can not poison the average or the sorted history.
+    """
+
+    def __init__(self, settings: CryDetectorSettings):
+        self.settings = settings
+        self.is_crying = False
+        self._ema: Optional[float] = None
+        self._ema_updated_at: Optional[datetime.datetime] = None
+        self._history: collections.deque[float] = collections.deque(
+            maxlen=settings.median_window_size
+        )
+        self._sorted_history: list[float] = []
+        self._cry_started_at: Optional[datetime.datetime] = None
+
+    def update(
+        self, prediction: float, timestamp: datetime.datetime
+    ) -> Optional[CryEvent]:
+        if not math.isfinite(prediction):
+            return None
+        smoothed_prediction = self._smooth(prediction, timestamp)
+
+        if not self.is_crying and smoothed_prediction >= self.settings.on_threshold:
+            self.is_crying = True
+            self._cry_started_at = timestamp
+            return CryEvent(
+                event_type=CryEventType.STARTED,
+                timestamp=timestamp,
+                smoothed_prediction=smoothed_prediction,
+            )
+
+        if self.is_crying and smoothed_prediction < self.settings.off_threshold:
+            self.is_crying = False
+            duration = (timestamp - self._cry_started_at).total_seconds()
+            self._cry_started_at = None
+            return CryEvent(
+                event_type=CryEventType.STOPPED,
+                timestamp=timestamp,
+                smoothed_prediction=smoothed_prediction,
+                duration_seconds=duration,
+            )
+
+        return None
+
+    def _smooth(self, prediction: float, timestamp: datetime.datetime) -> float:
+        match self.settings.smoothing_method:
+            case SmoothingMethod.EMA:
+                if self._ema is None:
+                    self._ema = prediction
+                else:
+                    elapsed_seconds = max(
+                        0.0, (timestamp - self._ema_updated_at).total_seconds()
+                    )
+                    alpha = 1 - 0.5 ** (
+                        elapsed_seconds / self.settings.ema_half_life_seconds
+                    )
+                    self._ema += alpha * (prediction - self._ema)
+                self._ema_updated_at = timestamp
+                return self._ema
+            case SmoothingMethod.MEDIAN:
+                if len(self._history) == self._history.maxlen:
+                    oldest = self._history[0]
+                    del self._sorted_history[
+                        bisect.bisect_left(self._sorted_history, oldest)
+                    ]
+                self._history.append(prediction)
+                bisect.insort(self._sorted_history, prediction)
+                middle = len(self._sorted_history) // 2
+                if len(self._sorted_history) % 2:
+                    return self._sorted_history[middle]
+                return (
+                    self._sorted_history[middle - 1] + self._sorted_history[middle]
+                ) / 2
+            case _:
+                raise ValueError(
+                    f"Unknown smoothing method {self.settings.smoothing_method}"
+                )
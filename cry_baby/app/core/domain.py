@@ -0,0 +1,357 @@
+import datetime
+import enum
+import json
+import math
+import pathlib
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from cry_baby.pkg.audio_file_client.core.domain import (
+    MelSpectrogramPreprocessingSettings,
+)
+
+
+class SmoothingMethod(enum.Enum):
+    EMA = "ema"
+    MEDIAN = "median"
+
+
+@dataclass
+class CryDetectorSettings:
+    """
+    Class for defining how the stream of per clip predictions is turned into cry events.
+
+    Attributes:
+        smoothing_method: How the predictions are smoothed before the thresholds
+                            are applied, an exponential moving average or a
+                            running median.
+
+        ema_half_life_seconds: How long it takes the weight of a prediction to
+                                 halve when using the exponential moving
+                                 average. The weight is based on the time
+                                 between predictions rather than their number,
+                                 so smoothing does not change with the hop. A
+                                 shorter half life reacts faster but is noisier.
+                                   e.g. 4
+
+        median_window_size: The number of most recent predictions the running
+                              median is taken over.
+                                e.g. 3
+
+        on_threshold: The smoothed probability at or above which a cry starts.
+                        e.g. 0.7
+
+        off_threshold: The smoothed probability below which a cry stops. Keeping
+                         this lower than on_threshold stops the state flapping
+                         when the probability hovers around a single threshold.
+                           e.g. 0.3
+    """
+
+    smoothing_method: SmoothingMethod = SmoothingMethod.EMA
+    ema_half_life_seconds: float = 4
+    median_window_size: int = 3
+    on_threshold: float = 0.7
+    off_threshold: float = 0.3
+
+    def __post_init__(self):
+        if self.ema_half_life_seconds <= 0:
+            raise ValueError("ema_half_life_seconds must be positive")
+        if self.median_window_size < 1:
+            raise ValueError("median_window_size must be at least 1")
+        if not 0 <= self.off_threshold <= self.on_threshold <= 1:
+            raise ValueError(
+                "thresholds must satisfy 0 <= off_threshold <= on_threshold <= 1"
+            )
+
+
+class CryEventType(enum.Enum):
+    STARTED = "started"
+    STOPPED = "stopped"
+
+
+@dataclass(frozen=True)
+class CryEvent:
+    """
+    Emitted by the CryDetector when the smoothed probability crosses a threshold.
+    duration_seconds is only set on STOPPED events, it is the length of the cry.
+    """
+
+    event_type: CryEventType
+    timestamp: datetime.datetime
+    smoothed_prediction: float
+    duration_seconds: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class RecordedWindow:
+    """
+    A window of audio written by a Recorder during continuous recording.
+    rms_energy is the root mean square of the samples scaled to [0, 1] of full scale,
+    it is computed while the samples are still in memory.
+
+    Recorders which keep their audio in memory may also pass the mono samples, usually a
+    view of their buffer, so features are extracted without reading the file back.
+    When the buffer is reused they pass samples_intact too, which returns False once
+    the view no longer holds this window's audio.
+    """
+
+    path: pathlib.Path
+    rms_energy: float
+    samples: Optional[np.ndarray] = None
+    sampling_rate_hz: Optional[int] = None
+    samples_intact: Optional[Callable[[], bool]] = None
+
+
+@dataclass
+class CadenceSettings:
+    """
+    Class for defining how often windows are evaluated during continuous recording.
+
+    Attributes:
+        min_hop_seconds: The shortest time between the starts of successive
+                           windows, used while a cry is likely. Windows overlap
+                           when this is shorter than the recording duration.
+                             e.g. 0.5
+
+        max_hop_seconds: The longest time between the starts of successive
+                           windows, reached after a long quiet period. Audio
+                           between windows is not evaluated when this is longer
+                           than the recording duration.
+                             e.g. 8
+
+        backoff_factor: The hop is multiplied by this after every quiet window
+                          until it reaches max_hop_seconds.
+                            e.g. 2
+
+        active_prediction_threshold: A prediction at or above this immediately
+                                       drops the hop to min_hop_seconds.
+                                         e.g. 0.3
+
+        active_rms_energy_threshold: A window at least this loud immediately
+                                       drops the hop to min_hop_seconds.
+                                         e.g. 0.1
+
+        quiet_history_size: The number of most recent windows which must all be
+                              below both active thresholds before backing off.
+                                e.g. 3
+    """
+
+    min_hop_seconds: float = 0.5
+    max_hop_seconds: float = 8
+    backoff_factor: float = 2
+    active_prediction_threshold: float = 0.3
+    active_rms_energy_threshold: float = 0.1
+    quiet_history_size: int = 3
+
+    def __post_init__(self):
+        if not 0 < self.min_hop_seconds <= self.max_hop_seconds:
+            raise ValueError("hops must satisfy 0 < min_hop_seconds <= max_hop_seconds")
+        if self.backoff_factor < 1:
+            raise ValueError("backoff_factor must be at least 1")
+        if self.quiet_history_size < 1:
+            raise ValueError("quiet_history_size must be at least 1")
+
+
+@dataclass(frozen=True)
+class CadenceMetrics:
+    hop_seconds: float
+    min_hop_seconds: float
+    max_hop_seconds: float
+    windows_evaluated: int
+    hop_changes: int
+
+
+@dataclass(frozen=True)
+class ModelVersion:
+    """
+    A model together with the preprocessing it was trained with,
+    a classifier for the model must extract its features with these settings.
+
+    revision pins the model to a branch, tag or commit of its repository, the latest
+    is used when it is None. Predictions are stored under the tag, which includes the
+    revision, so those of different revisions of a model can be told apart.
+    """
+
+    model_id: str
+    mel_spectrogram_preprocessing_settings: MelSpectrogramPreprocessingSettings
+    revision: Optional[str] = None
+
+    @property
+    def tag(self) -> str:
+        if self.revision is None:
+            return self.model_id
+        return f"{self.model_id}@{self.revision}"
+
+    def __str__(self):
+        return f"{self.tag}__{self.mel_spectrogram_preprocessing_settings}"
+
+
+class IncompatibleModelError(Exception):
+    pass
+
+
+@dataclass
+class ShadowSettings:
+    """
+    Class for defining how candidate models are scored next to the primary model.
+
+    Attributes:
+        max_pending_windows: The number of windows waiting for the candidate
+                               models before new windows are dropped. Bounds the
+                               backlog when the candidates are slower than the
+                               primary model.
+                                 e.g. 2
+
+        niceness_increment: How much the niceness of the candidates' thread
+                              is raised above the process's, on Linux. Higher
+                              values give the primary model more of the CPU
+                              when both are running.
+                                e.g. 10
+
+        ensemble_weights: Optional weight per model id, including the primary
+                            model's. When set a weighted mean of the available
+                            scores is stored under the model id "ensemble".
+                              e.g. {"ericcbonet/cry-baby": 0.7, "candidate": 0.3}
+    """
+
+    max_pending_windows: int = 2
+    ensemble_weights: Optional[dict[str, float]] = None
+    niceness_increment: int = 10
+
+    def __post_init__(self):
+        if self.max_pending_windows < 1:
+            raise ValueError("max_pending_windows must be at least 1")
+        if self.niceness_increment < 0:
+            raise ValueError("niceness_increment can not be negative")
+
+
+@dataclass
+class SegmentationSettings:
+    """
+    Class for defining how a long recording is split up and scored.
+
+    Attributes:
+        hop_seconds: The time between the starts of successive windows. Windows
+                       overlap when it is shorter than the model's clip duration.
+                         e.g. 1
+
+        batch_size: The number of windows classified together by a worker.
+                      e.g. 16
+
+        block_seconds: The amount of audio read from the file at a time.
+                         e.g. 30
+
+        max_pending_batches: The number of batches read ahead of the workers.
+                               Together with batch_size and block_seconds it
+                               bounds the audio held in memory.
+                                 e.g. 4
+    """
+
+    hop_seconds: float = 1.0
+    batch_size: int = 16
+    block_seconds: float = 30
+    max_pending_batches: int = 4
+
+    def __post_init__(self):
+        if self.hop_seconds <= 0:
+            raise ValueError("hop_seconds must be positive")
+        if self.batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if self.block_seconds <= 0:
+            raise ValueError("block_seconds must be positive")
+        if self.max_pending_batches < 1:
+            raise ValueError("max_pending_batches must be at least 1")
+
+
+@dataclass(frozen=True)
+class ProbabilityTrack:
+    """
+    The probability of each window of a recording, in time order.
+    start_seconds[i] is the start of the window predictions[i] was made for,
+    each window is window_seconds long.
+    """
+
+    start_seconds: np.ndarray
+    predictions: np.ndarray
+    window_seconds: float
+
+
+class NotificationKind(enum.Enum):
+    PREDICTION = "prediction"
+    CRY_EVENT = "cry_event"
+
+
+@dataclass(frozen=True)
+class Notification:
+    """
+    Published to the notifiers as soon as a prediction or cry event is made.
+    fields hold plain JSON serialisable values, NaN and infinite floats are published
+    as null since JSON has no representation for them.
+    """
+
+    kind: NotificationKind
+    timestamp: datetime.datetime
+    fields: dict[str, Any]
+
+    def to_json(self) -> str:
+        fields = {
+            name: (
+                None if isinstance(value, float) and not math.isfinite(value) else value
+            )
+            for name, value in self.fields.items()
+        }
+        return json.dumps(
+            {"type": self.kind.value, "timestamp": self.timestamp.isoformat()} | fields,
+            allow_nan=False,
+        )
+
+
+@dataclass
+class NotificationSettings:
+    """
+    Class for defining how notifications are published.
+
+    Attributes:
+        publish_predictions: Publish every prediction, not only cry events.
+                               e.g. True
+
+        max_buffered_notifications: The number of notifications kept for each
+                                      notifier while it is slow or failing.
+                                      The oldest is dropped when it is full.
+                                        e.g. 1000
+
+        retry_interval_seconds: The wait before the first retry of a failed
+                                  notification, doubled after every failure.
+                                    e.g. 0.5
+
+        max_retry_interval_seconds: The longest wait between retries.
+                                      e.g. 30
+    """
+
+    publish_predictions: bool = True
+    max_buffered_notifications: int = 1000
+    retry_interval_seconds: float = 0.5
+    max_retry_interval_seconds: float = 30
+
+    def __post_init__(self):
+        if self.max_buffered_notifications < 1:
+            raise ValueError("max_buffered_notifications must be at least 1")
+        if not 0 < self.retry_interval_seconds <= self.max_retry_interval_seconds:
+            raise ValueError(
+                "retry intervals must satisfy 0 < retry_interval_seconds <= max_retry_interval_seconds"
+            )
+
+
+@dataclass(frozen=True)
+class ShardPrediction:
+    """
+    A prediction made by one inference process, sent to the process which aggregates
+    the predictions of every shard
+    """
+
+    audio_file_path: pathlib.Path
+    prediction: float
+    model_id: Optional[str]
+    shard_index: int
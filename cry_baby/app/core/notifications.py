@@ -0,0 +1,199 @@
+import collections
+import datetime
+import pathlib
+import threading
+from typing import Optional
+
+import hexalog.ports
+
+from cry_baby.app.core import ports
+from cry_baby.app.core.domain import (
+    CryEvent,
+    Notification,
+    NotificationKind,
+    NotificationSettings,
+)
+
+
+class _Channel:
+    """
+    The buffer and delivery thread of one notifier
+    """
+
+    def __init__(
+        self,
+        name: str,
+        notifier: ports.Notifier,
+        logger: hexalog.ports.Logger,
+        settings: NotificationSettings,
+    ):
+        self.name = name
+        self.notifier = notifier
+        self.logger = logger
+        self.settings = settings
+        self.delivered = 0
+        self.dropped = 0
+        self.failed_attempts = 0
+        self._buffer: collections.deque[Notification] = collections.deque()
+        self._condition = threading.Condition()
+        self._stopping = False
+        # Set when stopping times out, ends the retries of what is left in the buffer
+        self._abandoned = False
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stopping = False
+        self._abandoned = False
+        self.thread = threading.Thread(target=self._deliver_continuously)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def put(self, notification: Notification):
+        with self._condition:
+            if len(self._buffer) >= self.settings.max_buffered_notifications:
+                self._buffer.popleft()
+                self.dropped += 1
+            self._buffer.append(notification)
+            self._condition.notify()
+
+    def stop(self, timeout_seconds: float):
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self.thread is None:
+            return
+        self.thread.join(timeout_seconds)
+        if self.thread.is_alive():
+            with self._condition:
+                self.logger.warning(
+                    "Stopped before all notifications were delivered",
+                    notifier=self.name,
+                    undelivered=len(self._buffer),
+                )
+                self._abandoned = True
+                self._condition.notify()
+            # A send which is still blocked is left to its own timeout
+            self.thread.join(timeout_seconds)
+
+    def _deliver_continuously(self):
+        retry_interval_seconds = self.settings.retry_interval_seconds
+        while True:
+            with self._condition:
+                while not self._buffer and not self._stopping:
+                    self._condition.wait()
+                if not self._buffer:
+                    return
+                notification = self._buffer[0]
+            try:
+                self.notifier.send(notification)
+            except Exception as e:
+                self.failed_attempts += 1
+                self.logger.warning(
+                    "Failed to notify, retrying",
+                    notifier=self.name,
+                    error=str(e),
+                    retry_in_seconds=retry_interval_seconds,
+                    buffered=len(self._buffer),
+                )
+                with self._condition:
+                    if self._condition.wait_for(
+                        lambda: self._abandoned, retry_interval_seconds
+                    ):
+                        return
+                retry_interval_seconds = min(
+                    2 * retry_interval_seconds,
+                    self.settings.max_retry_interval_seconds,
+                )
+                continue
+            retry_interval_seconds = self.settings.retry_interval_seconds
+            with self._condition:
+                self.delivered += 1
+                # Unless it was dropped to make room while it was being sent
+                if self._buffer and self._buffer[0] is notification:
+                    self._buffer.popleft()
+
+
+class NotificationFanOut:
+    """
+    Publishes predictions and cry events to every notifier as soon as they are made.
+
+    Each notifier has its own bounded buffer and thread, so publishing never blocks the
+    classification thread and a slow or failing notifier does not hold up the others.
+    Failed notifications are retried in order with a growing interval, when a notifier
+    falls too far behind its oldest notifications are dropped.
+    """
+
+    def __init__(
+        self,
+        logger: hexalog.ports.Logger,
+        notifiers: dict[str, ports.Notifier],
+        settings: NotificationSettings,
+    ):
+        self.logger = logger
+        self.settings = settings
+        self.channels = [
+            _Channel(name, notifier, logger, settings)
+            for name, notifier in notifiers.items()
+        ]
+        self._started = False
+
+    @property
+    def dropped_notifications(self) -> int:
+        return sum(channel.dropped for channel in self.channels)
+
+    def start(self):
+        if self._started:
+            return
+        for channel in self.channels:
+            channel.start()
+        self._started = True
+        self.logger.info(
+            "Notifiers started",
+            notifiers=[channel.name for channel in self.channels],
+            publish_predictions=self.settings.publish_predictions,
+        )
+
+    def stop(self, timeout_seconds: float = 5.0):
+        """
+        Wait up to timeout_seconds for each notifier to deliver what is buffered
+        """
+        for channel in self.channels:
+            channel.stop(timeout_seconds)
+        self._started = False
+
+    def publish(self, notification: Notification):
+        for channel in self.channels:
+            channel.put(notification)
+
+    def publish_prediction(
+        self,
+        audio_file_path: pathlib.Path,
+        prediction: float,
+        model_id: Optional[str] = None,
+    ):
+        if not self.settings.publish_predictions:
+            return
+        self.publish(
+            Notification(
+                kind=NotificationKind.PREDICTION,
+                timestamp=datetime.datetime.now(),
+                fields={
+                    "audio_file_path": str(audio_file_path),
+                    "prediction": float(prediction),
+                    "model_id": model_id,
+                },
+            )
+        )
+
+    def publish_cry_event(self, event: CryEvent):
+        self.publish(
+            Notification(
+                kind=NotificationKind.CRY_EVENT,
+                timestamp=event.timestamp,
+                fields={
+                    "event_type": event.event_type.value,
+                    "smoothed_prediction": float(event.smoothed_prediction),
+                    "duration_seconds": event.duration_seconds,
+                },
+            )
+        )
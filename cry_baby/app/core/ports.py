@@ -3,6 +3,9 @@ import queue
 from abc import ABC, abstractmethod
 from typing import Optional
 
+import numpy as np
+
+from cry_baby.app.core.domain import Notification
 from cry_baby.pkg.audio_file_client.core.domain import (
     MelSpectrogramPreprocessingSettings,
 )
@@ -21,6 +24,46 @@ class Classifier(ABC):
         return the probability that the audio contains what the model is trained on
         """
 
+    @abstractmethod
+    def extract_mel_spectrogram(self, path_to_audio_file: pathlib.Path) -> np.ndarray:
+        """
+        Extract the features the model expects using mel_spectrogram_preprocessing_settings
+        returns the model input, shaped (1, number_of_mel_bands, frames, 1)
+        The array may be reused by the next call, copy it to keep it
+        """
+
+    @abstractmethod
+    def extract_mel_spectrogram_from_samples(
+        self, samples: np.ndarray, sampling_rate_hz: int
+    ) -> np.ndarray:
+        """
+        As extract_mel_spectrogram, for mono samples already in memory rather than a file
+        The samples are only read, a view of a recorder's buffer can be passed without copying
+        """
+
+    @abstractmethod
+    def classify_mel_spectrogram(self, mel_spectrogram: np.ndarray) -> float:
+        """
+        Classify features returned by extract_mel_spectrogram
+        Classifiers with equal mel_spectrogram_preprocessing_settings can share them
+        """
+
+    @abstractmethod
+    def classify_mel_spectrogram_batch(
+        self, mel_spectrograms: np.ndarray
+    ) -> np.ndarray:
+        """
+        Classify a batch of features shaped (batch, number_of_mel_bands, frames, 1)
+        return the probability for each, shaped (batch,)
+        """
+
+    @abstractmethod
+    def warm_up(self):
+        """
+        Run the model once on a dummy input so the first classification does not pay
+        for lazy initialisation
+        """
+
 
 class Recorder(ABC):
     @abstractmethod
@@ -33,7 +76,7 @@ class Recorder(ABC):
     def continuously_record(self) -> Optional[queue.Queue]:
         """
         Continuously record audio and save it to the path
-        returns a queue of the audio recorded and an event to stop the recording
+        returns a queue of the RecordedWindow's recorded and an event to stop the recording
 
         Usage:
         ```
@@ -42,6 +85,13 @@ class Recorder(ABC):
         ```
         """
 
+    @abstractmethod
+    def set_hop_seconds(self, hop_seconds: float):
+        """
+        Set the time between the starts of successive windows during continuous recording
+        Windows overlap when it is shorter than the recording duration, and audio is skipped when it is longer
+        """
+
     @abstractmethod
     def setup(self):
         """
@@ -57,10 +107,24 @@ class Recorder(ABC):
 
 class Repository(ABC):
     @abstractmethod
-    def save(self, audio_file_path: pathlib.Path, prediction: float):
+    def save(
+        self,
+        audio_file_path: pathlib.Path,
+        prediction: float,
+        model_id: Optional[str] = None,
+    ):
         """
         Save the audio file, and it's prediction to the repository
-        TODO: Probably should also store which version of the model was used
+        along with the id of the model which made the prediction
+        """
+
+
+class Notifier(ABC):
+    @abstractmethod
+    def send(self, notification: Notification):
+        """
+        Deliver the notification, raise if it was not delivered so it is retried
+        Called from a thread of its own, it may block
         """
 
 
@@ -0,0 +1,159 @@
+import collections
+import contextlib
+import datetime
+import os
+import pathlib
+import sys
+import threading
+import time
+from typing import ContextManager, Iterator, Optional
+
+import hexalog.ports
+
+# Samples are attributed to the first of these found walking from the innermost frame outwards
+SAMPLED_STAGES = {
+    "decode": {"read", "_read_mono", "load", "_load"},
+    "resample": {"resample", "_resample"},
+    "stft": {"stft", "rfft", "melspectrogram", "_melspectrogram"},
+    "postprocess": {"postprocess_into"},
+    "inference": {"classify_mel_spectrogram", "predict", "invoke"},
+}
+
+_UNTIMED = contextlib.nullcontext()
+
+
+def untimed_stage(name: str) -> ContextManager:
+    """
+    Used in place of ClipProfiler.stage when no clips are being profiled
+    """
+    return _UNTIMED
+
+
+class ClipProfiler:
+    """
+    Profiles a number of consecutive clips on request, e.g. from a signal handler.
+
+    While active a sampling thread records the call stack of the thread handling the
+    clips, which is written in the collapsed stack format flamegraph tools read.
+    The time spent in each stage of the service, and the sampled time in decoding,
+    resampling, the STFT and inference, is logged once the clips are done.
+    Nothing is sampled or timed while no clips are requested.
+    """
+
+    def __init__(
+        self,
+        logger: hexalog.ports.Logger,
+        output_path: pathlib.Path,
+        sampling_interval_seconds: float = 0.001,
+    ):
+        self.logger = logger
+        self.output_path = output_path
+        self.sampling_interval_seconds = sampling_interval_seconds
+        self.clips_remaining = 0
+        self._stage_seconds: collections.Counter[str] = collections.Counter()
+        self._stacks: collections.Counter[str] = collections.Counter()
+        self._clips_profiled = 0
+        self._sampler: Optional[threading.Thread] = None
+        self._stop_sampling = threading.Event()
+        # Time spent waiting for the next clip is not sampled
+        self._in_clip = False
+
+    @property
+    def active(self) -> bool:
+        return self.clips_remaining > 0
+
+    def request(self, number_of_clips: int):
+        """
+        Profile the next number_of_clips clips, safe to call from a signal handler
+        """
+        self.clips_remaining = number_of_clips
+
+    @contextlib.contextmanager
+    def profile_clip(self) -> Iterator["ClipProfiler"]:
+        if self._sampler is None:
+            self._start_sampling(threading.get_ident())
+        self._in_clip = True
+        try:
+            yield self
+        finally:
+            self._in_clip = False
+            self._clips_profiled += 1
+            self.clips_remaining -= 1
+            if self.clips_remaining <= 0:
+                self._finish()
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._stage_seconds[name] += time.perf_counter() - started
+
+    def _start_sampling(self, thread_id: int):
+        self._stage_seconds.clear()
+        self._stacks.clear()
+        self._clips_profiled = 0
+        self._stop_sampling.clear()
+        self._sampler = threading.Thread(target=self._sample, args=(thread_id,))
+        self._sampler.daemon = True
+        self._sampler.start()
+
+    def _sample(self, thread_id: int):
+        while not self._stop_sampling.wait(self.sampling_interval_seconds):
+            if not self._in_clip:
+                continue
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self._stacks[";".join(reversed(stack))] += 1
+
+    def _finish(self):
+        self._stop_sampling.set()
+        self._sampler.join()
+        self._sampler = None
+
+        self.output_path.mkdir(parents=True, exist_ok=True)
+        collapsed_path = (
+            self.output_path
+            / f"cry_baby_{datetime.datetime.now().strftime('%Y%m%dT%H%M%S')}.collapsed"
+        )
+        with open(collapsed_path, "w") as file:
+            for stack, count in self._stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+        self.logger.info(
+            "Profiled clips",
+            clips=self._clips_profiled,
+            collapsed_stacks=str(collapsed_path),
+            **{
+                f"{name}_ms_per_clip": round(1000 * seconds / self._clips_profiled, 2)
+                for name, seconds in self._stage_seconds.items()
+            },
+            **{
+                f"sampled_{name}_percent": percent
+                for name, percent in self._sampled_breakdown().items()
+            },
+        )
+
+    def _sampled_breakdown(self) -> dict[str, float]:
+        total = sum(self._stacks.values())
+        if total == 0:
+            return {}
+        samples: collections.Counter[str] = collections.Counter()
+        for stack, count in self._stacks.items():
+            samples[_sampled_stage(stack)] += count
+        return {name: round(100 * count / total, 1) for name, count in samples.items()}
+
+
+def _sampled_stage(stack: str) -> str:
+    for frame in reversed(stack.split(";")):
+        function_name = frame.rsplit(":", 1)[-1]
+        for name, function_names in SAMPLED_STAGES.items():
+            if function_name in function_names:
+                return name
+    return "other"
@@ -0,0 +1,110 @@
+import threading
+from typing import Callable
+
+import hexalog.ports
+
+from cry_baby.app.core import ports
+from cry_baby.app.core.domain import IncompatibleModelError, ModelVersion
+
+ClassifierLoader = Callable[[ModelVersion], ports.Classifier]
+
+
+class ModelRegistry:
+    """
+    Holds the classifier the service uses and swaps in new model versions while recording continues.
+
+    New versions are loaded and warmed up on a background thread, the swap itself is a
+    single assignment so the service picks the new classifier up at the start of its next window.
+    """
+
+    def __init__(
+        self,
+        logger: hexalog.ports.Logger,
+        model_version: ModelVersion,
+        classifier: ports.Classifier,
+        capture_duration_seconds: float,
+        capture_sampling_rate_hz: int,
+    ):
+        self.logger = logger
+        self.capture_duration_seconds = capture_duration_seconds
+        self.capture_sampling_rate_hz = capture_sampling_rate_hz
+        self._check_compatible(model_version)
+        self._active: tuple[ModelVersion, ports.Classifier] = (
+            model_version,
+            classifier,
+        )
+        self._swap_lock = threading.Lock()
+
+    @property
+    def active(self) -> tuple[ModelVersion, ports.Classifier]:
+        """
+        The active model version and its classifier, read together so they always match
+        """
+        return self._active
+
+    @property
+    def model_version(self) -> ModelVersion:
+        return self._active[0]
+
+    @property
+    def classifier(self) -> ports.Classifier:
+        return self._active[1]
+
+    def load_in_background(
+        self, model_version: ModelVersion, loader: ClassifierLoader
+    ) -> threading.Thread:
+        """
+        Load, warm up and swap in the model version without blocking the caller
+        Failures are logged and the active model is kept
+        """
+        thread = threading.Thread(target=self.load, args=(model_version, loader))
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def swap(self, model_version: ModelVersion, classifier: ports.Classifier):
+        """
+        Warm up the classifier and make it the active one
+        raises IncompatibleModelError if its preprocessing does not fit the audio being captured
+        """
+        self._check_compatible(model_version)
+        classifier.warm_up()
+        with self._swap_lock:
+            previous_model_version = self.model_version
+            self._active = (model_version, classifier)
+        self.logger.info(
+            "Swapped model",
+            previous_model_version=str(previous_model_version),
+            model_version=str(model_version),
+        )
+
+    def load(self, model_version: ModelVersion, loader: ClassifierLoader):
+        """
+        As load_in_background, blocking the caller until the swap is done or has failed
+        """
+        self.logger.info("Loading model", model_version=str(model_version))
+        try:
+            self._check_compatible(model_version)
+            self.swap(model_version, loader(model_version))
+        except Exception as e:
+            self.logger.error(
+                "Failed to swap model, keeping the active model",
+                model_version=str(model_version),
+                active_model_version=str(self.model_version),
+                error=str(e),
+            )
+
+    def _check_compatible(self, model_version: ModelVersion):
+        settings = model_version.mel_spectrogram_preprocessing_settings
+        if round(settings.duration_seconds, 1) != round(
+            self.capture_duration_seconds, 1
+        ):
+            raise IncompatibleModelError(
+                f"Model {model_version.model_id} expects {settings.duration_seconds} second clips, "
+                f"but {self.capture_duration_seconds} second clips are being captured"
+            )
+        if settings.sampling_rate_hz > self.capture_sampling_rate_hz:
+            raise IncompatibleModelError(
+                f"Model {model_version.model_id} expects a sampling rate of {settings.sampling_rate_hz} Hz, "
+                f"but audio is being captured at {self.capture_sampling_rate_hz} Hz"
+            )
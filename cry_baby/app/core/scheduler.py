@@ -0,0 +1,63 @@
+import collections
+
+from cry_baby.app.core.domain import CadenceMetrics, CadenceSettings
+
+
+class CadenceScheduler:
+    """
+    Chooses the hop between evaluated windows from the recent predictions and energy.
+
+    Any active window (likely crying or loud) drops the hop straight to
+    min_hop_seconds. Once the last quiet_history_size windows were all quiet the
+    hop grows by backoff_factor per window until it reaches max_hop_seconds.
+    """
+
+    def __init__(self, settings: CadenceSettings, initial_hop_seconds: float):
+        self.settings = settings
+        self.hop_seconds = min(
+            max(initial_hop_seconds, settings.min_hop_seconds),
+            settings.max_hop_seconds,
+        )
+        self._recently_active: collections.deque[bool] = collections.deque(
+            maxlen=settings.quiet_history_size
+        )
+        self._windows_evaluated = 0
+        self._hop_changes = 0
+
+    def update(self, prediction: float, rms_energy: float) -> float:
+        """
+        Record the latest window and return the hop to use for the next one
+        """
+        self._windows_evaluated += 1
+        active = (
+            prediction >= self.settings.active_prediction_threshold
+            or rms_energy >= self.settings.active_rms_energy_threshold
+        )
+        self._recently_active.append(active)
+
+        if active:
+            hop_seconds = self.settings.min_hop_seconds
+        elif len(self._recently_active) == self._recently_active.maxlen and not any(
+            self._recently_active
+        ):
+            hop_seconds = min(
+                self.hop_seconds * self.settings.backoff_factor,
+                self.settings.max_hop_seconds,
+            )
+        else:
+            hop_seconds = self.hop_seconds
+
+        if hop_seconds != self.hop_seconds:
+            self._hop_changes += 1
+            self.hop_seconds = hop_seconds
+        return self.hop_seconds
+
+    @property
+    def metrics(self) -> CadenceMetrics:
+        return CadenceMetrics(
+            hop_seconds=self.hop_seconds,
+            min_hop_seconds=self.settings.min_hop_seconds,
+            max_hop_seconds=self.settings.max_hop_seconds,
+            windows_evaluated=self._windows_evaluated,
+            hop_changes=self._hop_changes,
+        )
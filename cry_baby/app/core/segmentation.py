@@ -0,0 +1,162 @@
+import pathlib
+import queue
+import threading
+import time
+from typing import Optional
+
+import hexalog.ports
+import numpy as np
+
+from cry_baby.app.core import ports
+from cry_baby.app.core.domain import ProbabilityTrack, SegmentationSettings
+from cry_baby.pkg.audio_file_client.core.domain import AudioWindow
+from cry_baby.pkg.audio_file_client.core.ports import AudioFileClient
+from cry_baby.pkg.audio_file_client.core.spectrogram import calc_target_shape
+
+_Batch = tuple[int, list[AudioWindow]]
+
+
+class RecordingSegmenter:
+    """
+    Scores a long recording, e.g. a whole night, window by window without cropping it
+    into files.
+
+    The recording is streamed in blocks and cut into windows of the model's clip duration,
+    which are classified in batches by one worker thread per classifier. Classifiers reuse
+    their buffers, so each worker needs its own. The reader waits while max_pending_batches
+    are queued, so memory stays bounded however long the recording is.
+    """
+
+    def __init__(
+        self,
+        logger: hexalog.ports.Logger,
+        audio_file_client: AudioFileClient,
+        classifiers: list[ports.Classifier],
+        settings: SegmentationSettings,
+    ):
+        if not classifiers:
+            raise ValueError("At least one classifier is needed")
+        preprocessing_settings = {
+            str(classifier.mel_spectrogram_preprocessing_settings)
+            for classifier in classifiers
+        }
+        if len(preprocessing_settings) != 1:
+            raise ValueError(
+                f"The classifiers must share their preprocessing settings, got {preprocessing_settings}"
+            )
+        self.logger = logger
+        self.audio_file_client = audio_file_client
+        self.classifiers = classifiers
+        self.settings = settings
+        self.window_seconds = classifiers[
+            0
+        ].mel_spectrogram_preprocessing_settings.duration_seconds
+
+    def score(self, path: pathlib.Path) -> ProbabilityTrack:
+        started = time.perf_counter()
+        batches: queue.Queue[Optional[_Batch]] = queue.Queue(
+            maxsize=self.settings.max_pending_batches
+        )
+        results: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+        errors: list[Exception] = []
+        workers = [
+            threading.Thread(
+                target=self._score_batches, args=(classifier, batches, results, errors)
+            )
+            for classifier in self.classifiers
+        ]
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+
+        number_of_batches = 0
+        try:
+            batch: list[AudioWindow] = []
+            for window in self.audio_file_client.stream_windows(
+                path,
+                duration_seconds=self.window_seconds,
+                hop_seconds=self.settings.hop_seconds,
+                block_seconds=self.settings.block_seconds,
+            ):
+                batch.append(window)
+                if len(batch) == self.settings.batch_size:
+                    batches.put((number_of_batches, batch))
+                    number_of_batches += 1
+                    batch = []
+                if errors:
+                    break
+            if batch and not errors:
+                batches.put((number_of_batches, batch))
+        finally:
+            for _ in workers:
+                batches.put(None)
+            for worker in workers:
+                worker.join()
+        if errors:
+            raise errors[0]
+
+        ordered = [results[index] for index in sorted(results)]
+        track = ProbabilityTrack(
+            start_seconds=np.concatenate([starts for starts, _ in ordered] or [[]]),
+            predictions=np.concatenate(
+                [predictions for _, predictions in ordered] or [[]]
+            ).astype(np.float32),
+            window_seconds=self.window_seconds,
+        )
+        elapsed_seconds = time.perf_counter() - started
+        recording_seconds = 0.0
+        if len(track.start_seconds):
+            recording_seconds = float(track.start_seconds[-1]) + self.window_seconds
+        self.logger.info(
+            "Scored recording",
+            path=str(path),
+            windows=len(track.predictions),
+            recording_seconds=round(recording_seconds, 1),
+            elapsed_seconds=round(elapsed_seconds, 1),
+            realtime_factor=round(recording_seconds / elapsed_seconds, 1),
+        )
+        return track
+
+    def _score_batches(
+        self,
+        classifier: ports.Classifier,
+        batches: queue.Queue,
+        results: dict[int, tuple[np.ndarray, np.ndarray]],
+        errors: list[Exception],
+    ):
+        settings = classifier.mel_spectrogram_preprocessing_settings
+        # Each window's features are copied out of the classifier's buffer into the batch
+        features = np.zeros(
+            (
+                self.settings.batch_size,
+                *calc_target_shape(
+                    settings.sampling_rate_hz,
+                    settings.duration_seconds,
+                    settings.number_of_mel_bands,
+                    settings.hop_length,
+                ),
+                1,
+            ),
+            dtype=np.float32,
+        )
+        while (item := batches.get()) is not None:
+            # After a failure the queue is still drained so the reader is never blocked
+            if errors:
+                continue
+            index, windows = item
+            try:
+                for i, window in enumerate(windows):
+                    features[i] = classifier.extract_mel_spectrogram_from_samples(
+                        window.samples, window.sampling_rate_hz
+                    )[0]
+                predictions = classifier.classify_mel_spectrogram_batch(
+                    features[: len(windows)]
+                )
+                results[index] = (
+                    np.array([window.start_seconds for window in windows]),
+                    # Copied as predictions may be a view of the reused features
+                    np.array(predictions, dtype=np.float32),
+                )
+            except Exception as e:
+                self.logger.error("Failed to score windows", error=str(e))
+                errors.append(e)
@@ -1,10 +1,19 @@
+import contextlib
+import datetime
 import queue
 import threading
-from typing import Optional
+from typing import Callable, ContextManager, Optional
 
 import hexalog.ports
 
 from cry_baby.app.core import ports
+from cry_baby.app.core.detector import CryDetector
+from cry_baby.app.core.domain import RecordedWindow
+from cry_baby.app.core.notifications import NotificationFanOut
+from cry_baby.app.core.profiler import ClipProfiler, untimed_stage
+from cry_baby.app.core.registry import ModelRegistry
+from cry_baby.app.core.scheduler import CadenceScheduler
+from cry_baby.app.core.shadow import ShadowScorer
 
 
 class CryBabyService(ports.Service):
@@ -14,11 +23,28 @@ class CryBabyService(ports.Service):
         classifier: ports.Classifier,
         recorder: ports.Recorder,
         repository: ports.Repository,
+        detector: Optional[CryDetector] = None,
+        scheduler: Optional[CadenceScheduler] = None,
+        registry: Optional[ModelRegistry] = None,
+        shadow_scorer: Optional[ShadowScorer] = None,
+        profiler: Optional[ClipProfiler] = None,
+        notifier: Optional[NotificationFanOut] = None,
     ):
         self.logger = logger
         self.classifier = classifier
         self.recorder = recorder
         self.repository = repository
+        self.detector = detector
+        self.scheduler = scheduler
+        # When set the registry's active classifier replaces classifier, so models can be swapped while recording
+        self.registry = registry
+        self.shadow_scorer = shadow_scorer
+        self.profiler = profiler
+        self.notifier = notifier
+        # Windows whose samples were overwritten by the recorder before they were used
+        self.windows_overwritten = 0
+        # Windows taken off the recorder's queue and handled, shows the service is making progress
+        self.windows_handled = 0
 
     def evaluate_from_microphone(
         self,
@@ -29,9 +55,13 @@ class CryBabyService(ports.Service):
         """
         self.logger.info("Service beginning to evaluate audio from microphone")
         audio_file = self.recorder.record()
-        return self.classifier.classify(audio_file)
+        return self._active_classifier().classify(audio_file)
 
     def continously_evaluate_from_microphone(self) -> Optional[queue.Queue]:
+        if self.shadow_scorer is not None:
+            self.shadow_scorer.start()
+        if self.notifier is not None:
+            self.notifier.start()
         file_written_notification_queue = self.recorder.continuously_record()
         signal_thread = threading.Thread(
             target=self._handle_files_written,
@@ -48,13 +78,118 @@ class CryBabyService(ports.Service):
         self, file_written_queue: queue.Queue, classifier: ports.Classifier
     ):
         while True:
-            file_path = file_written_queue.get()
-            self.logger.debug(f"File written: {file_path}")
-            prediction = classifier.classify(file_path)
-            self.logger.debug(f"Prediction: {prediction}")
-            self.repository.save(file_path, prediction)
+            window: RecordedWindow = file_written_queue.get()
+            with (
+                self.shadow_scorer.primary_busy()
+                if self.shadow_scorer is not None
+                else contextlib.nullcontext()
+            ):
+                if self.profiler is not None and self.profiler.active:
+                    with self.profiler.profile_clip() as profiler:
+                        self._handle_window(window, classifier, profiler.stage)
+                else:
+                    self._handle_window(window, classifier, untimed_stage)
+            self.windows_handled += 1
+
+    def _handle_window(
+        self,
+        window: RecordedWindow,
+        classifier: ports.Classifier,
+        stage: Callable[[str], ContextManager],
+    ):
+        file_path = window.path
+        self.logger.debug(f"File written: {file_path}")
+        model_id = None
+        if self.registry is not None:
+            # Read once per window so a swap never happens part way through one
+            model_version, classifier = self.registry.active
+            model_id = model_version.tag
+        with stage("extract_mel_spectrogram"):
+            if window.samples is not None and window.sampling_rate_hz is not None:
+                if not self._samples_intact(window):
+                    return
+                mel_spectrogram = classifier.extract_mel_spectrogram_from_samples(
+                    window.samples, window.sampling_rate_hz
+                )
+                # The samples may have been overwritten part way through
+                if not self._samples_intact(window):
+                    return
+            else:
+                mel_spectrogram = classifier.extract_mel_spectrogram(file_path)
+        with stage("classify"):
+            prediction = classifier.classify_mel_spectrogram(mel_spectrogram)
+        self.logger.debug(f"Prediction: {prediction}")
+        with stage("save"):
+            self.repository.save(file_path, prediction, model_id=model_id)
+        if self.notifier is not None:
+            with stage("notify"):
+                self.notifier.publish_prediction(file_path, prediction, model_id)
+        if self.shadow_scorer is not None:
+            with stage("shadow_submit"):
+                self.shadow_scorer.submit(
+                    file_path,
+                    # The classifier reuses its buffer for the next window
+                    mel_spectrogram.copy(),
+                    classifier.mel_spectrogram_preprocessing_settings,
+                    primary_model_id=model_id,
+                    primary_prediction=prediction,
+                )
+        with stage("detect"):
+            self._detect(prediction)
+        with stage("schedule"):
+            self._schedule(prediction, window.rms_energy)
+
+    def _samples_intact(self, window: RecordedWindow) -> bool:
+        if window.samples_intact is None or window.samples_intact():
+            return True
+        self.windows_overwritten += 1
+        self.logger.warning(
+            "Window was overwritten before it was classified, skipping it",
+            audio_file_path=window.path,
+            windows_overwritten=self.windows_overwritten,
+        )
+        return False
+
+    def _active_classifier(self) -> ports.Classifier:
+        if self.registry is not None:
+            return self.registry.classifier
+        return self.classifier
+
+    def _schedule(self, prediction: float, rms_energy: float):
+        if self.scheduler is None:
+            return
+        previous_hop_seconds = self.scheduler.hop_seconds
+        hop_seconds = self.scheduler.update(prediction, rms_energy)
+        if hop_seconds == previous_hop_seconds:
+            return
+        self.recorder.set_hop_seconds(hop_seconds)
+        metrics = self.scheduler.metrics
+        self.logger.info(
+            "Inference cadence changed",
+            hop_seconds=metrics.hop_seconds,
+            min_hop_seconds=metrics.min_hop_seconds,
+            max_hop_seconds=metrics.max_hop_seconds,
+            windows_evaluated=metrics.windows_evaluated,
+            hop_changes=metrics.hop_changes,
+        )
+
+    def _detect(self, prediction: float):
+        if self.detector is None:
+            return
+        event = self.detector.update(prediction, datetime.datetime.now())
+        if event is None:
+            return
+        self.logger.info(
+            "Cry event",
+            event_type=event.event_type.value,
+            smoothed_prediction=event.smoothed_prediction,
+            duration_seconds=event.duration_seconds,
+        )
+        if self.notifier is not None:
+            self.notifier.publish_cry_event(event)
 
     def stop_continuous_evaluation(self):
         self.recorder.tear_down()
+        if self.notifier is not None:
+            self.notifier.stop()
         self.logger.info("Service stopping continuous evaluation")
-        print(self.thread)
@@ -0,0 +1,191 @@
+import contextlib
+import os
+import pathlib
+import queue
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+import hexalog.ports
+import numpy as np
+
+from cry_baby.app.core import ports
+from cry_baby.app.core.domain import ShadowSettings
+from cry_baby.pkg.audio_file_client.core.domain import (
+    MelSpectrogramPreprocessingSettings,
+)
+
+ENSEMBLE_MODEL_ID = "ensemble"
+
+
+@dataclass(frozen=True)
+class _ShadowJob:
+    audio_file_path: pathlib.Path
+    mel_spectrogram: np.ndarray
+    mel_spectrogram_preprocessing_settings: MelSpectrogramPreprocessingSettings
+    primary_model_id: Optional[str]
+    primary_prediction: float
+
+
+class ShadowScorer:
+    """
+    Scores candidate models on the windows the primary model has already classified.
+
+    Candidates run on their own thread behind a small bounded queue, when they fall
+    behind windows are dropped rather than queueing up. They share the process and
+    its CPU with the primary model, so a candidate only starts on a window while the
+    primary model is idle, between windows, and on Linux its thread runs at a lower
+    priority. A candidate which is still running when the next window arrives does
+    compete with the primary model until it finishes.
+    Candidates with the same preprocessing settings as the primary model reuse its
+    mel spectrogram instead of extracting it again.
+    """
+
+    def __init__(
+        self,
+        logger: hexalog.ports.Logger,
+        candidates: dict[str, ports.Classifier],
+        repository: ports.Repository,
+        settings: ShadowSettings,
+    ):
+        self.logger = logger
+        self.candidates = candidates
+        self.repository = repository
+        self.settings = settings
+        self.dropped_windows = 0
+        self._jobs: queue.Queue[_ShadowJob] = queue.Queue(
+            maxsize=settings.max_pending_windows
+        )
+        self.thread: Optional[threading.Thread] = None
+        self._primary_idle = threading.Event()
+        self._primary_idle.set()
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self._score_continuously)
+        self.thread.daemon = True
+        self.thread.start()
+        self.logger.info(
+            "Shadow scoring started", candidates=list(self.candidates.keys())
+        )
+
+    @contextlib.contextmanager
+    def primary_busy(self) -> Iterator[None]:
+        """
+        Hold candidates back while the primary model handles a window
+        """
+        self._primary_idle.clear()
+        try:
+            yield
+        finally:
+            self._primary_idle.set()
+
+    def submit(
+        self,
+        audio_file_path: pathlib.Path,
+        mel_spectrogram: np.ndarray,
+        mel_spectrogram_preprocessing_settings: MelSpectrogramPreprocessingSettings,
+        primary_model_id: Optional[str],
+        primary_prediction: float,
+    ):
+        """
+        Queue a window for the candidates without blocking
+        """
+        try:
+            self._jobs.put_nowait(
+                _ShadowJob(
+                    audio_file_path=audio_file_path,
+                    mel_spectrogram=mel_spectrogram,
+                    mel_spectrogram_preprocessing_settings=mel_spectrogram_preprocessing_settings,
+                    primary_model_id=primary_model_id,
+                    primary_prediction=primary_prediction,
+                )
+            )
+        except queue.Full:
+            self.dropped_windows += 1
+            self.logger.warning(
+                "Shadow models are behind, dropping window",
+                audio_file_path=audio_file_path,
+                dropped_windows=self.dropped_windows,
+            )
+
+    def score(self, job: _ShadowJob) -> dict[str, float]:
+        predictions = {}
+        for model_id, classifier in self.candidates.items():
+            self._primary_idle.wait()
+            try:
+                if (
+                    classifier.mel_spectrogram_preprocessing_settings
+                    == job.mel_spectrogram_preprocessing_settings
+                ):
+                    prediction = classifier.classify_mel_spectrogram(
+                        job.mel_spectrogram
+                    )
+                else:
+                    prediction = classifier.classify(job.audio_file_path)
+            except Exception as e:
+                self.logger.error(
+                    "Shadow model failed to classify",
+                    model_id=model_id,
+                    audio_file_path=job.audio_file_path,
+                    error=str(e),
+                )
+                continue
+            predictions[model_id] = prediction
+            self.repository.save(job.audio_file_path, prediction, model_id=model_id)
+
+        if self.settings.ensemble_weights:
+            scores = dict(predictions)
+            if job.primary_model_id is not None:
+                scores[job.primary_model_id] = job.primary_prediction
+            ensemble_prediction = self._combine(scores)
+            if ensemble_prediction is not None:
+                predictions[ENSEMBLE_MODEL_ID] = ensemble_prediction
+                self.repository.save(
+                    job.audio_file_path, ensemble_prediction, model_id=ENSEMBLE_MODEL_ID
+                )
+        return predictions
+
+    def _combine(self, scores: dict[str, float]) -> Optional[float]:
+        """
+        Weighted mean over the models in ensemble_weights which produced a score
+        """
+        weights = {
+            model_id: weight
+            for model_id, weight in self.settings.ensemble_weights.items()
+            if model_id in scores
+        }
+        total_weight = sum(weights.values())
+        if total_weight <= 0:
+            return None
+        return (
+            sum(scores[model_id] * weight for model_id, weight in weights.items())
+            / total_weight
+        )
+
+    def _score_continuously(self):
+        self._lower_priority()
+        while True:
+            self.score(self._jobs.get())
+
+    def _lower_priority(self):
+        """
+        Raise the niceness of the calling thread, Linux schedules threads by their own
+        niceness so the primary model's thread keeps its priority
+        """
+        if not sys.platform.startswith("linux"):
+            return
+        thread_id = threading.get_native_id()
+        try:
+            niceness = os.getpriority(os.PRIO_PROCESS, thread_id)
+            os.setpriority(
+                os.PRIO_PROCESS,
+                thread_id,
+                min(niceness + self.settings.niceness_increment, 19),
+            )
+        except OSError as e:
+            self.logger.warning(
+                "Could not lower the priority of the shadow models", error=str(e)
+            )
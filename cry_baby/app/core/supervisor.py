@@ -0,0 +1,177 @@
+import multiprocessing
+import threading
+import time
+from dataclasses import dataclass, field
+from multiprocessing.context import BaseContext
+from multiprocessing.process import BaseProcess
+from multiprocessing.sharedctypes import Synchronized
+from typing import Callable, Optional
+
+import hexalog.ports
+
+
+@dataclass
+class SupervisedProcess:
+    name: str
+    target: Callable
+    args: tuple = field(default_factory=tuple)
+    process: Optional[BaseProcess] = None
+    started_at: float = 0.0
+    restarts: int = 0
+    # Counter the process increments as it makes progress, passed to target as its last argument
+    heartbeat: Optional[Synchronized] = None
+    heartbeat_timeout_seconds: Optional[float] = None
+    last_heartbeat: int = 0
+    last_heartbeat_at: float = 0.0
+
+
+class ProcessSupervisor:
+    """
+    Runs each added target in its own process and restarts any which exit, so a crashed
+    inference process is replaced without interrupting capture or the other processes.
+
+    Processes are started with spawn by default, nothing from the supervisor such as
+    loaded models or threads is inherited. A process which keeps crashing is restarted
+    at most once every restart_delay_seconds.
+
+    A process can also be added with a heartbeat, a shared counter it increments as it
+    makes progress. A process whose heartbeat has not changed for heartbeat_timeout_seconds
+    is assumed to be hung, and is terminated and restarted.
+    """
+
+    def __init__(
+        self,
+        logger: hexalog.ports.Logger,
+        context: Optional[BaseContext] = None,
+        restart_delay_seconds: float = 1.0,
+        poll_interval_seconds: float = 0.5,
+    ):
+        self.logger = logger
+        self.context = context or multiprocessing.get_context("spawn")
+        self.restart_delay_seconds = restart_delay_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.processes: dict[str, SupervisedProcess] = {}
+
+    def add(
+        self,
+        name: str,
+        target: Callable,
+        *args,
+        heartbeat_timeout_seconds: Optional[float] = None,
+    ):
+        """
+        target and args must be picklable, e.g. a module level function and plain values
+        With heartbeat_timeout_seconds the heartbeat counter is passed to target after args,
+        the timeout must allow for the time the process takes to start up
+        """
+        if name in self.processes:
+            raise ValueError(f"A process named {name} is already supervised")
+        if heartbeat_timeout_seconds is not None and heartbeat_timeout_seconds <= 0:
+            raise ValueError("heartbeat_timeout_seconds must be positive")
+        supervised = SupervisedProcess(name=name, target=target, args=args)
+        if heartbeat_timeout_seconds is not None:
+            supervised.heartbeat = self.context.Value("Q", 0)
+            supervised.heartbeat_timeout_seconds = heartbeat_timeout_seconds
+        self.processes[name] = supervised
+
+    def start(self):
+        for supervised in self.processes.values():
+            self._start(supervised)
+
+    def check(self) -> list[str]:
+        """
+        Restart the processes which have exited or whose heartbeat has gone stale
+        returns the names of the processes restarted
+        """
+        restarted = []
+        for supervised in self.processes.values():
+            process = supervised.process
+            if process is None:
+                continue
+            if process.is_alive():
+                if not self._heartbeat_stale(supervised):
+                    continue
+                supervised.restarts += 1
+                self.logger.error(
+                    "Process stopped making progress, restarting it",
+                    process=supervised.name,
+                    heartbeat_timeout_seconds=supervised.heartbeat_timeout_seconds,
+                    restarts=supervised.restarts,
+                )
+                self._terminate(supervised)
+            else:
+                if (
+                    time.monotonic() - supervised.started_at
+                    < self.restart_delay_seconds
+                ):
+                    continue
+                supervised.restarts += 1
+                self.logger.error(
+                    "Process exited, restarting it",
+                    process=supervised.name,
+                    exitcode=process.exitcode,
+                    restarts=supervised.restarts,
+                )
+            process.close()
+            self._start(supervised)
+            restarted.append(supervised.name)
+        return restarted
+
+    def run(self, stop_event: threading.Event):
+        """
+        Start the processes and keep them running until stop_event is set
+        """
+        self.start()
+        try:
+            while not stop_event.wait(self.poll_interval_seconds):
+                self.check()
+        finally:
+            self.stop()
+
+    def stop(self, timeout_seconds: float = 5.0):
+        for supervised in self.processes.values():
+            if supervised.process is not None and supervised.process.is_alive():
+                supervised.process.terminate()
+        for supervised in self.processes.values():
+            if supervised.process is None:
+                continue
+            self._terminate(supervised, timeout_seconds)
+            supervised.process = None
+        self.logger.info("Stopped supervised processes")
+
+    def _terminate(self, supervised: SupervisedProcess, timeout_seconds: float = 5.0):
+        supervised.process.terminate()
+        supervised.process.join(timeout_seconds)
+        if supervised.process.is_alive():
+            self.logger.warning(
+                "Process did not stop, killing it", process=supervised.name
+            )
+            supervised.process.kill()
+            supervised.process.join()
+
+    def _heartbeat_stale(self, supervised: SupervisedProcess) -> bool:
+        if supervised.heartbeat is None:
+            return False
+        heartbeat = supervised.heartbeat.value
+        now = time.monotonic()
+        if heartbeat != supervised.last_heartbeat:
+            supervised.last_heartbeat = heartbeat
+            supervised.last_heartbeat_at = now
+            return False
+        return now - supervised.last_heartbeat_at > supervised.heartbeat_timeout_seconds
+
+    def _start(self, supervised: SupervisedProcess):
+        args = supervised.args
+        if supervised.heartbeat is not None:
+            args = (*args, supervised.heartbeat)
+        process = self.context.Process(
+            target=supervised.target, args=args, name=supervised.name
+        )
+        process.daemon = True
+        process.start()
+        supervised.process = process
+        supervised.started_at = time.monotonic()
+        if supervised.heartbeat is not None:
+            supervised.last_heartbeat = supervised.heartbeat.value
+            supervised.last_heartbeat_at = supervised.started_at
+        self.logger.info("Started process", process=supervised.name, pid=process.pid)
@@ -0,0 +1,99 @@
+import pathlib
+import queue
+from typing import Optional
+
+import numpy as np
+
+from cry_baby.app.core import ports
+from cry_baby.pkg.audio_file_client.core.domain import (
+    MelSpectrogramPreprocessingSettings,
+)
+
+SETTINGS = MelSpectrogramPreprocessingSettings(
+    sampling_rate_hz=16000,
+    number_of_mel_bands=128,
+    duration_seconds=4,
+    hop_length=512,
+)
+
+
+class StubClassifier(ports.Classifier):
+    """
+    Predicts a fixed probability and counts how often features were extracted
+    """
+
+    def __init__(
+        self,
+        prediction: float,
+        mel_spectrogram_preprocessing_settings: MelSpectrogramPreprocessingSettings = SETTINGS,
+    ):
+        self.prediction = prediction
+        self.mel_spectrogram_preprocessing_settings = (
+            mel_spectrogram_preprocessing_settings
+        )
+        self.warmed_up = False
+        self.extractions = 0
+
+    def classify(self, path_to_audio_file: pathlib.Path) -> float:
+        return self.classify_mel_spectrogram(
+            self.extract_mel_spectrogram(path_to_audio_file)
+        )
+
+    def extract_mel_spectrogram(self, path_to_audio_file: pathlib.Path) -> np.ndarray:
+        self.extractions += 1
+        return np.zeros((1, 128, 126, 1), dtype=np.float32)
+
+    def extract_mel_spectrogram_from_samples(
+        self, samples: np.ndarray, sampling_rate_hz: int
+    ) -> np.ndarray:
+        self.extractions += 1
+        return np.zeros((1, 128, 126, 1), dtype=np.float32)
+
+    def classify_mel_spectrogram(self, mel_spectrogram: np.ndarray) -> float:
+        return self.prediction
+
+    def classify_mel_spectrogram_batch(
+        self, mel_spectrograms: np.ndarray
+    ) -> np.ndarray:
+        return np.full(len(mel_spectrograms), self.prediction, dtype=np.float32)
+
+    def warm_up(self):
+        self.warmed_up = True
+
+
+class StubRepository(ports.Repository):
+    def __init__(self):
+        self.saved: list[tuple[pathlib.Path, float, Optional[str]]] = []
+
+    def save(
+        self,
+        audio_file_path: pathlib.Path,
+        prediction: float,
+        model_id: Optional[str] = None,
+    ):
+        self.saved.append((audio_file_path, prediction, model_id))
+
+
+class StubRecorder(ports.Recorder):
+    """
+    Records the hops it is set to, windows are put on window_queue by the test
+    """
+
+    def __init__(self):
+        self.hops: list[float] = []
+        self.window_queue: queue.Queue = queue.Queue()
+
+    def record(self) -> pathlib.Path:
+        raise NotImplementedError
+
+    def continuously_record(self) -> Optional[queue.Queue]:
+        return self.window_queue
+
+    def set_hop_seconds(self, hop_seconds: float):
+        self.hops.append(hop_seconds)
+
+    def setup(self):
+        pass
+
+    def tear_down(self):
+        pass
@@ -0,0 +1,63 @@
+import pathlib
+import queue
+import threading
+
+from hexalog.adapters.logger_for_tests import LoggerForTests
+
+from cry_baby.app.adapters.repositories.queue_repo import QueueRepo
+from cry_baby.app.core.aggregator import PredictionAggregator
+from cry_baby.app.core.detector import CryDetector
+from cry_baby.app.core.domain import CryDetectorSettings, SmoothingMethod
+from cry_baby.app.tests.stubs import StubRepository
+
+CLIP = pathlib.Path("/tmp/window.wav")
+
+
+def test_one_cry_seen_by_every_shard_raises_one_event():
+    logger = LoggerForTests()
+    prediction_queue: queue.Queue = queue.Queue()
+    shards = [
+        QueueRepo(logger, prediction_queue, shard_index) for shard_index in range(3)
+    ]
+    for prediction in [0.0, 0.9, 0.9, 0.9]:
+        for shard in shards:
+            shard.save(CLIP, prediction, model_id="primary")
+
+    repository = StubRepository()
+    aggregator = PredictionAggregator(
+        logger=logger,
+        repository=repository,
+        # Predictions arrive microseconds apart here, so they are not averaged over time
+        detector=CryDetector(
+            CryDetectorSettings(
+                smoothing_method=SmoothingMethod.MEDIAN, median_window_size=1
+            )
+        ),
+        poll_interval_seconds=0.01,
+    )
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target=aggregator.run, args=(prediction_queue, stop_event)
+    )
+    thread.start()
+    while not prediction_queue.empty():
+        stop_event.wait(0.01)
+    stop_event.set()
+    thread.join()
+
+    assert len(repository.saved) == 12
+    assert [
+        fields["event_type"]
+        for level, message, fields in logger.logs
+        if message == "Cry event"
+    ] == ["started"]
+
+
+def test_predictions_are_dropped_when_the_queue_stays_full():
+    repository = QueueRepo(
+        LoggerForTests(), queue.Queue(maxsize=1), shard_index=0, put_timeout_seconds=0
+    )
+    repository.save(CLIP, 0.1)
+    repository.save(CLIP, 0.2)
+
+    assert repository.dropped_predictions == 1
@@ -0,0 +1,100 @@
+import csv
+import datetime
+import pathlib
+
+import pytest
+
+from cry_baby.app.adapters.repositories.binary_repo import (
+    RECORD_DTYPE,
+    BinaryLogReader,
+    BinaryRepo,
+)
+
+CLIP = pathlib.Path("/tmp/3f2b8e8a-4c1d-4d5e-9a0b-6c7d8e9f0a1b.wav")
+OTHER_CLIP = pathlib.Path("/tmp/9a8b7c6d-5e4f-4a3b-8c2d-1e0f9a8b7c6d.wav")
+# Not named by a recorder, stored as a format of its own
+NAMED_CLIP = pathlib.Path("/data/night.wav")
+
+
+def test_records_are_fixed_width():
+    assert RECORD_DTYPE.itemsize == 34
+
+
+def test_round_trip(tmp_path):
+    log_path = tmp_path / "predictions.bin"
+    repository = BinaryRepo(log_path, source_id=3)
+    repository.save(CLIP, 0.25, model_id="primary")
+    repository.save(CLIP, 0.75, model_id="candidate")
+    # Reopening continues the model and clip format indices
+    repository = BinaryRepo(log_path, source_id=3)
+    repository.save(OTHER_CLIP, 0.5, model_id="primary")
+    repository.save(NAMED_CLIP, 0.125, model_id="primary")
+
+    reader = BinaryLogReader(log_path)
+    records = reader.records
+
+    assert list(records["prediction"]) == [0.25, 0.75, 0.5, 0.125]
+    assert list(records["source_id"]) == [3, 3, 3, 3]
+    assert [reader.model_ids()[i] for i in records["model_id"]] == [
+        "primary",
+        "candidate",
+        "primary",
+        "primary",
+    ]
+    assert reader.clip_formats() == ["/tmp/{clip_id}.wav", str(NAMED_CLIP)]
+    assert reader.clip_paths() == [
+        str(CLIP),
+        str(CLIP),
+        str(OTHER_CLIP),
+        str(NAMED_CLIP),
+    ]
+
+
+def test_torn_record_is_dropped_on_reopen(tmp_path):
+    log_path = tmp_path / "predictions.bin"
+    BinaryRepo(log_path).save(CLIP, 0.25, model_id="primary")
+    # Power lost part way through writing the next record and model id
+    with open(log_path, "ab") as file:
+        file.write(bytes(7))
+    with open(log_path.with_suffix(".bin.models"), "a") as file:
+        file.write("cand")
+
+    BinaryRepo(log_path).save(OTHER_CLIP, 0.5, model_id="candidate")
+
+    reader = BinaryLogReader(log_path)
+    assert list(reader.records["prediction"]) == [0.25, 0.5]
+    assert reader.model_ids() == ["primary", "candidate"]
+    assert reader.clip_paths() == [str(CLIP), str(OTHER_CLIP)]
+
+
+def test_between_slices_by_time(tmp_path):
+    log_path = tmp_path / "predictions.bin"
+    BinaryRepo(log_path).save(CLIP, 0.1)
+    reader = BinaryLogReader(log_path)
+    saved_at = datetime.datetime.fromtimestamp(reader.records["timestamp_ms"][0] / 1000)
+
+    assert len(reader.between(start=saved_at)) == 1
+    assert len(reader.between(end=saved_at)) == 0
+    assert len(reader.between(start=saved_at + datetime.timedelta(seconds=1))) == 0
+
+
+def test_export_csv(tmp_path):
+    log_path = tmp_path / "predictions.bin"
+    BinaryRepo(log_path).save(CLIP, 0.5, model_id="primary")
+    csv_file_path = tmp_path / "predictions.csv"
+
+    BinaryLogReader(log_path).export_csv(csv_file_path)
+
+    with open(csv_file_path) as file:
+        rows = list(csv.DictReader(file))
+    assert len(rows) == 1
+    assert rows[0]["audio_file_path"] == str(CLIP)
+    assert float(rows[0]["prediction"]) == 0.5
+    assert rows[0]["model_id"] == "primary"
+
+
+def test_rejects_files_which_are_not_prediction_logs(tmp_path):
+    log_path = tmp_path / "predictions.csv"
+    log_path.write_text("timestamp,audio_file_path,prediction,model_id\n")
+    with pytest.raises(ValueError):
+        BinaryLogReader(log_path)
@@ -0,0 +1,33 @@
+import pathlib
+
+import pytest
+
+from cry_baby.app.adapters.repositories.csv_repo import CSVRepo
+
+
+def test_file_without_model_id_is_migrated(tmp_path: pathlib.Path):
+    csv_file_path = tmp_path / "predictions.csv"
+    csv_file_path.write_text(
+        "timestamp,audio_file_path,prediction\n"
+        "2024-01-01T00:00:00,/tmp/a.wav,0.1\n"
+        "2024-01-01T00:00:04,/tmp/b.wav,0.2\n"
+    )
+
+    CSVRepo(csv_file_path).save(pathlib.Path("/tmp/c.wav"), 0.3, model_id="model")
+
+    lines = csv_file_path.read_text().splitlines()
+    assert lines[0] == "timestamp,audio_file_path,prediction,model_id"
+    assert lines[1:3] == [
+        "2024-01-01T00:00:00,/tmp/a.wav,0.1,",
+        "2024-01-01T00:00:04,/tmp/b.wav,0.2,",
+    ]
+    assert lines[3].endswith(",/tmp/c.wav,0.3,model")
+    assert all(line.count(",") == 3 for line in lines)
+
+
+def test_file_with_unknown_header_is_refused(tmp_path: pathlib.Path):
+    csv_file_path = tmp_path / "predictions.csv"
+    csv_file_path.write_text("time,probability\n")
+
+    with pytest.raises(ValueError):
+        CSVRepo(csv_file_path)
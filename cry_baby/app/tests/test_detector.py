@@ -0,0 +1,85 @@
+import datetime
+
+import pytest
+
+from cry_baby.app.core.detector import CryDetector
+from cry_baby.app.core.domain import CryDetectorSettings, CryEventType, SmoothingMethod
+
+START = datetime.datetime(2024, 1, 1)
+CLIP_SECONDS = 4
+
+
+def run_detector(
+    detector: CryDetector, predictions: list[float], hop_seconds: float = CLIP_SECONDS
+) -> list:
+    events = []
+    for i, prediction in enumerate(predictions):
+        timestamp = START + datetime.timedelta(seconds=i * hop_seconds)
+        event = detector.update(prediction, timestamp)
+        if event is not None:
+            events.append(event)
+    return events
+
+
+def test_single_spike_is_smoothed_away():
+    detector = CryDetector(
+        CryDetectorSettings(ema_half_life_seconds=CLIP_SECONDS, on_threshold=0.7)
+    )
+    events = run_detector(detector, [0.0, 0.0, 1.0, 0.0, 0.0])
+    assert events == []
+
+
+def test_events_are_only_emitted_on_state_changes():
+    detector = CryDetector(CryDetectorSettings(ema_half_life_seconds=1e-3))
+    events = run_detector(detector, [0.1, 0.9, 0.9, 0.5, 0.8, 0.1, 0.1])
+
+    assert [event.event_type for event in events] == [
+        CryEventType.STARTED,
+        CryEventType.STOPPED,
+    ]
+    assert events[0].timestamp == START + datetime.timedelta(seconds=4)
+    assert events[1].duration_seconds == 4 * CLIP_SECONDS
+
+
+def test_median_smoothing():
+    detector = CryDetector(
+        CryDetectorSettings(
+            smoothing_method=SmoothingMethod.MEDIAN, median_window_size=3
+        )
+    )
+    events = run_detector(detector, [0.0, 1.0, 0.0, 1.0, 1.0, 0.0, 0.0])
+
+    assert [event.event_type for event in events] == [
+        CryEventType.STARTED,
+        CryEventType.STOPPED,
+    ]
+    assert events[0].smoothed_prediction == 1.0
+    assert events[1].duration_seconds == 3 * CLIP_SECONDS
+
+
+@pytest.mark.parametrize("hop_seconds", [0.5, 1, 4])
+def test_ema_smoothing_does_not_depend_on_the_hop(hop_seconds):
+    detector = CryDetector(CryDetectorSettings(ema_half_life_seconds=4))
+    # Four seconds of silence then eight seconds of crying, whatever the hop
+    predictions = [0.0] * int(4 / hop_seconds) + [1.0] * int(8 / hop_seconds)
+    run_detector(detector, predictions, hop_seconds)
+
+    # Eight seconds after the last silent prediction, two half lives
+    assert detector._ema == pytest.approx(0.75)
+
+
+@pytest.mark.parametrize("smoothing_method", list(SmoothingMethod))
+def test_non_finite_predictions_are_skipped(smoothing_method):
+    detector = CryDetector(
+        CryDetectorSettings(smoothing_method=smoothing_method, median_window_size=1)
+    )
+    events = run_detector(
+        detector, [0.0, float("nan"), float("nan"), 0.9, 0.9, float("inf"), 0.9]
+    )
+
+    assert [event.event_type for event in events] == [CryEventType.STARTED]
+
+
+def test_invalid_thresholds():
+    with pytest.raises(ValueError):
+        CryDetectorSettings(on_threshold=0.3, off_threshold=0.7)
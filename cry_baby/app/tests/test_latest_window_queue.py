@@ -0,0 +1,19 @@
+from hexalog.adapters.logger_for_tests import LoggerForTests
+
+from cry_baby.app.adapters.recorders.latest_window_queue import LatestWindowQueue
+from cry_baby.app.core.domain import RecordedWindow
+
+
+def test_oldest_window_is_dropped_instead_of_queueing_up(tmp_path):
+    window_queue = LatestWindowQueue(LoggerForTests(), maxsize=1)
+    windows = []
+    for i in range(3):
+        path = tmp_path / f"{i}.wav"
+        path.touch()
+        windows.append(RecordedWindow(path=path, rms_energy=0.0))
+        window_queue.put(windows[-1])
+
+    assert window_queue.qsize() == 1
+    assert window_queue.get_nowait() is windows[-1]
+    assert window_queue.windows_dropped == 2
+    assert [window.path.exists() for window in windows] == [False, False, True]
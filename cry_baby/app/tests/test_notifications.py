@@ -0,0 +1,199 @@
+import datetime
+import http.server
+import io
+import json
+import socketserver
+import threading
+import time
+
+import pytest
+from hexalog.adapters.logger_for_tests import LoggerForTests
+
+from cry_baby.app.adapters.notifiers.json_lines_notifier import JsonLinesNotifier
+from cry_baby.app.adapters.notifiers.unix_socket_notifier import UnixSocketNotifier
+from cry_baby.app.adapters.notifiers.webhook_notifier import WebhookNotifier
+from cry_baby.app.core.domain import (
+    CryEvent,
+    CryEventType,
+    Notification,
+    NotificationSettings,
+)
+from cry_baby.app.core.notifications import NotificationFanOut
+from cry_baby.app.core.ports import Notifier
+
+FAST_RETRIES = NotificationSettings(
+    retry_interval_seconds=0.01, max_retry_interval_seconds=0.05
+)
+
+
+def _wait_for(condition, timeout_seconds: float = 5.0):
+    deadline = time.monotonic() + timeout_seconds
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out"
+        time.sleep(0.01)
+
+
+class BlockingNotifier(Notifier):
+    def __init__(self):
+        self.unblock = threading.Event()
+        self.sent: list[Notification] = []
+
+    def send(self, notification: Notification):
+        self.unblock.wait()
+        self.sent.append(notification)
+
+
+@pytest.fixture
+def webhook_server():
+    """
+    A stand in for the alerting service, failing the first two requests
+    """
+    received = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append(json.loads(body))
+            self.send_response(500 if len(received) <= 2 else 204)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/cry-baby", received
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def unix_socket_server(tmp_path):
+    lines = []
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                lines.append(json.loads(line))
+
+    socket_path = tmp_path / "cry_baby.sock"
+    server = socketserver.ThreadingUnixStreamServer(str(socket_path), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield socket_path, lines
+    server.shutdown()
+    server.server_close()
+
+
+def test_failed_webhook_notifications_are_retried_in_order(webhook_server):
+    url, received = webhook_server
+    fan_out = NotificationFanOut(
+        LoggerForTests(), {"webhook": WebhookNotifier(url)}, FAST_RETRIES
+    )
+    fan_out.start()
+
+    fan_out.publish_prediction("clip.wav", 0.25, model_id="model")
+    fan_out.publish_cry_event(
+        CryEvent(CryEventType.STARTED, datetime.datetime(2024, 1, 1, 20), 0.9)
+    )
+    fan_out.stop()
+
+    # Two failed attempts at the prediction, then each delivered once
+    assert [message["type"] for message in received] == [
+        "prediction",
+        "prediction",
+        "prediction",
+        "cry_event",
+    ]
+    assert received[-2]["prediction"] == 0.25
+    assert received[-2]["model_id"] == "model"
+    assert received[-1]["event_type"] == "started"
+    assert received[-1]["timestamp"] == "2024-01-01T20:00:00"
+    assert fan_out.channels[0].failed_attempts == 2
+
+
+def test_unix_socket_notifier_reconnects(unix_socket_server):
+    socket_path, lines = unix_socket_server
+    notifier = UnixSocketNotifier(socket_path)
+    fan_out = NotificationFanOut(LoggerForTests(), {"unix": notifier}, FAST_RETRIES)
+    fan_out.start()
+
+    fan_out.publish_prediction("first.wav", 0.1)
+    _wait_for(lambda: len(lines) == 1)
+    notifier.close()
+    fan_out.publish_prediction("second.wav", 0.2)
+    _wait_for(lambda: len(lines) == 2)
+    fan_out.stop()
+
+    assert [line["audio_file_path"] for line in lines] == ["first.wav", "second.wav"]
+
+
+def test_a_slow_notifier_blocks_neither_publishing_nor_other_notifiers():
+    blocked = BlockingNotifier()
+    stream = io.StringIO()
+    fan_out = NotificationFanOut(
+        LoggerForTests(),
+        {"blocked": blocked, "stdout": JsonLinesNotifier(stream)},
+        NotificationSettings(max_buffered_notifications=3),
+    )
+    fan_out.start()
+
+    for i in range(10):
+        started = time.monotonic()
+        fan_out.publish_prediction(f"{i}.wav", i / 10)
+        assert time.monotonic() - started < 0.1
+        _wait_for(lambda: len(stream.getvalue().splitlines()) == i + 1)
+    # The blocked notifier is sending the first, the buffer keeps the newest 3
+    blocked.unblock.set()
+    fan_out.stop()
+    assert [n.fields["audio_file_path"] for n in blocked.sent] == [
+        "0.wav",
+        "7.wav",
+        "8.wav",
+        "9.wav",
+    ]
+    assert fan_out.dropped_notifications == 7
+
+
+def test_cry_events_only():
+    stream = io.StringIO()
+    fan_out = NotificationFanOut(
+        LoggerForTests(),
+        {"stdout": JsonLinesNotifier(stream)},
+        NotificationSettings(publish_predictions=False),
+    )
+    fan_out.start()
+    fan_out.publish_prediction("clip.wav", 0.9)
+    fan_out.publish_cry_event(
+        CryEvent(CryEventType.STOPPED, datetime.datetime.now(), 0.1, 12.0)
+    )
+    fan_out.stop()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert len(lines) == 1
+    assert lines[0]["type"] == "cry_event"
+    assert lines[0]["duration_seconds"] == 12.0
+
+
+def test_non_finite_predictions_are_published_as_valid_json():
+    def reject_constant(constant: str):
+        raise ValueError(f"{constant} is not valid JSON")
+
+    stream = io.StringIO()
+    fan_out = NotificationFanOut(
+        LoggerForTests(),
+        {"stdout": JsonLinesNotifier(stream)},
+        NotificationSettings(),
+    )
+    fan_out.start()
+    fan_out.publish_prediction("nan.wav", float("nan"))
+    fan_out.publish_prediction("inf.wav", float("inf"))
+    fan_out.stop()
+
+    lines = [
+        json.loads(line, parse_constant=reject_constant)
+        for line in stream.getvalue().splitlines()
+    ]
+    assert [line["prediction"] for line in lines] == [None, None]
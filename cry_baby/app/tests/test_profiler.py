@@ -0,0 +1,33 @@
+import time
+
+from hexalog.adapters.logger_for_tests import LoggerForTests
+
+from cry_baby.app.core.profiler import ClipProfiler
+
+
+def _resample():
+    time.sleep(0.02)
+
+
+def test_profiles_requested_number_of_clips(tmp_path):
+    logger = LoggerForTests()
+    profiler = ClipProfiler(logger=logger, output_path=tmp_path)
+    assert not profiler.active
+
+    profiler.request(2)
+    for _ in range(2):
+        assert profiler.active
+        with profiler.profile_clip():
+            with profiler.stage("extract_mel_spectrogram"):
+                _resample()
+
+    assert not profiler.active
+    [collapsed_path] = list(tmp_path.glob("*.collapsed"))
+    lines = collapsed_path.read_text().splitlines()
+    assert any("test_profiler.py:_resample" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+    [(level, message, fields)] = [log for log in logger.logs if log[0] == "INFO"]
+    assert fields["clips"] == 2
+    assert fields["extract_mel_spectrogram_ms_per_clip"] >= 20
+    assert fields["sampled_resample_percent"] > 50
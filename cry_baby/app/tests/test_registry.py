@@ -0,0 +1,65 @@
+import pytest
+from hexalog.adapters.logger_for_tests import LoggerForTests
+
+from cry_baby.app.core import ports
+from cry_baby.app.core.domain import IncompatibleModelError, ModelVersion
+from cry_baby.app.core.registry import ModelRegistry
+from cry_baby.app.tests.stubs import SETTINGS, StubClassifier
+from cry_baby.pkg.audio_file_client.core.domain import (
+    MelSpectrogramPreprocessingSettings,
+)
+
+
+@pytest.fixture
+def registry() -> ModelRegistry:
+    return ModelRegistry(
+        logger=LoggerForTests(),
+        model_version=ModelVersion("v1", SETTINGS),
+        classifier=StubClassifier(0.1),
+        capture_duration_seconds=4,
+        capture_sampling_rate_hz=44100,
+    )
+
+
+def test_load_in_background_warms_up_and_swaps(registry):
+    new_classifier = StubClassifier(0.9)
+    registry.load_in_background(
+        ModelVersion("v2", SETTINGS), lambda model_version: new_classifier
+    ).join()
+
+    assert registry.model_version.model_id == "v2"
+    assert registry.classifier is new_classifier
+    assert new_classifier.warmed_up
+
+
+def test_refuses_model_with_different_clip_duration(registry):
+    settings = MelSpectrogramPreprocessingSettings(
+        sampling_rate_hz=16000,
+        number_of_mel_bands=128,
+        duration_seconds=2,
+        hop_length=512,
+    )
+    with pytest.raises(IncompatibleModelError):
+        registry.swap(ModelVersion("v2", settings), StubClassifier(0.9))
+
+    assert registry.model_version.model_id == "v1"
+
+
+def test_failed_load_keeps_active_model(registry):
+    def failing_loader(model_version: ModelVersion) -> ports.Classifier:
+        raise RuntimeError("download failed")
+
+    registry.load_in_background(ModelVersion("v2", SETTINGS), failing_loader).join()
+
+    assert registry.model_version.model_id == "v1"
+
+
+def test_revisions_of_a_model_are_told_apart(registry):
+    registry.load(
+        ModelVersion("v1", SETTINGS, revision="abc123"),
+        lambda model_version: StubClassifier(0.9),
+    )
+
+    assert registry.model_version.tag == "v1@abc123"
+    assert str(registry.model_version).startswith("v1@abc123__")
+    assert ModelVersion("v1", SETTINGS).tag == "v1"
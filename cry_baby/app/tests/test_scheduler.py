@@ -0,0 +1,37 @@
+from cry_baby.app.core.domain import CadenceSettings
+from cry_baby.app.core.scheduler import CadenceScheduler
+
+SETTINGS = CadenceSettings(
+    min_hop_seconds=0.5,
+    max_hop_seconds=8,
+    backoff_factor=2,
+    active_prediction_threshold=0.3,
+    active_rms_energy_threshold=0.1,
+    quiet_history_size=2,
+)
+
+
+def test_backs_off_to_max_hop_when_quiet():
+    scheduler = CadenceScheduler(SETTINGS, initial_hop_seconds=4)
+    hops = [scheduler.update(prediction=0.0, rms_energy=0.0) for _ in range(4)]
+    assert hops == [4, 8, 8, 8]
+
+
+def test_drops_to_min_hop_on_rising_prediction_or_energy():
+    scheduler = CadenceScheduler(SETTINGS, initial_hop_seconds=8)
+    assert scheduler.update(prediction=0.5, rms_energy=0.0) == 0.5
+
+    scheduler = CadenceScheduler(SETTINGS, initial_hop_seconds=8)
+    assert scheduler.update(prediction=0.0, rms_energy=0.2) == 0.5
+
+
+def test_waits_for_quiet_history_before_backing_off():
+    scheduler = CadenceScheduler(SETTINGS, initial_hop_seconds=4)
+    assert scheduler.update(prediction=0.9, rms_energy=0.0) == 0.5
+    assert scheduler.update(prediction=0.0, rms_energy=0.0) == 0.5
+    assert scheduler.update(prediction=0.0, rms_energy=0.0) == 1
+
+    metrics = scheduler.metrics
+    assert metrics.hop_seconds == 1
+    assert metrics.windows_evaluated == 3
+    assert metrics.hop_changes == 2
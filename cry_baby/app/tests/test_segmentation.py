@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+import soundfile as sf
+from hexalog.adapters.logger_for_tests import LoggerForTests
+
+from cry_baby.app.core.domain import SegmentationSettings
+from cry_baby.app.core.segmentation import RecordingSegmenter
+from cry_baby.app.tests.stubs import StubClassifier
+from cry_baby.pkg.audio_file_client.adapters.numpy_client import NumpyClient
+
+SR = 16000
+
+
+class LoudnessClassifier(StubClassifier):
+    """
+    Predicts the peak amplitude of the window, so predictions can be matched to windows
+    """
+
+    def extract_mel_spectrogram_from_samples(
+        self, samples: np.ndarray, sampling_rate_hz: int
+    ) -> np.ndarray:
+        return np.full((1, 128, 126, 1), np.abs(samples).max(), dtype=np.float32)
+
+    def classify_mel_spectrogram_batch(
+        self, mel_spectrograms: np.ndarray
+    ) -> np.ndarray:
+        return mel_spectrograms[:, 0, 0, 0]
+
+
+class FailingClassifier(StubClassifier):
+    def classify_mel_spectrogram_batch(
+        self, mel_spectrograms: np.ndarray
+    ) -> np.ndarray:
+        raise RuntimeError("model failed")
+
+
+@pytest.fixture
+def recording(tmp_path):
+    """
+    60.5 seconds getting louder every second
+    """
+    amplitude = np.repeat(np.arange(1, 62) / 100, SR)[: int(60.5 * SR)]
+    path = tmp_path / "night.wav"
+    sf.write(path, amplitude * np.sign(np.sin(np.arange(len(amplitude)))), SR)
+    return path
+
+
+def test_every_window_is_scored_in_time_order(recording):
+    segmenter = RecordingSegmenter(
+        logger=LoggerForTests(),
+        audio_file_client=NumpyClient(),
+        classifiers=[LoudnessClassifier(0) for _ in range(3)],
+        settings=SegmentationSettings(
+            hop_seconds=1, batch_size=4, block_seconds=7, max_pending_batches=1
+        ),
+    )
+
+    track = segmenter.score(recording)
+
+    # The last window starts at 57 seconds and is padded with silence
+    np.testing.assert_array_equal(track.start_seconds, np.arange(58))
+    assert track.window_seconds == 4
+    # The loudest second of a window is its last
+    expected = np.minimum(np.arange(58) + 4, 61) / 100
+    np.testing.assert_allclose(track.predictions, expected, atol=1e-3)
+
+
+def test_a_failing_classifier_stops_the_scoring(recording):
+    segmenter = RecordingSegmenter(
+        logger=LoggerForTests(),
+        audio_file_client=NumpyClient(),
+        classifiers=[FailingClassifier(0), FailingClassifier(0)],
+        settings=SegmentationSettings(batch_size=2, max_pending_batches=1),
+    )
+    with pytest.raises(RuntimeError, match="model failed"):
+        segmenter.score(recording)
@@ -0,0 +1,98 @@
+import pathlib
+
+import numpy as np
+import pytest
+from hexalog.adapters.logger_for_tests import LoggerForTests
+
+from cry_baby.app.core.domain import CadenceSettings, ModelVersion, RecordedWindow
+from cry_baby.app.core.profiler import untimed_stage
+from cry_baby.app.core.registry import ModelRegistry
+from cry_baby.app.core.scheduler import CadenceScheduler
+from cry_baby.app.core.service import CryBabyService
+from cry_baby.app.tests.stubs import (
+    SETTINGS,
+    StubClassifier,
+    StubRecorder,
+    StubRepository,
+)
+
+SR = 16000
+
+
+@pytest.mark.parametrize("intact", [True, False])
+def test_windows_overwritten_before_classification_are_skipped(intact):
+    classifier = StubClassifier(0.5)
+    repository = StubRepository()
+    service = CryBabyService(
+        logger=LoggerForTests(),
+        classifier=classifier,
+        recorder=None,
+        repository=repository,
+    )
+    window = RecordedWindow(
+        path=pathlib.Path("/tmp/window.wav"),
+        rms_energy=0.0,
+        samples=np.zeros(4 * SR, dtype=np.int16),
+        sampling_rate_hz=SR,
+        samples_intact=lambda: intact,
+    )
+
+    service._handle_window(window, classifier, untimed_stage)
+
+    assert len(repository.saved) == (1 if intact else 0)
+    assert service.windows_overwritten == (0 if intact else 1)
+
+
+def test_recorder_hop_is_only_set_when_the_cadence_changes():
+    classifier = StubClassifier(0.0)
+    recorder = StubRecorder()
+    service = CryBabyService(
+        logger=LoggerForTests(),
+        classifier=classifier,
+        recorder=recorder,
+        repository=StubRepository(),
+        scheduler=CadenceScheduler(
+            CadenceSettings(
+                min_hop_seconds=0.5,
+                max_hop_seconds=8,
+                backoff_factor=2,
+                active_rms_energy_threshold=0.1,
+                quiet_history_size=1,
+            ),
+            initial_hop_seconds=4,
+        ),
+    )
+    # Loud, loud, quiet, quiet, quiet, quiet
+    for rms_energy in [0.5, 0.5, 0.0, 0.0, 0.0, 0.0]:
+        window = RecordedWindow(
+            path=pathlib.Path("/tmp/window.wav"), rms_energy=rms_energy
+        )
+        service._handle_window(window, classifier, untimed_stage)
+
+    assert recorder.hops == [0.5, 1, 2, 4, 8]
+
+
+def test_predictions_are_saved_with_the_model_revision():
+    classifier = StubClassifier(0.5)
+    repository = StubRepository()
+    service = CryBabyService(
+        logger=LoggerForTests(),
+        classifier=classifier,
+        recorder=None,
+        repository=repository,
+        registry=ModelRegistry(
+            logger=LoggerForTests(),
+            model_version=ModelVersion("cry-baby", SETTINGS, revision="abc123"),
+            classifier=classifier,
+            capture_duration_seconds=4,
+            capture_sampling_rate_hz=SR,
+        ),
+    )
+
+    service._handle_window(
+        RecordedWindow(path=pathlib.Path("/tmp/window.wav"), rms_energy=0.0),
+        classifier,
+        untimed_stage,
+    )
+
+    assert repository.saved[0][2] == "cry-baby@abc123"
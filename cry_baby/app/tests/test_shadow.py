@@ -0,0 +1,111 @@
+import os
+import pathlib
+import sys
+import threading
+import time
+
+import pytest
+from hexalog.adapters.logger_for_tests import LoggerForTests
+
+from cry_baby.app.core.domain import ShadowSettings
+from cry_baby.app.core.shadow import ENSEMBLE_MODEL_ID, ShadowScorer
+from cry_baby.app.tests.stubs import SETTINGS, StubClassifier, StubRepository
+from cry_baby.pkg.audio_file_client.core.domain import (
+    MelSpectrogramPreprocessingSettings,
+)
+
+AUDIO_FILE_PATH = pathlib.Path("/tmp/window.wav")
+
+
+def submit(shadow_scorer: ShadowScorer):
+    shadow_scorer.submit(
+        AUDIO_FILE_PATH,
+        mel_spectrogram=StubClassifier(0).extract_mel_spectrogram(AUDIO_FILE_PATH),
+        mel_spectrogram_preprocessing_settings=SETTINGS,
+        primary_model_id="primary",
+        primary_prediction=0.2,
+    )
+
+
+def test_candidates_share_features_and_are_combined():
+    same_preprocessing = StubClassifier(0.6)
+    other_preprocessing = StubClassifier(
+        1.0,
+        MelSpectrogramPreprocessingSettings(
+            sampling_rate_hz=16000,
+            number_of_mel_bands=64,
+            duration_seconds=4,
+            hop_length=512,
+        ),
+    )
+    repository = StubRepository()
+    shadow_scorer = ShadowScorer(
+        logger=LoggerForTests(),
+        candidates={"same": same_preprocessing, "other": other_preprocessing},
+        repository=repository,
+        settings=ShadowSettings(ensemble_weights={"primary": 1, "same": 1}),
+    )
+    submit(shadow_scorer)
+
+    predictions = shadow_scorer.score(shadow_scorer._jobs.get_nowait())
+
+    assert same_preprocessing.extractions == 0
+    assert other_preprocessing.extractions == 1
+    assert predictions == {"same": 0.6, "other": 1.0, ENSEMBLE_MODEL_ID: 0.4}
+    assert [model_id for _, _, model_id in repository.saved] == [
+        "same",
+        "other",
+        ENSEMBLE_MODEL_ID,
+    ]
+
+
+def test_windows_are_dropped_when_candidates_fall_behind():
+    shadow_scorer = ShadowScorer(
+        logger=LoggerForTests(),
+        candidates={"candidate": StubClassifier(0.5)},
+        repository=StubRepository(),
+        settings=ShadowSettings(max_pending_windows=1),
+    )
+    submit(shadow_scorer)
+    submit(shadow_scorer)
+
+    assert shadow_scorer.dropped_windows == 1
+
+
+def test_candidates_wait_while_the_primary_model_is_busy():
+    repository = StubRepository()
+    shadow_scorer = ShadowScorer(
+        logger=LoggerForTests(),
+        candidates={"candidate": StubClassifier(0.5)},
+        repository=repository,
+        settings=ShadowSettings(),
+    )
+    shadow_scorer.start()
+
+    with shadow_scorer.primary_busy():
+        submit(shadow_scorer)
+        time.sleep(0.1)
+        assert repository.saved == []
+
+    deadline = time.monotonic() + 5
+    while not repository.saved and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [model_id for _, _, model_id in repository.saved] == ["candidate"]
+
+
+@pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="Per thread niceness is Linux only"
+)
+def test_candidates_run_at_a_lower_priority():
+    shadow_scorer = ShadowScorer(
+        logger=LoggerForTests(),
+        candidates={},
+        repository=StubRepository(),
+        settings=ShadowSettings(niceness_increment=5),
+    )
+    shadow_scorer.start()
+    time.sleep(0.1)
+
+    shadow_niceness = os.getpriority(os.PRIO_PROCESS, shadow_scorer.thread.native_id)
+    own_niceness = os.getpriority(os.PRIO_PROCESS, threading.get_native_id())
+    assert shadow_niceness == min(own_niceness + 5, 19)
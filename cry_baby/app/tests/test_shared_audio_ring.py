@@ -0,0 +1,128 @@
+import multiprocessing
+import queue
+import time
+
+import numpy as np
+import pytest
+from hexalog.adapters.logger_for_tests import LoggerForTests
+
+from cry_baby.app.adapters.recorders.shared_audio_ring import SharedAudioRing
+from cry_baby.app.adapters.recorders.shared_memory_recorder import SharedMemoryRecorder
+
+SR = 1000
+DURATION = 1
+
+
+@pytest.fixture
+def ring():
+    ring = SharedAudioRing.create(capacity_frames=4 * SR, sampling_rate_hz=SR)
+    yield ring
+    ring.close()
+
+
+def _sum_of_window(ring_name: str, end_position: int, results: multiprocessing.Queue):
+    ring = SharedAudioRing.attach(ring_name)
+    results.put(int(ring.window(end_position, SR).sum()))
+    ring.close()
+
+
+def test_windows_across_the_end_of_the_ring_are_contiguous_views(ring):
+    samples = np.arange(7 * SR // 2, dtype=np.int16)
+    for chunk in np.split(samples, 7):
+        ring.write(chunk)
+
+    window = ring.window(ring.write_position, 2 * SR)
+
+    np.testing.assert_array_equal(window, samples[-2 * SR :])
+    assert window.flags["C_CONTIGUOUS"]
+    assert np.shares_memory(window, ring._data)
+
+
+def test_overwritten_and_unwritten_frames_are_rejected(ring):
+    ring.write(np.zeros(SR, dtype=np.int16))
+    with pytest.raises(LookupError):
+        ring.window(2 * SR, SR)
+    for _ in range(4):
+        ring.write(np.zeros(SR, dtype=np.int16))
+    with pytest.raises(LookupError):
+        ring.window(SR, SR)
+
+
+def test_another_process_reads_what_was_written(ring):
+    ring.write(np.ones(2 * SR, dtype=np.int16))
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_sum_of_window, args=(ring.name, 2 * SR, results))
+    process.start()
+    process.join(30)
+    assert results.get(timeout=1) == SR
+
+
+def test_shards_take_alternate_windows_without_copying(ring, tmp_path):
+    recorders = [
+        SharedMemoryRecorder(
+            temp_path=tmp_path,
+            logger=LoggerForTests(),
+            ring_name=ring.name,
+            duration_seconds=DURATION,
+            shard_index=shard_index,
+            number_of_shards=2,
+            poll_interval_seconds=0.001,
+        )
+        for shard_index in range(2)
+    ]
+    window_queues = []
+    for recorder in recorders:
+        recorder.set_hop_seconds(DURATION / 2)
+        window_queues.append(recorder.continuously_record())
+
+    # Each frame holds its position, so a window's last sample says where it ends
+    for start in range(0, 3 * SR, SR // 4):
+        ring.write(np.arange(start, start + SR // 4, dtype=np.int16))
+        time.sleep(0.01)
+
+    ends = []
+    for recorder, window_queue in zip(recorders, window_queues):
+        windows = []
+        while True:
+            try:
+                windows.append(window_queue.get(timeout=0.5))
+            except queue.Empty:
+                break
+        assert windows
+        for window in windows:
+            assert np.shares_memory(window.samples, recorder.ring._data)
+            assert window.sampling_rate_hz == SR
+            assert len(window.samples) == SR
+            assert window.path.exists()
+        ends.append({int(window.samples[-1]) + 1 for window in windows})
+        del windows, window
+        recorder.tear_down()
+
+    hop = SR // 2
+    assert all((end // hop) % 2 == 0 for end in ends[0])
+    assert all((end // hop) % 2 == 1 for end in ends[1])
+    assert sorted(ends[0] | ends[1]) == list(range(SR, 3 * SR + 1, hop))
+
+
+def test_windows_overwritten_while_the_service_stalls_are_not_used(ring, tmp_path):
+    recorder = SharedMemoryRecorder(
+        temp_path=tmp_path,
+        logger=LoggerForTests(),
+        ring_name=ring.name,
+        duration_seconds=DURATION,
+        poll_interval_seconds=0.001,
+    )
+    window_queue = recorder.continuously_record()
+
+    # Nothing is taken from the queue while the ring wraps around more than once
+    for start in range(0, 6 * SR, SR // 4):
+        ring.write(np.arange(start, start + SR // 4, dtype=np.int16))
+        time.sleep(0.01)
+
+    first_window = window_queue.get(timeout=1)
+    assert window_queue.qsize() <= 1
+    assert not first_window.samples_intact()
+    assert recorder.windows_skipped >= 1
+    del first_window
+    recorder.tear_down()
@@ -0,0 +1,116 @@
+import os
+import pathlib
+import time
+
+import numpy as np
+from hexalog.adapters.logger_for_tests import LoggerForTests
+
+from cry_baby.app.core.domain import RecordedWindow
+from cry_baby.app.core.service import CryBabyService
+from cry_baby.app.core.supervisor import ProcessSupervisor
+from cry_baby.app.tests.stubs import StubClassifier, StubRecorder, StubRepository
+from cry_baby.cmd import sharded
+
+
+class FailingClassifier(StubClassifier):
+    def classify_mel_spectrogram(self, mel_spectrogram: np.ndarray) -> float:
+        raise RuntimeError("Model failed")
+
+
+def _crash():
+    os._exit(3)
+
+
+def _run_forever(*args):
+    while True:
+        time.sleep(1)
+
+
+def _beat(heartbeat):
+    while True:
+        heartbeat.value += 1
+        time.sleep(0.05)
+
+
+def _infer_with_failing_classifier(heartbeat):
+    recorder = StubRecorder()
+    recorder.window_queue.put(
+        RecordedWindow(path=pathlib.Path("/tmp/window.wav"), rms_energy=0.0)
+    )
+    service = CryBabyService(
+        logger=LoggerForTests(),
+        classifier=FailingClassifier(0.5),
+        recorder=recorder,
+        repository=StubRepository(),
+    )
+    sharded.serve(LoggerForTests(), service, heartbeat)
+
+
+def _wait_for_restart(supervisor: ProcessSupervisor) -> list[str]:
+    restarted = []
+    deadline = time.monotonic() + 30
+    while not restarted and time.monotonic() < deadline:
+        time.sleep(0.1)
+        restarted = supervisor.check()
+    return restarted
+
+
+def test_crashed_processes_are_restarted_and_the_others_left_running():
+    logger = LoggerForTests()
+    supervisor = ProcessSupervisor(logger, restart_delay_seconds=0)
+    supervisor.add("capture", _run_forever)
+    supervisor.add("inference", _crash)
+    supervisor.start()
+    capture_pid = supervisor.processes["capture"].process.pid
+    try:
+        restarted = _wait_for_restart(supervisor)
+
+        assert restarted == ["inference"]
+        assert supervisor.processes["inference"].restarts == 1
+        assert supervisor.processes["capture"].process.pid == capture_pid
+        assert supervisor.processes["capture"].process.is_alive()
+        assert any(
+            message == "Process exited, restarting it" and kwargs["exitcode"] == 3
+            for _, message, kwargs in logger.logs
+        )
+    finally:
+        supervisor.stop()
+    assert all(
+        supervised.process is None for supervised in supervisor.processes.values()
+    )
+
+
+def test_inference_process_is_restarted_when_the_classifier_raises():
+    logger = LoggerForTests()
+    supervisor = ProcessSupervisor(logger, restart_delay_seconds=0)
+    supervisor.add(
+        "inference", _infer_with_failing_classifier, heartbeat_timeout_seconds=60
+    )
+    supervisor.start()
+    try:
+        assert _wait_for_restart(supervisor) == ["inference"]
+        assert any(
+            message == "Process exited, restarting it" and kwargs["exitcode"] == 1
+            for _, message, kwargs in logger.logs
+        )
+    finally:
+        supervisor.stop()
+
+
+def test_hung_processes_are_restarted_and_the_others_left_running():
+    logger = LoggerForTests()
+    supervisor = ProcessSupervisor(logger)
+    supervisor.add("healthy", _beat, heartbeat_timeout_seconds=2)
+    supervisor.add("hung", _run_forever, heartbeat_timeout_seconds=2)
+    supervisor.start()
+    healthy_pid = supervisor.processes["healthy"].process.pid
+    try:
+        assert _wait_for_restart(supervisor) == ["hung"]
+        assert supervisor.processes["hung"].process.is_alive()
+        assert supervisor.processes["healthy"].process.pid == healthy_pid
+        assert any(
+            message == "Process stopped making progress, restarting it"
+            for _, message, kwargs in logger.logs
+        )
+    finally:
+        supervisor.stop()
@@ -0,0 +1,54 @@
+import pathlib
+import wave
+
+import numpy as np
+import soundfile as sf
+from hexalog.adapters.logger_for_tests import LoggerForTests
+
+from cry_baby.app.adapters.recorders.synthetic_recorder import (
+    SignalSource,
+    SyntheticRecorder,
+    SyntheticRecordingSettings,
+)
+
+SR = 8000
+DURATION = 1
+
+
+def test_record_writes_a_window_of_the_recording_duration(tmp_path):
+    recorder = SyntheticRecorder(
+        temp_path=tmp_path,
+        logger=LoggerForTests(),
+        settings=SyntheticRecordingSettings(
+            recording_rate_hz=SR,
+            duration_seconds=DURATION,
+            signal_source=SignalSource.TONE,
+        ),
+    )
+    with wave.open(str(recorder.record())) as wave_file:
+        assert wave_file.getframerate() == SR
+        assert wave_file.getnframes() == SR * DURATION
+
+
+def test_continuously_record_from_several_microphones(tmp_path):
+    cry_sample = tmp_path / "cry.wav"
+    sf.write(cry_sample, 0.5 * np.ones(SR // 2), SR)
+    recorder = SyntheticRecorder(
+        temp_path=tmp_path,
+        logger=LoggerForTests(),
+        settings=SyntheticRecordingSettings(
+            recording_rate_hz=SR,
+            duration_seconds=DURATION,
+            signal_source=SignalSource.MIXED,
+            audio_files=[cry_sample],
+            number_of_microphones=3,
+            realtime=False,
+            max_queued_windows=3,
+        ),
+    )
+    audio_recorded_queue = recorder.continuously_record()
+    windows = [audio_recorded_queue.get(timeout=5) for _ in range(6)]
+    recorder.tear_down()
+
+    assert all(isinstance(window.path, pathlib.Path) for window in windows)
+    assert all(window.rms_energy > 0.4 for window in windows)
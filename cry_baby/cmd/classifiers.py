@@ -0,0 +1,167 @@
+import dataclasses
+import importlib.util
+import os
+import pathlib
+import threading
+from typing import Optional
+
+from hexalog.ports import Logger
+from huggingface_hub import HfApi, from_pretrained_keras, hf_hub_download, login
+
+from cry_baby.app.core.domain import ModelVersion
+from cry_baby.app.core.registry import ClassifierLoader, ModelRegistry
+from cry_baby.pkg.audio_file_client.core.domain import (
+    MelSpectrogramPreprocessingSettings,
+)
+from cry_baby.pkg.audio_file_client.core.ports import AudioFileClient
+
+# The preprocessing both published cry baby models were trained with
+CRY_BABY_PREPROCESSING_SETTINGS = MelSpectrogramPreprocessingSettings(
+    sampling_rate_hz=16000,
+    number_of_mel_bands=128,
+    duration_seconds=4,
+    hop_length=512,
+)
+
+
+def tensorflow_available():
+    tensorflow_spec = importlib.util.find_spec("tensorflow")
+    return tensorflow_spec is not None
+
+
+def tflite_runtime_available():
+    tflite_spec = importlib.util.find_spec("tflite_runtime")
+    return tflite_spec is not None
+
+
+def create_audio_file_client(name: str) -> AudioFileClient:
+    """
+    Librosa is only imported when selected, importing it (numba, scipy, soxr, audioread)
+    dominates the cold start time on small devices.
+    """
+    match name:
+        case "numpy":
+            from cry_baby.pkg.audio_file_client.adapters.numpy_client import NumpyClient
+
+            return NumpyClient()
+        case "librosa":
+            from cry_baby.pkg.audio_file_client.adapters.librosa_client import (
+                LibrosaClient,
+            )
+
+            return LibrosaClient()
+        case _:
+            raise ValueError(
+                f"Unknown audio file client {name}, expected one of numpy, librosa"
+            )
+
+
+def create_classifier_loader(
+    logger: Logger, audio_file_client: AudioFileClient
+) -> Optional[tuple[ModelVersion, ClassifierLoader]]:
+    """
+    Pick TensorFlow or TensorFlow Lite, whichever is installed, and return the published
+    model version for it with a function to load it.
+    The classifiers are imported here as only one of the runtimes is installed.
+    """
+    if tensorflow_available():
+        from cry_baby.app.adapters.classifiers.tensorflow import TensorFlowClassifier
+
+        model_version = ModelVersion(
+            model_id="ericcbonet/cry-baby",
+            mel_spectrogram_preprocessing_settings=CRY_BABY_PREPROCESSING_SETTINGS,
+        )
+
+        def load_classifier(model_version: ModelVersion) -> TensorFlowClassifier:
+            return TensorFlowClassifier(
+                model=from_pretrained_keras(
+                    model_version.model_id, revision=model_version.revision
+                ),
+                audio_file_client=audio_file_client,
+                mel_spectrogram_preprocessing_settings=model_version.mel_spectrogram_preprocessing_settings,
+            )
+
+        logger.info("Using TensorFlow classifier.")
+    elif tflite_runtime_available():
+        from cry_baby.app.adapters.classifiers.tf_lite import TFLiteClassifier
+
+        token = os.getenv("HUGGING_FACE_TOKEN")
+        if not token:
+            logger.error("HUGGING_FACE_TOKEN does not exist in the environment")
+            return None
+        login(token=token)
+        model_version = ModelVersion(
+            model_id="ericcbonet/cry_baby_lite",
+            mel_spectrogram_preprocessing_settings=CRY_BABY_PREPROCESSING_SETTINGS,
+        )
+
+        def load_classifier(model_version: ModelVersion) -> TFLiteClassifier:
+            model_path = hf_hub_download(
+                repo_id=model_version.model_id,
+                filename="model.tflite",
+                revision=model_version.revision,
+            )
+            return TFLiteClassifier(
+                model_version.mel_spectrogram_preprocessing_settings,
+                audio_file_client,
+                pathlib.Path(model_path),
+            )
+
+        logger.info("Using TensorFlow Lite classifier.")
+    else:
+        logger.error("No compatible TensorFlow or TensorFlow Lite installation found.")
+        return None
+
+    return target_model_version(logger, model_version), load_classifier
+
+
+def read_model_revision() -> Optional[str]:
+    """
+    The revision of the model to load, a branch, tag or commit of its repository.
+    It is read from the file at MODEL_REVISION_FILE when that is set, so it can be
+    changed while running and picked up by a reload, and from MODEL_REVISION otherwise.
+    None, the default, loads the latest revision.
+    """
+    if revision_file := os.getenv("MODEL_REVISION_FILE"):
+        revision = pathlib.Path(revision_file).read_text().strip()
+    else:
+        revision = os.getenv("MODEL_REVISION", "").strip()
+    return revision or None
+
+
+def target_model_version(logger: Logger, model_version: ModelVersion) -> ModelVersion:
+    """
+    model_version at the revision from read_model_revision, resolved to the commit it
+    points at so the predictions of two loads of a moving branch are told apart.
+    The revision is kept as it is when it can not be resolved.
+    """
+    revision = read_model_revision()
+    try:
+        revision = HfApi().model_info(model_version.model_id, revision=revision).sha
+    except Exception as e:
+        logger.warning(
+            "Could not resolve the model revision to a commit",
+            model_id=model_version.model_id,
+            revision=revision,
+            error=str(e),
+        )
+    return dataclasses.replace(model_version, revision=revision)
+
+
+def reload_in_background(
+    logger: Logger, registry: ModelRegistry, load_classifier: ClassifierLoader
+) -> threading.Thread:
+    """
+    Load the target revision of the active model and swap it in, without blocking the
+    caller, which is usually a signal handler
+    """
+
+    def reload():
+        registry.load(
+            target_model_version(logger, registry.model_version), load_classifier
+        )
+
+    thread = threading.Thread(target=reload)
+    thread.daemon = True
+    thread.start()
+    return thread
@@ -1,45 +1,64 @@
-import importlib.util
 import os
 import pathlib
+import signal
 import threading
+from typing import Optional
 
 import pyaudio
 from hexalog.adapters.cli_logger import ColorfulCLILogger
-from huggingface_hub import from_pretrained_keras, hf_hub_download, login
 
 from cry_baby.app.adapters.recorders.pyaudio_recorder import (
     PyaudioRecorder,
     PyaudioRecordingSettings,
 )
+from cry_baby.app.adapters.repositories.binary_repo import BinaryRepo
 from cry_baby.app.adapters.repositories.csv_repo import CSVRepo
+from cry_baby.app.core.detector import CryDetector
+from cry_baby.app.core.domain import (
+    CadenceSettings,
+    CryDetectorSettings,
+    ModelVersion,
+    ShadowSettings,
+)
+from cry_baby.app.core.notifications import NotificationFanOut
 from cry_baby.app.core.ports import Repository
+from cry_baby.app.core.profiler import ClipProfiler
+from cry_baby.app.core.registry import ModelRegistry
+from cry_baby.app.core.scheduler import CadenceScheduler
 from cry_baby.app.core.service import CryBabyService
-from cry_baby.pkg.audio_file_client.adapters.librosa_client import LibrosaClient
-from cry_baby.pkg.audio_file_client.core.domain import (
-    MelSpectrogramPreprocessingSettings,
+from cry_baby.app.core.shadow import ShadowScorer
+from cry_baby.cmd.classifiers import (
+    CRY_BABY_PREPROCESSING_SETTINGS,
+    create_audio_file_client,
+    create_classifier_loader,
+    reload_in_background,
 )
+from cry_baby.cmd.notifiers import create_notification_fan_out
 
 SHUTDOWN_EVENT = threading.Event()
 
 
-def tensorflow_available():
-    tensorflow_spec = importlib.util.find_spec("tensorflow")
-    return tensorflow_spec is not None
-
-
-def tflite_runtime_available():
-    tflite_spec = importlib.util.find_spec("tflite_runtime")
-    return tflite_spec is not None
-
-
 def run_continously(
     logger: ColorfulCLILogger,
     recorder: PyaudioRecorder,
-    classifier,
+    registry: ModelRegistry,
     repository: Repository,
+    shadow_scorer: Optional[ShadowScorer] = None,
+    profiler: Optional[ClipProfiler] = None,
+    notifier: Optional[NotificationFanOut] = None,
+    scheduler: Optional[CadenceScheduler] = None,
 ):
     service = CryBabyService(
-        logger=logger, classifier=classifier, recorder=recorder, repository=repository
+        logger=logger,
+        classifier=registry.classifier,
+        recorder=recorder,
+        repository=repository,
+        detector=CryDetector(CryDetectorSettings()),
+        scheduler=scheduler,
+        registry=registry,
+        shadow_scorer=shadow_scorer,
+        profiler=profiler,
+        notifier=notifier,
     )
     logger.info("Starting to continously evaluate from microphone")
     while not SHUTDOWN_EVENT.is_set():
@@ -66,50 +85,91 @@ def main():
         duration_seconds=4,
     )
     recorder = PyaudioRecorder(logger=logger, temp_path=temp_path, settings=settings)
-    repository = CSVRepo(csv_file_path=pathlib.Path("predictions.csv"))
+    repository: Repository
+    match os.getenv("PREDICTIONS_FORMAT", "csv"):
+        case "csv":
+            repository = CSVRepo(csv_file_path=pathlib.Path("predictions.csv"))
+        case "binary":
+            repository = BinaryRepo(log_path=pathlib.Path("predictions.bin"))
+        case predictions_format:
+            logger.error(
+                "Unknown PREDICTIONS_FORMAT, expected csv or binary",
+                predictions_format=predictions_format,
+            )
+            return
 
-    librosa_audio_file_client = LibrosaClient()
+    audio_file_client_name = os.getenv("AUDIO_FILE_CLIENT", "librosa")
+    audio_file_client = create_audio_file_client(audio_file_client_name)
+    logger.info("Using audio file client", name=audio_file_client_name)
 
-    mel_spectrogram_preprocessing_settings = MelSpectrogramPreprocessingSettings(
-        sampling_rate_hz=16000,
-        number_of_mel_bands=128,
-        duration_seconds=4,
-        hop_length=512,
+    if (model := create_classifier_loader(logger, audio_file_client)) is None:
+        return
+    model_version, load_classifier = model
+
+    classifier = load_classifier(model_version)
+    classifier.warm_up()
+    registry = ModelRegistry(
+        logger=logger,
+        model_version=model_version,
+        classifier=classifier,
+        capture_duration_seconds=settings.duration_seconds,
+        capture_sampling_rate_hz=settings.recording_rate_hz,
     )
 
-    # TODO: it's horrible to import the classifiers here
-    if tensorflow_available():
-        from cry_baby.app.adapters.classifiers.tensorflow import TensorFlowClassifier
-
-        model = from_pretrained_keras("ericcbonet/cry-baby")
-        classifier = TensorFlowClassifier(
-            model=model,
-            audio_file_client=librosa_audio_file_client,
-            mel_spectrogram_preprocessing_settings=mel_spectrogram_preprocessing_settings,
+    def reload_model(signum, frame):
+        logger.info("Received SIGHUP, reloading the model")
+        reload_in_background(logger, registry, load_classifier)
+
+    # Point MODEL_REVISION_FILE at a new revision of the model and send SIGHUP to swap it in without stopping
+    # the recording
+    signal.signal(signal.SIGHUP, reload_model)
+
+    shadow_scorer = None
+    # Comma separated ids of candidate models to score on the same audio as the primary model
+    if shadow_model_ids := os.getenv("SHADOW_MODEL_IDS"):
+        candidates = {}
+        for model_id in shadow_model_ids.split(","):
+            candidate = load_classifier(
+                ModelVersion(
+                    model_id=model_id.strip(),
+                    mel_spectrogram_preprocessing_settings=CRY_BABY_PREPROCESSING_SETTINGS,
+                )
+            )
+            candidate.warm_up()
+            candidates[model_id.strip()] = candidate
+        shadow_scorer = ShadowScorer(
+            logger=logger,
+            candidates=candidates,
+            repository=repository,
+            settings=ShadowSettings(),
         )
-        logger.info("Using TensorFlow classifier.")
-    elif tflite_runtime_available():
-        from cry_baby.app.adapters.classifiers.tf_lite import TFLiteClassifier
 
-        token = os.getenv("HUGGING_FACE_TOKEN")
-        if not token:
-            logger.error("HUGGING_FACE_TOKEN does not exist in the environment")
-            return
-        login(token=token)
-        model_path = hf_hub_download(
-            repo_id="ericcbonet/cry_baby_lite", filename="model.tflite"
-        )
-        classifier = TFLiteClassifier(
-            mel_spectrogram_preprocessing_settings,
-            librosa_audio_file_client,
-            pathlib.Path(model_path),
+    profiler = ClipProfiler(logger=logger, output_path=temp_path / "cry_baby_profiles")
+    number_of_clips_to_profile = int(os.getenv("PROFILE_CLIPS", "10"))
+
+    def profile_clips(signum, frame):
+        profiler.request(number_of_clips_to_profile)
+
+    # Send SIGUSR1 to profile the next PROFILE_CLIPS clips and write a flamegraph of them
+    signal.signal(signal.SIGUSR1, profile_clips)
+
+    scheduler = None
+    # Off by default, a loud room makes it evaluate and write a clip every min_hop_seconds
+    if os.getenv("ADAPTIVE_CADENCE", "false").lower() == "true":
+        scheduler = CadenceScheduler(
+            CadenceSettings(), initial_hop_seconds=settings.duration_seconds
         )
-        logger.info("Using TensorFlow Lite classifier.")
-    else:
-        logger.error("No compatible TensorFlow or TensorFlow Lite installation found.")
-        return
 
-    run_continously(logger, recorder, classifier, repository)
+    run_continously(
+        logger,
+        recorder,
+        registry,
+        repository,
+        shadow_scorer,
+        profiler,
+        create_notification_fan_out(logger),
+        scheduler,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,30 @@
+import argparse
+import datetime
+import pathlib
+
+from cry_baby.app.adapters.repositories.binary_repo import BinaryLogReader
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Export a binary prediction log to the CSV format"
+    )
+    parser.add_argument("log_path", type=pathlib.Path)
+    parser.add_argument("csv_file_path", type=pathlib.Path)
+    parser.add_argument(
+        "--start", type=datetime.datetime.fromisoformat, help="e.g. 2024-01-01T20:00"
+    )
+    parser.add_argument(
+        "--end", type=datetime.datetime.fromisoformat, help="e.g. 2024-01-02T07:00"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    reader = BinaryLogReader(args.log_path)
+    reader.export_csv(args.csv_file_path, reader.between(args.start, args.end))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import argparse
+import os
+import pathlib
+import resource
+import tempfile
+import threading
+import time
+from typing import Optional
+
+from hexalog.adapters.cli_logger import ColorfulCLILogger
+
+from cry_baby.app.adapters.recorders.synthetic_recorder import (
+    SignalSource,
+    SyntheticRecorder,
+    SyntheticRecordingSettings,
+)
+from cry_baby.app.core.ports import Repository
+from cry_baby.app.core.service import CryBabyService
+from cry_baby.cmd.classifiers import create_audio_file_client, create_classifier_loader
+
+
+class CountingRepository(Repository):
+    """
+    Counts predictions instead of storing them, and deletes the audio files once they are
+    classified so long soak tests do not fill the disk
+    """
+
+    def __init__(self):
+        self.predictions_saved = 0
+        self._lock = threading.Lock()
+
+    def save(
+        self,
+        audio_file_path: pathlib.Path,
+        prediction: float,
+        model_id: Optional[str] = None,
+    ):
+        audio_file_path.unlink(missing_ok=True)
+        with self._lock:
+            self.predictions_saved += 1
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run the pipeline against virtual microphones and report throughput and memory"
+    )
+    parser.add_argument("--microphones", type=int, default=1)
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="produce windows as fast as possible instead of in real time",
+    )
+    parser.add_argument(
+        "--signal",
+        choices=[source.value for source in SignalSource],
+        default=SignalSource.NOISE.value,
+    )
+    parser.add_argument("--audio-files", type=pathlib.Path, nargs="*", default=[])
+    parser.add_argument("--report-every-seconds", type=float, default=10)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logger = ColorfulCLILogger()
+
+    audio_file_client = create_audio_file_client(
+        os.getenv("AUDIO_FILE_CLIENT", "librosa")
+    )
+    if (model := create_classifier_loader(logger, audio_file_client)) is None:
+        return
+    model_version, load_classifier = model
+    classifier = load_classifier(model_version)
+    classifier.warm_up()
+
+    recorder = SyntheticRecorder(
+        temp_path=pathlib.Path(tempfile.mkdtemp(prefix="cry_baby_load_test_")),
+        logger=logger,
+        settings=SyntheticRecordingSettings(
+            recording_rate_hz=44100,
+            duration_seconds=model_version.mel_spectrogram_preprocessing_settings.duration_seconds,
+            signal_source=SignalSource(args.signal),
+            audio_files=args.audio_files,
+            number_of_microphones=args.microphones,
+            realtime=not args.fast,
+            # Keeps the producers in step with the service when running as fast as possible
+            max_queued_windows=0 if not args.fast else 2 * args.microphones,
+        ),
+    )
+    repository = CountingRepository()
+    service = CryBabyService(
+        logger=logger, classifier=classifier, recorder=recorder, repository=repository
+    )
+
+    service.continously_evaluate_from_microphone()
+    started_at = time.monotonic()
+    while (elapsed := time.monotonic() - started_at) < args.seconds:
+        time.sleep(min(args.report_every_seconds, args.seconds - elapsed))
+        elapsed = time.monotonic() - started_at
+        logger.info(
+            "Load test",
+            elapsed_seconds=round(elapsed, 1),
+            microphones=args.microphones,
+            windows_written=recorder.windows_written,
+            windows_classified=repository.predictions_saved,
+            backlog=recorder.windows_written - repository.predictions_saved,
+            windows_classified_per_second=round(
+                repository.predictions_saved / elapsed, 2
+            ),
+            # Kilobytes on linux, growth over a soak test points to a leak
+            max_rss=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        )
+    service.stop_continuous_evaluation()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import os
+import pathlib
+from typing import Optional
+
+from hexalog.ports import Logger
+
+from cry_baby.app.adapters.notifiers.json_lines_notifier import JsonLinesNotifier
+from cry_baby.app.adapters.notifiers.unix_socket_notifier import UnixSocketNotifier
+from cry_baby.app.adapters.notifiers.webhook_notifier import WebhookNotifier
+from cry_baby.app.core.domain import NotificationSettings
+from cry_baby.app.core.notifications import NotificationFanOut
+from cry_baby.app.core.ports import Notifier
+
+
+def create_notification_fan_out(logger: Logger) -> Optional[NotificationFanOut]:
+    """
+    Notifiers are chosen with the comma separated NOTIFIERS, from stdout, webhook
+    (posting to NOTIFY_WEBHOOK_URL) and unix (writing to the socket at NOTIFY_UNIX_SOCKET)
+    Set NOTIFY_PREDICTIONS to false to only publish cry events
+    """
+    notifiers: dict[str, Notifier] = {}
+    for name in filter(None, os.getenv("NOTIFIERS", "").split(",")):
+        match name.strip():
+            case "stdout":
+                notifiers["stdout"] = JsonLinesNotifier()
+            case "webhook":
+                notifiers["webhook"] = WebhookNotifier(os.environ["NOTIFY_WEBHOOK_URL"])
+            case "unix":
+                notifiers["unix"] = UnixSocketNotifier(
+                    pathlib.Path(os.environ["NOTIFY_UNIX_SOCKET"])
+                )
+            case unknown:
+                raise ValueError(
+                    f"Unknown notifier {unknown}, expected stdout, webhook or unix"
+                )
+    if not notifiers:
+        return None
+    return NotificationFanOut(
+        logger=logger,
+        notifiers=notifiers,
+        settings=NotificationSettings(
+            publish_predictions=os.getenv("NOTIFY_PREDICTIONS", "true").lower()
+            != "false"
+        ),
+    )
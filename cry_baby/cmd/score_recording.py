@@ -0,0 +1,69 @@
+import argparse
+import csv
+import os
+import pathlib
+
+from hexalog.adapters.cli_logger import ColorfulCLILogger
+
+from cry_baby.app.core.domain import ProbabilityTrack, SegmentationSettings
+from cry_baby.app.core.segmentation import RecordingSegmenter
+from cry_baby.cmd.classifiers import create_audio_file_client, create_classifier_loader
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Score a long recording window by window and write the probability track as CSV"
+    )
+    parser.add_argument("recording_path", type=pathlib.Path)
+    parser.add_argument("csv_file_path", type=pathlib.Path)
+    parser.add_argument("--hop-seconds", type=float, default=1.0)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=2,
+        help="number of classifiers scoring batches in parallel, each loads the model",
+    )
+    return parser.parse_args()
+
+
+def write_csv(track: ProbabilityTrack, csv_file_path: pathlib.Path):
+    with open(csv_file_path, "w", newline="") as file:
+        writer = csv.writer(file, lineterminator="\n")
+        writer.writerow(["start_seconds", "end_seconds", "prediction"])
+        for start_seconds, prediction in zip(track.start_seconds, track.predictions):
+            writer.writerow(
+                [start_seconds, start_seconds + track.window_seconds, prediction]
+            )
+
+
+def main():
+    args = parse_args()
+    logger = ColorfulCLILogger()
+    audio_file_client = create_audio_file_client(
+        os.getenv("AUDIO_FILE_CLIENT", "librosa")
+    )
+    if (model := create_classifier_loader(logger, audio_file_client)) is None:
+        return
+    model_version, load_classifier = model
+
+    classifiers = []
+    for _ in range(args.workers):
+        classifier = load_classifier(model_version)
+        classifier.warm_up()
+        classifiers.append(classifier)
+
+    segmenter = RecordingSegmenter(
+        logger=logger,
+        audio_file_client=audio_file_client,
+        classifiers=classifiers,
+        settings=SegmentationSettings(
+            hop_seconds=args.hop_seconds, batch_size=args.batch_size
+        ),
+    )
+    write_csv(segmenter.score(args.recording_path), args.csv_file_path)
+    logger.info("Wrote probability track", csv_file_path=str(args.csv_file_path))
+
+
+if __name__ == "__main__":
+    main()
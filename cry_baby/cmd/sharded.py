@@ -0,0 +1,227 @@
+"""
+Capture and inference in separate processes.
+
+A small capture process reads the microphone into a ring buffer in shared memory and does
+nothing else, so a slow or crashed model can not make it drop audio. Each inference process
+attaches to the ring and classifies its shard of the windows. The supervisor, this process,
+owns the ring, restarts any process which exits and records, detects cries in and notifies
+about the predictions of every inference process.
+
+Windows start every clip duration divided by the number of inference processes, so more
+processes give finer time resolution. Each process still classifies one window per clip
+duration, so they do not spread the load of a model which can not keep up on its own.
+
+Only what the capture process needs is imported at module level, the spawned processes
+import this module again.
+"""
+
+import multiprocessing.queues
+import os
+import pathlib
+import signal
+import sys
+import threading
+from multiprocessing.sharedctypes import Synchronized
+from typing import TYPE_CHECKING
+
+import hexalog.ports
+from hexalog.adapters.cli_logger import ColorfulCLILogger
+
+from cry_baby.app.adapters.recorders.shared_audio_ring import SharedAudioRing
+from cry_baby.app.core.supervisor import ProcessSupervisor
+
+if TYPE_CHECKING:
+    from cry_baby.app.core.service import CryBabyService
+
+TEMP_PATH = pathlib.Path("/tmp")
+RECORDING_RATE_HZ = 44100
+DURATION_SECONDS = 4
+FRAMES_PER_BUFFER = 1024
+# Inference processes can fall this far behind capture before windows are skipped
+RING_SECONDS = 60
+# Predictions waiting for the supervisor before inference processes start dropping them
+PENDING_PREDICTIONS = 1000
+# An inference process which handles no window for this long, including loading the model
+# when it starts, is assumed to be hung and is restarted
+HEARTBEAT_TIMEOUT_SECONDS = 120
+HEARTBEAT_INTERVAL_SECONDS = 1
+
+
+def capture(ring_name: str):
+    import pyaudio
+
+    from cry_baby.app.adapters.recorders.pyaudio_recorder import (
+        PyaudioRecorder,
+        PyaudioRecordingSettings,
+    )
+
+    # ctrl+c is handled by the supervisor, which terminates this process
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logger = ColorfulCLILogger()
+    recorder = PyaudioRecorder(
+        temp_path=TEMP_PATH,
+        logger=logger,
+        settings=PyaudioRecordingSettings(
+            audio_file_format=pyaudio.paInt16,
+            number_of_audio_signals=1,
+            frames_per_buffer=FRAMES_PER_BUFFER,
+            recording_rate_hz=RECORDING_RATE_HZ,
+            duration_seconds=DURATION_SECONDS,
+        ),
+    )
+    recorder.capture_into(SharedAudioRing.attach(ring_name), threading.Event())
+
+
+def infer(
+    ring_name: str,
+    shard_index: int,
+    number_of_shards: int,
+    prediction_queue: multiprocessing.queues.Queue,
+    heartbeat: Synchronized,
+):
+    from cry_baby.app.adapters.recorders.shared_memory_recorder import (
+        SharedMemoryRecorder,
+    )
+    from cry_baby.app.adapters.repositories.queue_repo import QueueRepo
+    from cry_baby.app.core.registry import ModelRegistry
+    from cry_baby.app.core.service import CryBabyService
+    from cry_baby.cmd.classifiers import (
+        create_audio_file_client,
+        create_classifier_loader,
+        reload_in_background,
+    )
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logger = ColorfulCLILogger()
+
+    audio_file_client = create_audio_file_client(
+        os.getenv("AUDIO_FILE_CLIENT", "librosa")
+    )
+    if (model := create_classifier_loader(logger, audio_file_client)) is None:
+        raise LookupError("No classifier is available")
+    model_version, load_classifier = model
+    classifier = load_classifier(model_version)
+    classifier.warm_up()
+    registry = ModelRegistry(
+        logger=logger,
+        model_version=model_version,
+        classifier=classifier,
+        capture_duration_seconds=DURATION_SECONDS,
+        capture_sampling_rate_hz=RECORDING_RATE_HZ,
+    )
+    signal.signal(
+        signal.SIGHUP,
+        lambda signum, frame: reload_in_background(logger, registry, load_classifier),
+    )
+
+    recorder = SharedMemoryRecorder(
+        temp_path=TEMP_PATH,
+        logger=logger,
+        ring_name=ring_name,
+        duration_seconds=DURATION_SECONDS,
+        shard_index=shard_index,
+        number_of_shards=number_of_shards,
+    )
+    # Windows overlap so every process still gets one window per clip duration, the
+    # hop is fixed as the shards only agree on which window is whose for a fixed hop
+    recorder.set_hop_seconds(DURATION_SECONDS / number_of_shards)
+    # Detection and notification happen once, in the supervisor, for all shards
+    service = CryBabyService(
+        logger=logger,
+        classifier=classifier,
+        recorder=recorder,
+        repository=QueueRepo(logger, prediction_queue, shard_index),
+        registry=registry,
+    )
+    serve(logger, service, heartbeat)
+
+
+def serve(
+    logger: hexalog.ports.Logger, service: "CryBabyService", heartbeat: Synchronized
+):
+    """
+    Evaluate windows, publishing how many have been handled on heartbeat, until the service
+    thread ends, which it only does when handling a window raised. The process then exits
+    non zero so the supervisor restarts it.
+    """
+    service.continously_evaluate_from_microphone()
+    while service.thread.is_alive():
+        heartbeat.value = service.windows_handled
+        service.thread.join(HEARTBEAT_INTERVAL_SECONDS)
+    logger.error("Inference stopped, exiting to be restarted")
+    sys.exit(1)
+
+
+def main():
+    from cry_baby.app.adapters.repositories.binary_repo import BinaryRepo
+    from cry_baby.app.adapters.repositories.csv_repo import CSVRepo
+    from cry_baby.app.core.aggregator import PredictionAggregator
+    from cry_baby.app.core.detector import CryDetector
+    from cry_baby.app.core.domain import CryDetectorSettings
+    from cry_baby.app.core.ports import Repository
+    from cry_baby.cmd.notifiers import create_notification_fan_out
+
+    logger = ColorfulCLILogger()
+    number_of_shards = int(os.getenv("INFERENCE_PROCESSES", "2"))
+
+    repository: Repository
+    match os.getenv("PREDICTIONS_FORMAT", "csv"):
+        case "csv":
+            repository = CSVRepo(csv_file_path=pathlib.Path("predictions.csv"))
+        case "binary":
+            repository = BinaryRepo(log_path=pathlib.Path("predictions.bin"))
+        case predictions_format:
+            logger.error(
+                "Unknown PREDICTIONS_FORMAT, expected csv or binary",
+                predictions_format=predictions_format,
+            )
+            return
+    aggregator = PredictionAggregator(
+        logger=logger,
+        repository=repository,
+        detector=CryDetector(CryDetectorSettings()),
+        notifier=create_notification_fan_out(logger),
+    )
+
+    ring = SharedAudioRing.create(
+        capacity_frames=RING_SECONDS * RECORDING_RATE_HZ,
+        sampling_rate_hz=RECORDING_RATE_HZ,
+    )
+    supervisor = ProcessSupervisor(logger)
+    prediction_queue = supervisor.context.Queue(maxsize=PENDING_PREDICTIONS)
+    supervisor.add("capture", capture, ring.name)
+    for shard_index in range(number_of_shards):
+        supervisor.add(
+            f"inference-{shard_index}",
+            infer,
+            ring.name,
+            shard_index,
+            number_of_shards,
+            prediction_queue,
+            heartbeat_timeout_seconds=HEARTBEAT_TIMEOUT_SECONDS,
+        )
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    aggregator_thread = threading.Thread(
+        target=aggregator.run, args=(prediction_queue, stop_event)
+    )
+    aggregator_thread.start()
+    logger.info(
+        "Starting capture and inference processes",
+        ring=ring.name,
+        inference_processes=number_of_shards,
+    )
+    try:
+        logger.info("Press ctr+c to stop")
+        supervisor.run(stop_event)
+    except KeyboardInterrupt:
+        logger.info("Stopping")
+    finally:
+        stop_event.set()
+        aggregator_thread.join()
+        ring.close()
+
+
+if __name__ == "__main__":
+    main()
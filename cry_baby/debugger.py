@@ -6,6 +6,7 @@ from app.adapters.recorders.pyaudio_recorder import (
     PyaudioRecorder,
     PyaudioRecordingSettings,
 )
+from app.core.domain import ModelVersion
 from app.core.service import CryBabyService
 from hexalog.adapters.cli_logger import ColorfulCLILogger
 from huggingface_hub import from_pretrained_keras
@@ -29,12 +30,8 @@ def main():
 
     librosa_audio_file_client = LibrosaClient()
 
-    # TODO: The model should keep the mel_spectrogram_preprocessing_settings with it along with the recording settings
-    model = from_pretrained_keras("ericcbonet/cry-baby")
-
-    classifier = TensorFlowClassifier(
-        model=model,
-        audio_file_client=librosa_audio_file_client,
+    model_version = ModelVersion(
+        model_id="ericcbonet/cry-baby",
         mel_spectrogram_preprocessing_settings=MelSpectrogramPreprocessingSettings(
             sampling_rate_hz=16000,
             number_of_mel_bands=128,
@@ -42,6 +39,13 @@ def main():
             hop_length=512,
         ),
     )
+    model = from_pretrained_keras(model_version.model_id)
+
+    classifier = TensorFlowClassifier(
+        model=model,
+        audio_file_client=librosa_audio_file_client,
+        mel_spectrogram_preprocessing_settings=model_version.mel_spectrogram_preprocessing_settings,
+    )
 
     CryBabyService(
         logger=logger, classifier=classifier, recorder=recorder
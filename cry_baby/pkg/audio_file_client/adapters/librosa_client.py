@@ -1,4 +1,5 @@
 import pathlib
+from typing import Iterator
 
 import librosa
 import numpy as np
@@ -10,15 +11,41 @@ from cry_baby.pkg.audio_file_client.core.domain import (
     LoadError,
     UnexpectedDurationError,
 )
+from cry_baby.pkg.audio_file_client.core.segmentation import windows_from_blocks
+from cry_baby.pkg.audio_file_client.core.spectrogram import (
+    as_float_samples,
+    calc_target_shape,
+    empty_model_input,
+    postprocess_into,
+)
 
 
 class LibrosaClient(ports.AudioFileClient):
-    cached_files: dict[pathlib.Path, tuple[np.ndarray, float]] = {}
-
     def extract_mel_spectrogram(
         self,
         audio_file_path: pathlib.Path,
         pre_processing_settings: domain.MelSpectrogramPreprocessingSettings,
+    ) -> np.ndarray:
+        """
+        Its assumed the audio files passed into this function are already
+        trimmed to the correct length
+        """
+        out = empty_model_input(
+            calc_target_shape(
+                pre_processing_settings.sampling_rate_hz,
+                pre_processing_settings.duration_seconds,
+                pre_processing_settings.number_of_mel_bands,
+                pre_processing_settings.hop_length,
+            )
+        )
+        self.extract_mel_spectrogram_into(audio_file_path, pre_processing_settings, out)
+        return out[0, :, :, 0]
+
+    def extract_mel_spectrogram_into(
+        self,
+        audio_file_path: pathlib.Path,
+        pre_processing_settings: domain.MelSpectrogramPreprocessingSettings,
+        out: np.ndarray,
     ) -> np.ndarray:
         """
         Its assumed the audio files passed into this function are already
@@ -53,48 +80,51 @@ class LibrosaClient(ports.AudioFileClient):
                 "they should be the same"
             )
 
-        mel_spectrogram = melspectrogram(
-            y=y,
-            sr=sr,
-            n_mels=pre_processing_settings.number_of_mel_bands,
-            hop_length=pre_processing_settings.hop_length,
-        )
-
-        target_shape = _calc_target_shape(
-            pre_processing_settings.sampling_rate_hz,
-            pre_processing_settings.duration_seconds,
-            pre_processing_settings.number_of_mel_bands,
-            pre_processing_settings.hop_length,
-        )
-
-        if mel_spectrogram.shape != target_shape:
-            mel_spectrogram = _resize_matrix(mel_spectrogram, target_shape)
+        return self._mel_spectrogram_into(y, pre_processing_settings, out)
 
-        # Taking the logarithm of the Mel spectrogram is a common step because
-        # human perception of sound intensity is logarithmic in nature
-        log_mel_spectrogram = librosa.power_to_db(mel_spectrogram)
+    def extract_mel_spectrogram_from_samples_into(
+        self,
+        samples: np.ndarray,
+        sampling_rate_hz: int,
+        pre_processing_settings: domain.MelSpectrogramPreprocessingSettings,
+        out: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Resampled with librosa.resample, which uses the same filter as librosa.load
+        """
+        if (duration := round(len(samples) / sampling_rate_hz, 1)) != round(
+            pre_processing_settings.duration_seconds, 1
+        ):
+            raise UnexpectedDurationError(
+                f"Samples have duration {duration} seconds, "
+                f"but the pre_processing_settings.duration_seconds is {pre_processing_settings.duration_seconds}"
+            )
 
-        # Normalization
-        log_mel_spectrogram = (
-            log_mel_spectrogram - np.mean(log_mel_spectrogram)
-        ) / np.std(log_mel_spectrogram)
+        y = as_float_samples(samples)
+        if sampling_rate_hz != pre_processing_settings.sampling_rate_hz:
+            y = librosa.resample(
+                y,
+                orig_sr=sampling_rate_hz,
+                target_sr=pre_processing_settings.sampling_rate_hz,
+            )
 
-        return log_mel_spectrogram
+        return self._mel_spectrogram_into(y, pre_processing_settings, out)
 
     def get_duration(
         self, path_to_audio_file: pathlib.Path, hop_length: int, sampling_rate_hz: int
     ) -> float:
         """
         Get the duration of the audio file in seconds using librosa.
+        It is read from the header for the formats soundfile supports, other formats are decoded.
         """
-        y, sr = self._load(path_to_audio_file, sampling_rate_hz)
-        return librosa.get_duration(y=y, sr=sr, hop_length=hop_length)
+        return self._read_duration(path_to_audio_file)
 
     def crop(
         self, path: pathlib.Path, start_seconds: float, end_seconds: float
     ) -> pathlib.Path:
         """
         Crop the audio file using librosa and return the path to the cropped audio file.
+        librosa seeks to the offset and only reads the requested frames for the formats soundfile supports.
         """
         y, sr = librosa.load(
             path, sr=None, offset=start_seconds, duration=end_seconds - start_seconds
@@ -103,15 +133,46 @@ class LibrosaClient(ports.AudioFileClient):
         sf.write(cropped_file_path, y, sr)
         return cropped_file_path
 
+    def stream_windows(
+        self,
+        path: pathlib.Path,
+        duration_seconds: float,
+        hop_seconds: float,
+        block_seconds: float = 30,
+    ) -> Iterator[domain.AudioWindow]:
+        """
+        Blocks are read with soundfile, librosa.stream can not hop further than a window
+        """
+        try:
+            audio_file = sf.SoundFile(path)
+        except Exception as e:
+            raise LoadError(f"Error loading audio file {path}: {e}")
+        with audio_file:
+            sr = audio_file.samplerate
+            blocks = audio_file.blocks(
+                blocksize=max(1, int(block_seconds * sr)),
+                dtype="float32",
+                always_2d=True,
+            )
+            for start, samples in windows_from_blocks(
+                (np.mean(block, axis=1) for block in blocks),
+                window_length=int(duration_seconds * sr),
+                hop_length=max(1, int(hop_seconds * sr)),
+            ):
+                yield domain.AudioWindow(
+                    start_seconds=start / sr, samples=samples, sampling_rate_hz=sr
+                )
+
     def pad(self, path: pathlib.Path, duration: float) -> pathlib.Path:
         """
         Pad the audio file with silence to the specified duration and return the path to the padded audio file.
         This assumes that the audio file is shorter than the duration.
         """
-        y, sr = librosa.load(path, sr=None)
-        current_duration = librosa.get_duration(y=y, sr=sr)
+        current_duration = self._read_duration(path)
 
         if current_duration < duration:
+            y, sr = librosa.load(path, sr=None)
+
             # Calculate the length of the silence to add (in samples)
             silence_length = int((duration - current_duration) * sr)
 
@@ -125,43 +186,34 @@ class LibrosaClient(ports.AudioFileClient):
             # If the audio is already longer than the specified duration, return the original path
             return path
 
+    @staticmethod
+    def _mel_spectrogram_into(
+        y: np.ndarray,
+        pre_processing_settings: domain.MelSpectrogramPreprocessingSettings,
+        out: np.ndarray,
+    ) -> np.ndarray:
+        mel_spectrogram = melspectrogram(
+            y=y,
+            sr=pre_processing_settings.sampling_rate_hz,
+            n_mels=pre_processing_settings.number_of_mel_bands,
+            hop_length=pre_processing_settings.hop_length,
+        )
+
+        return postprocess_into(mel_spectrogram, out)
+
+    @staticmethod
+    def _read_duration(path: pathlib.Path) -> float:
+        try:
+            return librosa.get_duration(path=path)
+        except Exception as e:
+            raise LoadError(f"Error reading the duration of audio file {path}: {e}")
+
     @staticmethod
     def _load(path: pathlib.Path, sampling_rate_hz: int) -> tuple[np.ndarray, float]:
         """
         Load the audio file using librosa.
-        if it is not contained in our local in memory cache.
         """
-        cache = LibrosaClient.cached_files.get(path)
-        if cache:
-            return cache
         try:
-            y, sr = librosa.load(path, sr=sampling_rate_hz)
+            return librosa.load(path, sr=sampling_rate_hz)
         except Exception as e:
             raise LoadError(f"Error loading audio file {path}: {e}")
-        LibrosaClient.cached_files[path] = (y, sr)
-        return y, sr
-
-
-def _calc_target_shape(
-    sampling_rate_hz: int,
-    duration_seconds: int,
-    number_of_mel_bands: int,
-    hop_length: int,
-) -> tuple[int, int]:
-    number_of_samples = duration_seconds * sampling_rate_hz
-    number_of_frames = int((number_of_samples + hop_length) / hop_length)
-    return number_of_mel_bands, number_of_frames
-
-
-def _resize_matrix(matrix: np.ndarray, target_shape: tuple[int, int]) -> np.ndarray:
-    if matrix.shape[1] < target_shape[1]:
-        padding = np.zeros(
-            (
-                matrix.shape[0],
-                target_shape[1] - matrix.shape[1],
-            )
-        )
-        return np.hstack((matrix, padding))
-    elif matrix.shape[1] > target_shape[1]:
-        matrix = matrix[:, : target_shape[1]]
-    return matrix
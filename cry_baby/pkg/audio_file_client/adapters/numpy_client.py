@@ -0,0 +1,385 @@
+import math
+import pathlib
+from typing import Iterator
+
+import numpy as np
+import soundfile as sf
+
+from cry_baby.pkg.audio_file_client.core import domain, ports
+from cry_baby.pkg.audio_file_client.core.domain import (
+    LoadError,
+    UnexpectedDurationError,
+)
+from cry_baby.pkg.audio_file_client.core.segmentation import windows_from_blocks
+from cry_baby.pkg.audio_file_client.core.spectrogram import (
+    as_float_samples,
+    calc_target_shape,
+    empty_model_input,
+    postprocess_into,
+)
+
+# Matches the librosa default used by LibrosaClient, the model was trained with it
+N_FFT = 2048
+# Amplitude response of the soxr "HQ" filter librosa.resample uses, measured with tones
+# from RESAMPLE_PASSBAND of the lower nyquist frequency up to it in RESAMPLE_RESPONSE_STEP
+# steps. Below RESAMPLE_PASSBAND the filter is flat.
+RESAMPLE_PASSBAND = 0.9
+RESAMPLE_RESPONSE_STEP = 0.0025
+RESAMPLE_RESPONSE = (
+    1, 1, 1, 1, 1, 1, 1, 1, 1, 0.999, 0.998, 0.996, 0.992, 0.985,
+    0.973, 0.955, 0.929, 0.893, 0.847, 0.79, 0.722, 0.646, 0.563, 0.478,
+    0.394, 0.315, 0.242, 0.18, 0.128, 0.0868, 0.0561, 0.0343, 0.0197, 0.0105,
+    0.00513, 0.00226, 0.000872, 0.000281, 6.86e-05, 9.98e-06, 1.73e-08,
+)  # fmt: skip
+# Seconds of silence added around the samples while resampling, so the start and end of
+# the clip do not wrap around into each other
+RESAMPLE_PADDING_SECONDS = 0.02
+
+
+class NumpyClient(ports.AudioFileClient):
+    """
+    An AudioFileClient that only depends on numpy and soundfile.
+
+    It reproduces LibrosaClient.extract_mel_spectrogram (hann window, centered
+    STFT with zero padding, slaney mel filter bank, power_to_db) without
+    importing librosa, which pulls in numba, scipy, soxr and audioread and
+    dominates cold start time on small devices.
+
+    Resampling is done in the frequency domain rather than with soxr, shaped to
+    soxr's measured response. Recordings which are not already at the target
+    sampling rate differ from LibrosaClient by a few hundredths of a normalised
+    unit at most, mostly in the top mel bands.
+    """
+
+    def __init__(self):
+        self._windows: dict[int, np.ndarray] = {}
+        self._mel_filter_banks: dict[tuple[int, int, int], np.ndarray] = {}
+
+    def extract_mel_spectrogram(
+        self,
+        audio_file_path: pathlib.Path,
+        pre_processing_settings: domain.MelSpectrogramPreprocessingSettings,
+    ) -> np.ndarray:
+        """
+        Its assumed the audio files passed into this function are already
+        trimmed to the correct length
+        """
+        out = empty_model_input(
+            calc_target_shape(
+                pre_processing_settings.sampling_rate_hz,
+                pre_processing_settings.duration_seconds,
+                pre_processing_settings.number_of_mel_bands,
+                pre_processing_settings.hop_length,
+            )
+        )
+        self.extract_mel_spectrogram_into(audio_file_path, pre_processing_settings, out)
+        return out[0, :, :, 0]
+
+    def extract_mel_spectrogram_into(
+        self,
+        audio_file_path: pathlib.Path,
+        pre_processing_settings: domain.MelSpectrogramPreprocessingSettings,
+        out: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Its assumed the audio files passed into this function are already
+        trimmed to the correct length
+        """
+        if not audio_file_path.exists() or not audio_file_path.is_file():
+            raise FileNotFoundError
+
+        if (
+            duration := round(
+                self.get_duration(
+                    path_to_audio_file=audio_file_path,
+                    hop_length=pre_processing_settings.hop_length,
+                    sampling_rate_hz=pre_processing_settings.sampling_rate_hz,
+                ),
+                1,
+            )
+        ) != round(pre_processing_settings.duration_seconds, 1):
+            raise UnexpectedDurationError(
+                f"Audio file {audio_file_path} has duration {duration} seconds, "
+                f"but the pre_processing_settings.duration_seconds is {pre_processing_settings.duration_seconds}"
+            )
+
+        y = self._load(audio_file_path, pre_processing_settings.sampling_rate_hz)
+
+        return self._mel_spectrogram_into(y, pre_processing_settings, out)
+
+    def extract_mel_spectrogram_from_samples_into(
+        self,
+        samples: np.ndarray,
+        sampling_rate_hz: int,
+        pre_processing_settings: domain.MelSpectrogramPreprocessingSettings,
+        out: np.ndarray,
+    ) -> np.ndarray:
+        if (duration := round(len(samples) / sampling_rate_hz, 1)) != round(
+            pre_processing_settings.duration_seconds, 1
+        ):
+            raise UnexpectedDurationError(
+                f"Samples have duration {duration} seconds, "
+                f"but the pre_processing_settings.duration_seconds is {pre_processing_settings.duration_seconds}"
+            )
+
+        y = as_float_samples(samples)
+        if sampling_rate_hz != pre_processing_settings.sampling_rate_hz:
+            y = _resample(y, sampling_rate_hz, pre_processing_settings.sampling_rate_hz)
+
+        return self._mel_spectrogram_into(y, pre_processing_settings, out)
+
+    def get_duration(
+        self, path_to_audio_file: pathlib.Path, hop_length: int, sampling_rate_hz: int
+    ) -> float:
+        """
+        Get the duration of the audio file in seconds from its header, nothing is decoded.
+        """
+        number_of_frames, sr = _read_info(path_to_audio_file)
+        return number_of_frames / sr
+
+    def crop(
+        self, path: pathlib.Path, start_seconds: float, end_seconds: float
+    ) -> pathlib.Path:
+        """
+        Crop the audio file, only reading the requested frames, and return the path to the cropped audio file.
+        """
+        _, sr = _read_info(path)
+        y, sr = _read_mono(
+            path,
+            start_frame=int(start_seconds * sr),
+            number_of_frames=int((end_seconds - start_seconds) * sr),
+        )
+        cropped_file_path = path.with_suffix(".cropped" + path.suffix)
+        sf.write(cropped_file_path, y, sr)
+        return cropped_file_path
+
+    def stream_windows(
+        self,
+        path: pathlib.Path,
+        duration_seconds: float,
+        hop_seconds: float,
+        block_seconds: float = 30,
+    ) -> Iterator[domain.AudioWindow]:
+        _, sr = _read_info(path)
+        for start, samples in windows_from_blocks(
+            _read_mono_blocks(path, max(1, int(block_seconds * sr))),
+            window_length=int(duration_seconds * sr),
+            hop_length=max(1, int(hop_seconds * sr)),
+        ):
+            yield domain.AudioWindow(
+                start_seconds=start / sr, samples=samples, sampling_rate_hz=sr
+            )
+
+    def pad(self, path: pathlib.Path, duration: float) -> pathlib.Path:
+        """
+        Pad the audio file with silence to the specified duration and return the path to the padded audio file.
+        This assumes that the audio file is shorter than the duration.
+        """
+        number_of_frames, sr = _read_info(path)
+        current_duration = number_of_frames / sr
+
+        if current_duration < duration:
+            y, sr = _read_mono(path)
+            silence_length = int((duration - current_duration) * sr)
+            padded_audio = np.concatenate((y, np.zeros(silence_length, dtype=y.dtype)))
+
+            padded_file_path = path.with_suffix(".padded" + path.suffix)
+            sf.write(padded_file_path, padded_audio, sr)
+            return padded_file_path
+        else:
+            return path
+
+    def _load(self, path: pathlib.Path, sampling_rate_hz: int) -> np.ndarray:
+        y, sr = _read_mono(path)
+        if sr != sampling_rate_hz:
+            y = _resample(y, sr, sampling_rate_hz)
+        return y
+
+    def _mel_spectrogram_into(
+        self,
+        y: np.ndarray,
+        pre_processing_settings: domain.MelSpectrogramPreprocessingSettings,
+        out: np.ndarray,
+    ) -> np.ndarray:
+        mel_spectrogram = self._melspectrogram(
+            y,
+            sampling_rate_hz=pre_processing_settings.sampling_rate_hz,
+            number_of_mel_bands=pre_processing_settings.number_of_mel_bands,
+            hop_length=pre_processing_settings.hop_length,
+        )
+
+        return postprocess_into(mel_spectrogram, out)
+
+    def _melspectrogram(
+        self,
+        y: np.ndarray,
+        sampling_rate_hz: int,
+        number_of_mel_bands: int,
+        hop_length: int,
+    ) -> np.ndarray:
+        window = self._windows.get(N_FFT)
+        if window is None:
+            window = _hann_window(N_FFT)
+            self._windows[N_FFT] = window
+
+        key = (sampling_rate_hz, N_FFT, number_of_mel_bands)
+        mel_filter_bank = self._mel_filter_banks.get(key)
+        if mel_filter_bank is None:
+            mel_filter_bank = _mel_filter_bank(*key)
+            self._mel_filter_banks[key] = mel_filter_bank
+
+        # Centered frames, padded with zeros the same way librosa.stft does by default
+        padded = np.pad(y, N_FFT // 2)
+        if len(padded) < N_FFT:
+            padded = np.pad(padded, (0, N_FFT - len(padded)))
+        frames = np.lib.stride_tricks.sliding_window_view(padded, N_FFT)[::hop_length]
+        spectrum = np.fft.rfft(frames * window, axis=-1)
+        power = spectrum.real**2 + spectrum.imag**2
+        return (mel_filter_bank @ power.T).astype(np.float32)
+
+
+def _read_info(path: pathlib.Path) -> tuple[int, int]:
+    """
+    The number of frames and the sampling rate, read from the header of the file
+    """
+    try:
+        info = sf.info(str(path))
+    except Exception as e:
+        raise LoadError(f"Error reading the header of audio file {path}: {e}")
+    return info.frames, info.samplerate
+
+
+def _read_mono(
+    path: pathlib.Path, start_frame: int = 0, number_of_frames: int = -1
+) -> tuple[np.ndarray, int]:
+    """
+    Read number_of_frames frames from start_frame, all of them by default
+    The file is seeked rather than decoded up to start_frame
+    """
+    try:
+        y, sr = sf.read(
+            path,
+            frames=number_of_frames,
+            start=start_frame,
+            dtype="float32",
+            always_2d=True,
+        )
+    except Exception as e:
+        raise LoadError(f"Error loading audio file {path}: {e}")
+    return np.mean(y, axis=1), sr
+
+
+def _read_mono_blocks(path: pathlib.Path, blocksize: int) -> Iterator[np.ndarray]:
+    try:
+        audio_file = sf.SoundFile(path)
+    except Exception as e:
+        raise LoadError(f"Error loading audio file {path}: {e}")
+    with audio_file:
+        for block in audio_file.blocks(
+            blocksize=blocksize, dtype="float32", always_2d=True
+        ):
+            yield np.mean(block, axis=1)
+
+
+def _resample(y: np.ndarray, original_sr: int, target_sr: int) -> np.ndarray:
+    """
+    Band limited resampling by truncating or zero padding the spectrum.
+    The top of the shared band is shaped with the response of the soxr filter librosa
+    uses. The output length matches librosa.resample.
+    """
+    number_of_samples = int(math.ceil(len(y) * target_sr / original_sr))
+    # A whole number of samples at both rates, so the output grid is not shifted
+    padding_step = original_sr // math.gcd(original_sr, target_sr)
+    padding = padding_step * math.ceil(
+        RESAMPLE_PADDING_SECONDS * original_sr / padding_step
+    )
+    padded = np.pad(y, padding)
+    number_of_padded_samples = len(padded) * target_sr // original_sr
+
+    spectrum = np.fft.rfft(padded)
+    resampled_spectrum = np.zeros(
+        number_of_padded_samples // 2 + 1, dtype=spectrum.dtype
+    )
+    number_of_bins = min(len(spectrum), len(resampled_spectrum))
+    resampled_spectrum[:number_of_bins] = spectrum[
+        :number_of_bins
+    ] * _resample_response(number_of_bins)
+    resampled = np.fft.irfft(resampled_spectrum, n=number_of_padded_samples)
+    resampled *= number_of_padded_samples / len(padded)
+    start = padding * target_sr // original_sr
+    return resampled[start : start + number_of_samples].astype(np.float32)
+
+
+def _resample_response(number_of_bins: int) -> np.ndarray:
+    """
+    The gain of each bin up to the lower nyquist frequency, interpolated in decibels
+    """
+    normalised_frequencies = np.linspace(0, 1, number_of_bins)
+    response_frequencies = RESAMPLE_PASSBAND + RESAMPLE_RESPONSE_STEP * np.arange(
+        len(RESAMPLE_RESPONSE)
+    )
+    log_gains = np.interp(
+        normalised_frequencies, response_frequencies, np.log(RESAMPLE_RESPONSE)
+    )
+    return np.exp(log_gains)
+
+
+def _hann_window(n_fft: int) -> np.ndarray:
+    """
+    Periodic hann window, as returned by scipy.signal.get_window("hann", n_fft)
+    """
+    return 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n_fft) / n_fft)
+
+
+def _hz_to_mel(frequencies: np.ndarray) -> np.ndarray:
+    """
+    Slaney's auditory toolbox mel scale, linear below 1 kHz and logarithmic above.
+    """
+    f_sp = 200.0 / 3
+    mels = frequencies / f_sp
+    min_log_hz = 1000.0
+    min_log_mel = min_log_hz / f_sp
+    logstep = np.log(6.4) / 27.0
+    log_region = frequencies >= min_log_hz
+    mels[log_region] = (
+        min_log_mel + np.log(frequencies[log_region] / min_log_hz) / logstep
+    )
+    return mels
+
+
+def _mel_to_hz(mels: np.ndarray) -> np.ndarray:
+    f_sp = 200.0 / 3
+    frequencies = f_sp * mels
+    min_log_hz = 1000.0
+    min_log_mel = min_log_hz / f_sp
+    logstep = np.log(6.4) / 27.0
+    log_region = mels >= min_log_mel
+    frequencies[log_region] = min_log_hz * np.exp(
+        logstep * (mels[log_region] - min_log_mel)
+    )
+    return frequencies
+
+
+def _mel_filter_bank(
+    sampling_rate_hz: int, n_fft: int, number_of_mel_bands: int
+) -> np.ndarray:
+    """
+    Slaney normalised triangular filters, equivalent to librosa.filters.mel with its defaults
+    """
+    fft_frequencies = np.fft.rfftfreq(n_fft, d=1.0 / sampling_rate_hz)
+    mel_edges = np.linspace(
+        _hz_to_mel(np.array([0.0]))[0],
+        _hz_to_mel(np.array([sampling_rate_hz / 2.0]))[0],
+        number_of_mel_bands + 2,
+    )
+    mel_frequencies = _mel_to_hz(mel_edges)
+
+    frequency_differences = np.diff(mel_frequencies)
+    ramps = np.subtract.outer(mel_frequencies, fft_frequencies)
+    lower = -ramps[:-2] / frequency_differences[:-1, np.newaxis]
+    upper = ramps[2:] / frequency_differences[1:, np.newaxis]
+    weights = np.maximum(0, np.minimum(lower, upper))
+
+    enorm = 2.0 / (mel_frequencies[2:] - mel_frequencies[:-2])
+    weights *= enorm[:, np.newaxis]
+    return weights.astype(np.float32)
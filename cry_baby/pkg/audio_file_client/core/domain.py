@@ -1,5 +1,7 @@
 from dataclasses import dataclass
 
+import numpy as np
+
 
 @dataclass
 class MelSpectrogramPreprocessingSettings:
@@ -42,6 +44,18 @@ class MelSpectrogramPreprocessingSettings:
         )
 
 
+@dataclass(frozen=True)
+class AudioWindow:
+    """
+    A window of mono float32 samples from a longer recording, start_seconds after its start.
+    A window running past the end of the recording is padded with silence.
+    """
+
+    start_seconds: float
+    samples: np.ndarray
+    sampling_rate_hz: int
+
+
 class LoadError(Exception):
     pass
 
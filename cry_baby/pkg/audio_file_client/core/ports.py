@@ -1,5 +1,6 @@
 import pathlib
 from abc import ABC, abstractmethod
+from typing import Iterator
 
 import numpy as np
 
@@ -30,6 +31,21 @@ class AudioFileClient(ABC):
         This assumes that the audio file is shorter than the duration
         """
 
+    @abstractmethod
+    def stream_windows(
+        self,
+        path: pathlib.Path,
+        duration_seconds: float,
+        hop_seconds: float,
+        block_seconds: float = 30,
+    ) -> Iterator[domain.AudioWindow]:
+        """
+        Read the audio file block_seconds at a time and yield a window of duration_seconds
+        every hop_seconds, at the file's sampling rate. The audio after the last whole
+        window is yielded as a window padded with silence.
+        Only the current block and the unfinished window are held in memory
+        """
+
     @abstractmethod
     def extract_mel_spectrogram(
         self,
@@ -39,3 +55,28 @@ class AudioFileClient(ABC):
         """
         Extract the mel spectrogram
         """
+
+    @abstractmethod
+    def extract_mel_spectrogram_into(
+        self,
+        audio_file_path: pathlib.Path,
+        pre_processing_settings: domain.MelSpectrogramPreprocessingSettings,
+        out: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Extract the mel spectrogram into out, a pre allocated float32 buffer
+        shaped as the model input (1, number_of_mel_bands, frames, 1)
+        """
+
+    @abstractmethod
+    def extract_mel_spectrogram_from_samples_into(
+        self,
+        samples: np.ndarray,
+        sampling_rate_hz: int,
+        pre_processing_settings: domain.MelSpectrogramPreprocessingSettings,
+        out: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Extract the mel spectrogram of mono samples already in memory into out
+        Integer samples are scaled to [-1, 1] the same way they are when read from a file
+        """
@@ -0,0 +1,46 @@
+from typing import Iterable, Iterator
+
+import numpy as np
+
+
+def windows_from_blocks(
+    blocks: Iterable[np.ndarray], window_length: int, hop_length: int
+) -> Iterator[tuple[int, np.ndarray]]:
+    """
+    Yield a window of window_length samples every hop_length samples of the blocks read
+    one after the other, along with the index of the window's first sample.
+
+    The samples after the last whole window are yielded as one more window padded with
+    zeros, so is a recording shorter than a window. Each window is a new array, so it
+    can be kept while the next blocks are read.
+    """
+    if window_length < 1 or hop_length < 1:
+        raise ValueError("window_length and hop_length must be at least 1")
+    pending = np.zeros(0, dtype=np.float32)
+    # The index of pending[0] in the recording
+    start = 0
+    # Samples still to drop when the hop is longer than the window
+    skip = 0
+    covered_until = 0
+    for block in blocks:
+        if skip:
+            dropped = min(skip, len(block))
+            block = block[dropped:]
+            skip -= dropped
+            start += dropped
+        pending = np.concatenate((pending, block))
+        while len(pending) >= window_length:
+            yield start, pending[:window_length].copy()
+            covered_until = start + window_length
+            if hop_length <= len(pending):
+                pending = pending[hop_length:]
+                start += hop_length
+            else:
+                skip = hop_length - len(pending)
+                start += len(pending)
+                pending = pending[:0]
+
+    if len(pending) and start + len(pending) > covered_until:
+        window = np.zeros(window_length, dtype=np.float32)
+        window[: len(pending)] = pending
+        yield start, window
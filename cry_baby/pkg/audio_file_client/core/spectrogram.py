@@ -0,0 +1,75 @@
+import numpy as np
+
+# Matches the defaults of librosa.power_to_db, which the model was trained with
+AMIN = 1e-10
+TOP_DB = 80.0
+
+
+def calc_target_shape(
+    sampling_rate_hz: int,
+    duration_seconds: int,
+    number_of_mel_bands: int,
+    hop_length: int,
+) -> tuple[int, int]:
+    number_of_samples = duration_seconds * sampling_rate_hz
+    number_of_frames = int((number_of_samples + hop_length) / hop_length)
+    return number_of_mel_bands, number_of_frames
+
+
+def empty_model_input(target_shape: tuple[int, int]) -> np.ndarray:
+    """
+    A buffer for postprocess_into, shaped as the model input (batch, mel bands, frames, channel)
+    """
+    return np.zeros((1, *target_shape, 1), dtype=np.float32)
+
+
+def as_float_samples(samples: np.ndarray) -> np.ndarray:
+    """
+    Scale integer samples to [-1, 1) the way soundfile does when reading a file as float32
+    Float samples are returned as they are
+    """
+    if np.issubdtype(samples.dtype, np.integer):
+        return samples.astype(np.float32) / -float(np.iinfo(samples.dtype).min)
+    return samples.astype(np.float32, copy=False)
+
+
+def postprocess_into(mel_spectrogram: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """
+    Write the normalised log mel spectrogram into the pre allocated float32 buffer out,
+    shaped (1, number_of_mel_bands, frames, 1). Missing frames are padded with silence
+    and extra frames are dropped.
+
+    Everything is done in place on out so a steady state loop reusing the same buffer
+    allocates nothing here.
+    """
+    number_of_mel_bands, number_of_frames = mel_spectrogram.shape
+    if (
+        out.dtype != np.float32
+        or out.ndim != 4
+        or out.shape[0] != 1
+        or out.shape[1] != number_of_mel_bands
+        or out.shape[3] != 1
+    ):
+        raise ValueError(
+            f"Expected a float32 buffer of shape (1, {number_of_mel_bands}, frames, 1), "
+            f"but got {out.dtype} {out.shape}"
+        )
+    # Both are views of out, it is contiguous as its first and last dimensions are 1
+    matrix = out.reshape(out.shape[1], out.shape[2])
+    flat = out.reshape(-1)
+
+    copied_frames = min(number_of_frames, matrix.shape[1])
+    np.copyto(matrix[:, :copied_frames], mel_spectrogram[:, :copied_frames])
+    matrix[:, copied_frames:] = 0
+
+    # Taking the logarithm of the Mel spectrogram is a common step because
+    # human perception of sound intensity is logarithmic in nature
+    np.maximum(flat, AMIN, out=flat)
+    np.log10(flat, out=flat)
+    flat *= 10.0
+    np.maximum(flat, flat.max() - TOP_DB, out=flat)
+
+    # Normalization
+    flat -= flat.mean()
+    flat /= np.sqrt(np.dot(flat, flat) / flat.size)
+    return out
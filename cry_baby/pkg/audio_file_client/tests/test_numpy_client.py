@@ -0,0 +1,181 @@
+import pathlib
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from cry_baby.pkg.audio_file_client.adapters.librosa_client import LibrosaClient
+from cry_baby.pkg.audio_file_client.adapters.numpy_client import NumpyClient
+from cry_baby.pkg.audio_file_client.core import domain
+
+TMP_PATH = pathlib.Path("/tmp")
+SR = 16000
+DURATION = 4
+NUMBER_OF_MEL_BANDS = 128
+HOP_LENGTH = 512
+
+PRE_PROCESSING_SETTINGS = domain.MelSpectrogramPreprocessingSettings(
+    duration_seconds=DURATION,
+    sampling_rate_hz=SR,
+    number_of_mel_bands=NUMBER_OF_MEL_BANDS,
+    hop_length=HOP_LENGTH,
+)
+
+
+@pytest.fixture
+def create_dummy_audio_file() -> pathlib.Path:
+    t = np.linspace(0, DURATION, int(SR * DURATION))
+    y = 0.5 * np.sin(2 * np.pi * 440 * t)  # Generate a 440 Hz tone
+    test_file = TMP_PATH / "test_numpy_audio.wav"
+    sf.write(test_file, y, SR)
+    return test_file
+
+
+@pytest.fixture
+def create_noise_audio_file() -> pathlib.Path:
+    y = np.random.default_rng(0).normal(0, 0.1, SR * DURATION)
+    test_file = TMP_PATH / "test_numpy_noise.wav"
+    sf.write(test_file, y, SR)
+    return test_file
+
+
+RECORDING_RATE_HZ = 44100
+
+
+@pytest.fixture
+def create_recorder_rate_noise_audio_file() -> pathlib.Path:
+    """
+    Noise at the rate the PyaudioRecorder writes, so it has to be resampled
+    """
+    y = np.random.default_rng(0).normal(0, 0.1, RECORDING_RATE_HZ * DURATION)
+    test_file = TMP_PATH / "test_numpy_noise_44100.wav"
+    sf.write(test_file, y, RECORDING_RATE_HZ)
+    return test_file
+
+
+@pytest.fixture
+def create_recorder_rate_chirp_audio_file() -> pathlib.Path:
+    """
+    A sweep from 100 Hz to past the 8 kHz nyquist frequency of the model input
+    """
+    t = np.arange(RECORDING_RATE_HZ * DURATION) / RECORDING_RATE_HZ
+    y = 0.5 * np.sin(2 * np.pi * (100 * t + (10000 - 100) / (2 * DURATION) * t**2))
+    test_file = TMP_PATH / "test_numpy_chirp_44100.wav"
+    sf.write(test_file, y, RECORDING_RATE_HZ)
+    return test_file
+
+
+def test_get_duration(create_dummy_audio_file):
+    duration = NumpyClient().get_duration(create_dummy_audio_file, HOP_LENGTH, SR)
+    assert duration == DURATION
+
+
+def test_crop(create_dummy_audio_file):
+    numpy_client = NumpyClient()
+    cropped_amount = 2
+    cropped_file = numpy_client.crop(
+        create_dummy_audio_file, start_seconds=0, end_seconds=DURATION - cropped_amount
+    )
+    duration = numpy_client.get_duration(cropped_file, HOP_LENGTH, SR)
+    assert duration == DURATION - cropped_amount
+
+
+def test_pad(create_dummy_audio_file):
+    numpy_client = NumpyClient()
+    padded_amount = 2
+    padded_file = numpy_client.pad(
+        create_dummy_audio_file, duration=DURATION + padded_amount
+    )
+    duration = numpy_client.get_duration(padded_file, HOP_LENGTH, SR)
+    assert duration == DURATION + padded_amount
+
+
+@pytest.mark.parametrize(
+    "audio_file_fixture", ["create_dummy_audio_file", "create_noise_audio_file"]
+)
+def test_extract_mel_spectrogram_matches_librosa(audio_file_fixture, request):
+    audio_file = request.getfixturevalue(audio_file_fixture)
+    expected = LibrosaClient().extract_mel_spectrogram(
+        audio_file, PRE_PROCESSING_SETTINGS
+    )
+    mel_spectrogram = NumpyClient().extract_mel_spectrogram(
+        audio_file, PRE_PROCESSING_SETTINGS
+    )
+    assert mel_spectrogram.shape == (128, 126)
+    np.testing.assert_allclose(mel_spectrogram, expected, atol=1e-4)
+
+
+@pytest.mark.parametrize(
+    "audio_file_fixture",
+    [
+        "create_recorder_rate_noise_audio_file",
+        "create_recorder_rate_chirp_audio_file",
+    ],
+)
+def test_extract_mel_spectrogram_with_resampling_is_close_to_librosa(
+    audio_file_fixture, request
+):
+    audio_file = request.getfixturevalue(audio_file_fixture)
+    expected = LibrosaClient().extract_mel_spectrogram(
+        audio_file, PRE_PROCESSING_SETTINGS
+    )
+    mel_spectrogram = NumpyClient().extract_mel_spectrogram(
+        audio_file, PRE_PROCESSING_SETTINGS
+    )
+    assert mel_spectrogram.shape == (128, 126)
+    # Every band, including the top ones where the resampling filters roll off
+    largest_difference_per_band = np.max(np.abs(mel_spectrogram - expected), axis=1)
+    assert np.all(largest_difference_per_band < 0.05)
+
+
+@pytest.mark.parametrize("client", [NumpyClient(), LibrosaClient()])
+def test_extract_mel_spectrogram_from_samples_matches_the_file(client):
+    recording_rate_hz = 44100
+    samples = (
+        np.random.default_rng(0).normal(0, 3000, recording_rate_hz * DURATION)
+    ).astype(np.int16)
+    test_file = TMP_PATH / "test_numpy_pcm16_44100.wav"
+    sf.write(test_file, samples, recording_rate_hz, subtype="PCM_16")
+    expected = client.extract_mel_spectrogram(test_file, PRE_PROCESSING_SETTINGS)
+
+    out = np.zeros((1, *expected.shape, 1), dtype=np.float32)
+    client.extract_mel_spectrogram_from_samples_into(
+        samples, recording_rate_hz, PRE_PROCESSING_SETTINGS, out
+    )
+    np.testing.assert_allclose(out[0, :, :, 0], expected, atol=1e-4)
+
+
+@pytest.fixture
+def create_long_audio_file() -> pathlib.Path:
+    """
+    Each frame holds its own index, so the frames a crop read can be told apart
+    """
+    y = (np.arange(SR * 600) % 32768).astype(np.int16)
+    test_file = TMP_PATH / "test_numpy_long.wav"
+    sf.write(test_file, y, SR, subtype="PCM_16")
+    return test_file
+
+
+@pytest.mark.parametrize("client", [NumpyClient(), LibrosaClient()])
+def test_get_duration_reads_the_header(client, create_long_audio_file, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("The audio file was decoded")
+
+    monkeypatch.setattr(sf, "read", fail)
+    monkeypatch.setattr("librosa.load", fail)
+    assert client.get_duration(create_long_audio_file, HOP_LENGTH, SR) == 600
+    assert client.pad(create_long_audio_file, duration=DURATION) == (
+        create_long_audio_file
+    )
+
+
+@pytest.mark.parametrize("client", [NumpyClient(), LibrosaClient()])
+def test_crop_reads_the_requested_frames(client, create_long_audio_file):
+    cropped_file = client.crop(
+        create_long_audio_file, start_seconds=300, end_seconds=300 + DURATION
+    )
+    y, sr = sf.read(cropped_file, dtype="int16")
+    assert sr == SR
+    np.testing.assert_array_equal(
+        y, (np.arange(300 * SR, (300 + DURATION) * SR) % 32768).astype(np.int16)
+    )
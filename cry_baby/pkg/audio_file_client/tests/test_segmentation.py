@@ -0,0 +1,67 @@
+import pathlib
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from cry_baby.pkg.audio_file_client.adapters.librosa_client import LibrosaClient
+from cry_baby.pkg.audio_file_client.adapters.numpy_client import NumpyClient
+from cry_baby.pkg.audio_file_client.core.segmentation import windows_from_blocks
+
+TMP_PATH = pathlib.Path("/tmp")
+SR = 1000
+
+
+@pytest.mark.parametrize("block_length", [1, 7, 250, 10_000])
+@pytest.mark.parametrize("hop_length", [100, 400, 700])
+def test_windows_do_not_depend_on_the_block_length(block_length, hop_length):
+    recording = np.arange(2950, dtype=np.float32)
+    blocks = np.split(recording, range(block_length, len(recording), block_length))
+
+    windows = list(
+        windows_from_blocks(blocks, window_length=400, hop_length=hop_length)
+    )
+
+    whole_starts = range(0, len(recording) - 400 + 1, hop_length)
+    assert [start for start, _ in windows[: len(whole_starts)]] == list(whole_starts)
+    for start, window in windows[: len(whole_starts)]:
+        np.testing.assert_array_equal(window, recording[start : start + 400])
+    # The tail is padded with silence
+    tail_start, tail = windows[-1]
+    assert tail_start == whole_starts[-1] + hop_length
+    assert len(windows) == len(whole_starts) + 1
+    remaining = recording[tail_start:]
+    np.testing.assert_array_equal(tail[: len(remaining)], remaining)
+    assert not tail[len(remaining) :].any()
+
+
+def test_a_recording_shorter_than_a_window_is_padded():
+    windows = list(windows_from_blocks([np.ones(30)], window_length=100, hop_length=50))
+    assert len(windows) == 1
+    assert windows[0][0] == 0
+    assert windows[0][1].sum() == 30
+
+
+def test_no_tail_when_the_last_window_reaches_the_end():
+    windows = list(
+        windows_from_blocks([np.ones(300)], window_length=100, hop_length=100)
+    )
+    assert [start for start, _ in windows] == [0, 100, 200]
+
+
+@pytest.mark.parametrize("client", [NumpyClient(), LibrosaClient()])
+def test_stream_windows_from_a_file(client):
+    test_file = TMP_PATH / "test_stream_windows.wav"
+    sf.write(test_file, np.random.default_rng(0).normal(0, 0.1, 10 * SR), SR)
+
+    windows = list(
+        client.stream_windows(
+            test_file, duration_seconds=4, hop_seconds=2, block_seconds=3
+        )
+    )
+
+    assert [window.start_seconds for window in windows] == [0, 2, 4, 6]
+    assert all(window.sampling_rate_hz == SR for window in windows)
+    assert all(len(window.samples) == 4 * SR for window in windows)
+    y, _ = sf.read(test_file, dtype="float32")
+    np.testing.assert_array_equal(windows[1].samples, y[2 * SR : 6 * SR])
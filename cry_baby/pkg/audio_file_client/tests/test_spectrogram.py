@@ -0,0 +1,62 @@
+import tracemalloc
+
+import librosa
+import numpy as np
+import pytest
+
+from cry_baby.pkg.audio_file_client.core.spectrogram import (
+    calc_target_shape,
+    empty_model_input,
+    postprocess_into,
+)
+
+SR = 16000
+DURATION = 4
+NUMBER_OF_MEL_BANDS = 128
+HOP_LENGTH = 512
+
+TARGET_SHAPE = calc_target_shape(SR, DURATION, NUMBER_OF_MEL_BANDS, HOP_LENGTH)
+
+
+@pytest.fixture
+def mel_spectrogram() -> np.ndarray:
+    # One frame short, so the padding is exercised
+    rng = np.random.default_rng(0)
+    return rng.exponential(size=(NUMBER_OF_MEL_BANDS, TARGET_SHAPE[1] - 1)).astype(
+        np.float32
+    )
+
+
+def test_postprocess_into_matches_librosa(mel_spectrogram):
+    padded = np.hstack(
+        (mel_spectrogram, np.zeros((NUMBER_OF_MEL_BANDS, 1), dtype=np.float32))
+    )
+    expected = librosa.power_to_db(padded)
+    expected = (expected - np.mean(expected)) / np.std(expected)
+
+    out = postprocess_into(mel_spectrogram, empty_model_input(TARGET_SHAPE))
+
+    assert out.shape == (1, *TARGET_SHAPE, 1)
+    assert out.dtype == np.float32
+    np.testing.assert_allclose(out[0, :, :, 0], expected, atol=1e-4)
+
+
+def test_postprocess_into_does_not_allocate_per_window(mel_spectrogram):
+    out = empty_model_input(TARGET_SHAPE)
+    postprocess_into(mel_spectrogram, out)
+
+    tracemalloc.start()
+    try:
+        for _ in range(10):
+            postprocess_into(mel_spectrogram, out)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # A single temporary copy of the spectrogram would be out.nbytes (64 KB)
+    assert peak < out.nbytes / 16
+
+
+def test_postprocess_into_rejects_wrong_buffer(mel_spectrogram):
+    with pytest.raises(ValueError):
+        postprocess_into(mel_spectrogram, np.zeros((1, *TARGET_SHAPE, 1)))